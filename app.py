@@ -3,6 +3,7 @@ import uuid
 import streamlit as st
 from langchain_core.messages import HumanMessage, AIMessage
 
+from deep_searcher import AgentDeepSearch
 from llm.openai_llm import OpenAILLM
 from management import ConversationsManager
 from schemas import Message
@@ -45,6 +46,34 @@ manager = ConversationsManager(chatId)
 #
 
 
+def stream_deep_search(query: str) -> str:
+    """
+    Run the deep search, showing its progress and streaming the report as it is written.
+    :param query:
+    :return: The final report.
+    """
+    status = st.status("Pesquisando...", expanded=False)
+
+    def tokens():
+        for event in AgentDeepSearch(llm=llm, ui=feedback_placeholder).stream(query):
+            match event.type:
+                case "sub_queries":
+                    status.write(f"🔎 Subconsultas: {', '.join(event.sub_queries)}")
+                case "source_finished":
+                    status.write(f"{'✅' if event.success else '⚠️'} {event.source}: {event.content}")
+                case "depth_completed":
+                    status.update(label=f"Profundidade {event.depth} concluída, continuando...")
+                case "token":
+                    yield event.content
+                case "done":
+                    status.update(label="✅ Pesquisa concluída", state="complete")
+                case "error":
+                    status.update(label="Erro na pesquisa", state="error")
+                    st.error(event.content)
+
+    return st.write_stream(tokens()) or ""
+
+
 # --- Sidebar ---
 with st.sidebar:
     if st.button("Novo", icon=":material/add:"):
@@ -67,6 +96,12 @@ with st.sidebar:
         except Exception as e:
             st.error(f"Erro ao ler o PDF: {e}")
 
+    st.markdown("---")
+    deep_research = st.toggle(
+        "Pesquisa profunda",
+        help="Pesquisa em várias etapas, mostrando o progresso e o relatório enquanto é escrito.",
+    )
+
     st.markdown("---")
     st.subheader("Histórico de Conversas")
 
@@ -92,30 +127,42 @@ if prompt:
         st.session_state.summary = None
         st.session_state.flashcards = []
         st.session_state.current_flashcard = 0
-        with st.spinner("Agentes gerando resumo..."):
-            agent_output = llm.generate(
-                [
-                    HumanMessage(content=m['content'])
-                    if m['role'] == "user"
-                    else AIMessage(
-                        content=m['content'],
-                        additional_kwargs={"name": m['role']}
+        if deep_research:
+            agent_output = stream_deep_search(prompt)
+            if agent_output: # empty when the research failed, the error is shown instead
+                st.session_state.summary = agent_output
+                st.session_state.messages.append({"role": "assistant", "content": agent_output})
+                manager.add_message(
+                    Message(
+                        role="agent",
+                        content=agent_output,
+                    )
+                )
+        else:
+            with st.spinner("Agentes gerando resumo..."):
+                agent_output = llm.generate(
+                    [
+                        HumanMessage(content=m['content'])
+                        if m['role'] == "user"
+                        else AIMessage(
+                            content=m['content'],
+                            additional_kwargs={"name": m['role']}
+                        )
+                        for m in st.session_state.messages
+                    ],
+                )
+                st.session_state.summary = agent_output
+                st.session_state.messages.append({"role": "assistant", "content": agent_output})
+                st.success("✅ Concluído!")
+                manager.add_message(
+                    Message(
+                        role="agent",
+                        content=agent_output,
                     )
-                    for m in st.session_state.messages
-                ],
-            )
-            st.session_state.summary = agent_output
-            st.session_state.messages.append({"role": "assistant", "content": agent_output})
-            st.success("✅ Concluído!")
-            manager.add_message(
-                Message(
-                    role="agent",
-                    content=agent_output,
                 )
-            )
 
-            # Write the summary
-            st.write(st.session_state.summary)
+                # Write the summary
+                st.write(st.session_state.summary)
 
 
 if st.session_state.summary is not None and len(st.session_state.summary) >= 900:
@@ -0,0 +1,86 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the process-wide event loop shared by the async pipeline.
+    The loop runs forever in a daemon thread, started on first use.
+    :return: The shared event loop.
+    """
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever,
+                name="async-runtime",
+                daemon=True,
+            ).start()
+            _loop = loop
+    return _loop
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool that runs each task in a copy of the submitter's context,
+    so context variables (such as the active trace) follow the work into the workers.
+    """
+
+    def submit(self, fn: Callable[..., _T], /, *args: Any, **kwargs: Any) -> "Future[_T]":
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+async def _in_context(coro: Coroutine[Any, Any, _T], context: contextvars.Context) -> _T:
+    """
+    Await a coroutine with the context variables of another thread.
+    Tasks created by `run_coroutine_threadsafe` start from the loop thread's context instead.
+    """
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+def run_sync(coro: Coroutine[Any, Any, _T]) -> _T:
+    """
+    Run a coroutine on the shared event loop and block until it completes.
+    Used by the synchronous APIs instead of `asyncio.run`, so every call reuses the same loop.
+    :param coro: The coroutine to run.
+    :return: The result of the coroutine.
+    :raises RuntimeError: If called from the shared event loop itself.
+    """
+    loop = get_event_loop()
+    if _running_loop() is loop:
+        coro.close()
+        raise RuntimeError("run_sync cannot be called from the shared event loop, await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), loop).result()
+
+
+async def run_on_loop(coro: Coroutine[Any, Any, _T]) -> _T:
+    """
+    Await a coroutine on the shared event loop from any other event loop.
+    Needed for resources bound to the shared loop (browsers, pooled clients).
+    :param coro: The coroutine to run.
+    :return: The result of the coroutine.
+    """
+    loop = get_event_loop()
+    if _running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), loop)
+    )
@@ -0,0 +1,21 @@
+import os
+
+# Keep the replayed runs offline and comparable: no crawl cache on disk, no trace files,
+# and an in-process Qdrant. Set before `config` is imported, so they win over `.env`.
+os.environ.setdefault("QDRANT_DSN", ":memory:")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("USE_CRAWL_CACHE", "false")
+os.environ.setdefault("TRACE_EXPORT_DIR", "")
+
+from .fixtures import Fixture, load_fixtures  # noqa: E402
+from .harness import BenchmarkResult, build_agent, run_fixture, format_report  # noqa: E402
+
+
+__all__ = [
+    "Fixture",
+    "load_fixtures",
+    "BenchmarkResult",
+    "build_agent",
+    "run_fixture",
+    "format_report",
+]
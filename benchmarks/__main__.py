@@ -0,0 +1,67 @@
+import argparse
+import json
+
+from loggings import logger
+from . import load_fixtures, run_fixture, format_report
+
+parser = argparse.ArgumentParser(
+    description="Replay the recorded fixtures through AgentDeepSearch and report its performance."
+)
+
+parser.add_argument(
+    "--fixtures",
+    nargs="*",
+    default=None,
+    help="Names of the fixtures to run. Defaults to all of them.",
+)
+
+parser.add_argument(
+    "--mode",
+    choices=["sync", "async", "both"],
+    default="both",
+    help="Benchmark `run`, `arun` or both.",
+)
+
+parser.add_argument(
+    "--repeats",
+    type=int,
+    default=3,
+    help="Timed runs per fixture and mode.",
+)
+
+parser.add_argument(
+    "--latency",
+    type=float,
+    default=0.0,
+    help="Seconds slept per LLM, model server, crawl and PDF download call, to model network latency.",
+)
+
+parser.add_argument(
+    "--max-depth",
+    type=int,
+    default=3,
+    help="Maximum research depth.",
+)
+
+parser.add_argument(
+    "--json",
+    type=str,
+    default=None,
+    help="Write the results to this JSON file.",
+)
+
+args = parser.parse_args()
+
+modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+results = [
+    run_fixture(fixture, mode, repeats=args.repeats, latency=args.latency, max_depth=args.max_depth)
+    for fixture in load_fixtures(names=args.fixtures)
+    for mode in modes
+]
+
+logger(format_report(results), "info")
+
+if args.json:
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump([result.model_dump() for result in results], f, indent=2)
+    logger(f"Benchmark results written to {args.json}", "info")
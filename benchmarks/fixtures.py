@@ -0,0 +1,75 @@
+import os
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from schemas import ReflectionResultSchema, SearchResult
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class Fixture(BaseModel):
+    """
+    Recorded responses of the external services for one canonical query.
+    Responses keyed by query fall back to the `*` entry.
+    """
+    name: str
+    query: str
+    sub_queries: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description="Sub-queries the LLM generated, by query.",
+    )
+    reflections: list[ReflectionResultSchema] = Field(
+        default_factory=list,
+        description="Reflections the LLM returned, in depth order.",
+    )
+    search_results: dict[str, list[SearchResult]] = Field(
+        default_factory=dict,
+        description="Search engine results, by sub-query.",
+    )
+    pages: dict[str, str] = Field(
+        default_factory=dict,
+        description="Crawled Markdown content, by URL.",
+    )
+    papers: dict[str, list[SearchResult]] = Field(
+        default_factory=dict,
+        description="arXiv results, by sub-query. `link` is the PDF URL.",
+    )
+    pdfs: dict[str, str] = Field(
+        default_factory=dict,
+        description="Parsed Markdown content of the PDFs, by PDF URL.",
+    )
+
+    @staticmethod
+    def _lookup(recorded: dict[str, list], query: str) -> list:
+        return list(recorded.get(query) or recorded.get("*", []))
+
+    def sub_queries_for(self, query: str) -> list[str]:
+        return self._lookup(self.sub_queries, query)
+
+    def search_results_for(self, query: str) -> list[SearchResult]:
+        return [result.model_copy() for result in self._lookup(self.search_results, query)]
+
+    def papers_for(self, query: str) -> list[SearchResult]:
+        return [result.model_copy() for result in self._lookup(self.papers, query)]
+
+
+def load_fixtures(directory: str = FIXTURES_DIR, names: Optional[list[str]] = None) -> list[Fixture]:
+    """
+    Load the recorded fixtures of a directory.
+    :param directory:
+    :param names: Only load these fixtures. Defaults to every `*.json` file.
+    :return: The fixtures, sorted by name.
+    """
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            fixture = Fixture.model_validate_json(f.read())
+        if names is None or fixture.name in names:
+            fixtures.append(fixture)
+    if names is not None and len(fixtures) != len(set(names)):
+        missing = set(names) - {fixture.name for fixture in fixtures}
+        raise ValueError(f"Unknown fixtures: {', '.join(sorted(missing))}")
+    return fixtures
@@ -0,0 +1,160 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from caching import EmbeddingCache, SummarizationCache
+from deep_searcher import AgentDeepSearch, ContextPacker
+from llm.embeddings import Embeddings
+from llm.reranker import Reranker
+from llm.summarization import Summarization
+from schemas import StageSummary
+from .fixtures import Fixture
+from .replay import (
+    ReplayLLM,
+    ReplayLocallyCallAPI,
+    ReplayCrawlerParser,
+    ReplayPDFParser,
+    ReplaySearchEngine,
+    ReplayArxivSearch,
+    ReplaySemanticSearch,
+)
+
+
+class BenchmarkResult(BaseModel):
+    fixture: str
+    query: str
+    mode: Literal["sync", "async"]
+    wall_ms: list[float] = Field(
+        ...,
+        description="Wall time of each timed run.",
+    )
+    peak_memory_bytes: int = Field(
+        ...,
+        description="Peak Python heap allocated during a separate, tracemalloc-instrumented run.",
+    )
+    tokens: dict[str, float] = Field(
+        default_factory=dict,
+        description="Token totals of the last run, by `<stage>.<attribute>`.",
+    )
+    stages: list[StageSummary] = Field(
+        default_factory=list,
+        description="Per-stage calls and latency of the last run.",
+    )
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.wall_ms)
+
+
+def build_agent(fixture: Fixture, latency: float = 0.0, max_depth: int = 3) -> AgentDeepSearch:
+    """
+    Wire an AgentDeepSearch to the replayed services of a fixture.
+    Every component is new, so runs do not share caches or state.
+    :param fixture:
+    :param latency: Seconds slept per LLM, model server, crawl and PDF download call.
+    :param max_depth:
+    :return:
+    """
+    llm = ReplayLLM(fixture, latency=latency)
+    client = ReplayLocallyCallAPI(latency=latency)
+    reranker = Reranker(client=client)
+    summarization = Summarization(cache=SummarizationCache(directory=None), client=client)
+    return AgentDeepSearch(
+        llm,
+        max_depth=max_depth,
+        context_packer=ContextPacker(llm, reranker=reranker),
+        semantic_search=ReplaySemanticSearch(
+            Embeddings(client=client, cache=EmbeddingCache(directory=None))
+        ),
+        search_engine=ReplaySearchEngine(
+            fixture, reranker, summarization, ReplayCrawlerParser(fixture, latency=latency)
+        ),
+        arxiv_search=ReplayArxivSearch(
+            fixture, reranker, summarization, ReplayPDFParser(fixture), latency=latency
+        ),
+    )
+
+
+def _run(agent: AgentDeepSearch, query: str, mode: Literal["sync", "async"]) -> str:
+    if mode == "async":
+        return asyncio.run(agent.arun(query))
+    return agent.run(query)
+
+
+def run_fixture(
+    fixture: Fixture,
+    mode: Literal["sync", "async"] = "sync",
+    repeats: int = 3,
+    latency: float = 0.0,
+    max_depth: int = 3,
+) -> BenchmarkResult:
+    """
+    Benchmark the deep search on one fixture.
+    The timed runs are not instrumented by tracemalloc; peak memory is measured by one extra run.
+    :param fixture:
+    :param mode: Run `run` (sync) or `arun` (async).
+    :param repeats: Number of timed runs.
+    :param latency: Seconds slept per external call.
+    :param max_depth:
+    :return:
+    """
+    if repeats <= 0:
+        raise ValueError("repeats must be greater than 0.")
+
+    wall_ms = []
+    agent = None
+    for _ in range(repeats):
+        agent = build_agent(fixture, latency, max_depth)
+        started = time.perf_counter()
+        _run(agent, fixture.query, mode)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        _run(build_agent(fixture, latency, max_depth), fixture.query, mode)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    summary = agent.last_trace.summary()
+    return BenchmarkResult(
+        fixture=fixture.name,
+        query=fixture.query,
+        mode=mode,
+        wall_ms=wall_ms,
+        peak_memory_bytes=peak,
+        tokens={
+            f"{stage.name}.{key}": value
+            for stage in summary.stages
+            for key, value in stage.totals.items()
+            if key.endswith("tokens")
+        },
+        stages=summary.stages,
+    )
+
+
+def format_report(results: list[BenchmarkResult]) -> str:
+    """
+    Render the results as a plain-text report.
+    :param results:
+    :return:
+    """
+    lines = []
+    for result in results:
+        lines.append(
+            f"{result.fixture} [{result.mode}] median {result.median_ms:.1f}ms "
+            f"(min {min(result.wall_ms):.1f}ms, max {max(result.wall_ms):.1f}ms, n={len(result.wall_ms)}), "
+            f"peak memory {result.peak_memory_bytes / 2 ** 20:.1f} MiB"
+        )
+        for stage in result.stages:
+            lines.append(
+                f"  {stage.name:<24} calls={stage.count:<4} total={stage.total_ms:>9.1f}ms "
+                f"mean={stage.mean_ms:>8.1f}ms errors={stage.errors}"
+            )
+        for key, value in sorted(result.tokens.items()):
+            lines.append(f"  {key:<40} {value:>10g}")
+    return "\n".join(lines)
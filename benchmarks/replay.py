@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from typing import Literal, Optional
+
+from langchain_core.messages import BaseMessage
+
+from exceptions import CrawlerParserError, PDFParserError, SemanticUpsertError
+from llm._locally_call_api import LocallyCallAPI
+from llm.base import BaseLLM, BaseEmbedding
+from llm.reranker import Reranker
+from llm.summarization import Summarization
+from parsers.base import BaseCrawlerParser, BaseParser
+from researchers import SearchEngine, ArxivSearch
+from researchers.base import BaseSearchService
+from schemas import (
+    CrawledPage,
+    EmbeddingsRequest,
+    EmbeddingsResponse,
+    RerankRequest,
+    RerankResponse,
+    RerankedDocument,
+    ReflectionResultSchema,
+    SearchResult,
+    SearchResultSchema,
+    SummarizeRequest,
+    SummarizeResponse,
+    SummarizeBatchRequest,
+    SummarizeBatchResponse,
+)
+from tracing import span
+from .fixtures import Fixture
+
+_WORD = re.compile(r"\w+")
+
+
+def extract(text: str, max_words: int) -> str:
+    """
+    Deterministic stand-in for a generated summary: the first `max_words` words of the text.
+    Used for the responses that depend on the pipeline's own output, so they cannot be recorded.
+    :param text:
+    :param max_words:
+    :return:
+    """
+    return " ".join(text.split()[:max_words])
+
+
+def _terms(text: str) -> set[str]:
+    return {word.lower() for word in _WORD.findall(text)}
+
+
+class ReplayLLM(BaseLLM):
+    """
+    LLM that replays the recorded sub-queries and reflections of a fixture.
+    Summaries are extractive. `latency` seconds are slept per call to model the endpoint.
+    """
+
+    def __init__(self, fixture: Fixture, latency: float = 0.0, summary_words: int = 200):
+        self._fixture = fixture
+        self._latency = latency
+        self._summary_words = summary_words
+        self._reflections = 0
+        self._lock = threading.Lock()
+
+    def _wait(self) -> None:
+        if self._latency > 0:
+            time.sleep(self._latency)
+
+    def generate(self, chat_history: list[BaseMessage]) -> str:
+        self._wait()
+        return extract(str(chat_history[-1].content), self._summary_words) if chat_history else ""
+
+    def flashcard(self, prompt: str, quantities: int = 5) -> list:
+        return []
+
+    def generate_sub_queries(self, query: str) -> list[str]:
+        self._wait()
+        return self._fixture.sub_queries_for(query)
+
+    def reflection(self, query: str, sub_queries: list[str], chunks: list[str]) -> ReflectionResultSchema:
+        self._wait()
+        with self._lock:
+            index, self._reflections = self._reflections, self._reflections + 1
+        if index < len(self._fixture.reflections):
+            return self._fixture.reflections[index].model_copy()
+        return ReflectionResultSchema(complete_search=True)
+
+    def summarize(self, query: str, chunks: list[str]) -> str:
+        self._wait()
+        return extract("\n".join(chunks), self._summary_words)
+
+
+class ReplayLocallyCallAPI(LocallyCallAPI):
+    """
+    Stand-in for the model server. Embeddings are pseudo-random unit vectors seeded by the text,
+    rerank scores are the share of query terms found in the document, and summaries are extractive.
+    """
+
+    def __init__(self, latency: float = 0.0, dimensions: int = 1024, summary_words: int = 80):
+        super().__init__(api_key="replay", api_base="replay://local")
+        self._latency = latency
+        self._dimensions = dimensions
+        self._summary_words = summary_words
+
+    def _embed(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+        rng = random.Random(seed)
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self._dimensions)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    @staticmethod
+    def _score(query: str, document: str) -> float:
+        terms = _terms(query)
+        if not terms:
+            return 0.5
+        return 0.5 + 0.5 * len(terms & _terms(document)) / len(terms)
+
+    def _respond(
+        self,
+        uri: Literal["embeddings", "rerank", "summarize", "summarize/batch"],
+        payload: EmbeddingsRequest | RerankRequest | SummarizeRequest | SummarizeBatchRequest,
+    ) -> RerankResponse | EmbeddingsResponse | SummarizeResponse | SummarizeBatchResponse:
+        match uri:
+            case "embeddings":
+                return EmbeddingsResponse(embeddings=[self._embed(text) for text in payload.texts])
+            case "rerank":
+                reranked = [
+                    RerankedDocument(document=document, score=self._score(payload.query, document))
+                    for document in payload.documents
+                ]
+                return RerankResponse(reranked=sorted(reranked, key=lambda r: r.score, reverse=True))
+            case "summarize":
+                return SummarizeResponse(summary=extract(payload.document, self._summary_words))
+            case "summarize/batch":
+                return SummarizeBatchResponse(
+                    summaries=[extract(document, self._summary_words) for document in payload.documents]
+                )
+            case _:
+                raise ValueError(f"Invalid URI: {uri}")
+
+    def request(self, uri, payload):
+        self._validate(uri, payload)
+        if self._latency > 0:
+            time.sleep(self._latency)
+        return self._respond(uri, payload)
+
+    async def arequest(self, uri, payload):
+        self._validate(uri, payload)
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+        return self._respond(uri, payload)
+
+
+class ReplayCrawlerParser(BaseCrawlerParser):
+    """
+    Crawler that serves the recorded pages of a fixture.
+    """
+
+    def __init__(self, fixture: Fixture, latency: float = 0.0):
+        self._fixture = fixture
+        self._latency = latency
+
+    def fetch(self, url: str) -> CrawledPage:
+        if self._latency > 0:
+            time.sleep(self._latency)
+        content = self._fixture.pages.get(url)
+        if content is None:
+            raise CrawlerParserError(url, "Page not recorded.")
+        return CrawledPage(url=url, content=content)
+
+    async def afetch(self, url: str) -> CrawledPage:
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+        content = self._fixture.pages.get(url)
+        if content is None:
+            raise CrawlerParserError(url, "Page not recorded.")
+        return CrawledPage(url=url, content=content)
+
+
+class ReplayPDFParser(BaseParser):
+    """
+    PDF parser that serves the recorded Markdown of a fixture.
+    The "PDF" bytes are the URL of the paper, as downloaded by `ReplayArxivSearch`.
+    """
+
+    def __init__(self, fixture: Fixture):
+        self._fixture = fixture
+
+    def parse(self, values: bytes) -> Optional[str]:
+        with span("pdf_parse", bytes_in=len(values)) as current:
+            content = self._fixture.pdfs.get(values.decode())
+            if content is None:
+                raise PDFParserError(f"PDF not recorded: {values.decode()}")
+            current.set("bytes_out", len(content.encode()))
+            return content
+
+
+class ReplaySearchEngine(SearchEngine):
+    """
+    Search engine that replays the recorded results, then crawls, summarizes and reranks them as usual.
+    """
+
+    def __init__(
+        self,
+        fixture: Fixture,
+        reranker: Reranker,
+        summarization: Summarization,
+        parser: BaseCrawlerParser,
+    ):
+        super().__init__(reranker=reranker, summarization=summarization, parser=parser)
+        self._fixture = fixture
+
+    def _perform(self, query: str, limit: int = 10) -> list[SearchResult]:
+        return self._fixture.search_results_for(query)[:limit]
+
+
+class ReplayArxivSearch(ArxivSearch):
+    """
+    arXiv search that replays the recorded papers, then parses, summarizes and reranks them as usual.
+    """
+
+    def __init__(
+        self,
+        fixture: Fixture,
+        reranker: Reranker,
+        summarization: Summarization,
+        pdf_parser: BaseParser,
+        latency: float = 0.0,
+    ):
+        super().__init__(reranker=reranker, summarization=summarization, pdf_parser=pdf_parser)
+        self._fixture = fixture
+        self._latency = latency
+
+    def _fetch_results(self, query: str, limit: int) -> list[SearchResult]:
+        return self._fixture.papers_for(query)[:limit]
+
+    def _download_pdf(self, pdf_url: Optional[str]) -> Optional[bytes]:
+        if self._latency > 0:
+            time.sleep(self._latency)
+        return pdf_url.encode() if pdf_url else None
+
+    async def _adownload_pdf(self, pdf_url: Optional[str]) -> Optional[bytes]:
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+        return pdf_url.encode() if pdf_url else None
+
+
+class ReplaySemanticSearch(BaseSearchService):
+    """
+    In-memory stand-in for the vector store. Upserted documents are embedded, so the
+    embed stage is exercised, and searched by term overlap.
+    """
+
+    def __init__(self, embeddings: BaseEmbedding):
+        self._embeddings = embeddings
+        self._documents: list[str] = []
+
+    def search(self, query: str, limit: int = 10) -> list[SearchResultSchema]:
+        terms = _terms(query)
+        scored = [
+            SearchResultSchema(score=len(terms & _terms(document)) / (len(terms) or 1), text=document)
+            for document in self._documents
+        ]
+        return sorted(scored, key=lambda r: r.score, reverse=True)[:limit]
+
+    def upsert(self, document: str, document_id: Optional[str] = None) -> None:
+        try:
+            self._embeddings.embed([document])
+        except Exception as e:
+            raise SemanticUpsertError(f"Failed to embed document: {e}")
+        self._documents.append(document)
@@ -0,0 +1,16 @@
+from .crawl_cache import CrawlCache, get_crawl_cache, normalize_url
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .memory import LRUCache
+from .summarization_cache import SummarizationCache, get_summarization_cache
+
+
+__all__ = [
+    "CrawlCache",
+    "get_crawl_cache",
+    "normalize_url",
+    "EmbeddingCache",
+    "get_embedding_cache",
+    "LRUCache",
+    "SummarizationCache",
+    "get_summarization_cache",
+]
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import CRAWL_CACHE_DIR, CRAWL_CACHE_TTL, CRAWL_CACHE_MAX_BYTES
+from loggings import logger
+from schemas import CachedPage
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so equivalent spellings share a cache entry.
+    Lowercases the scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string and strips the trailing slash.
+    :param url:
+    :return: The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class CrawlCache:
+    """
+    On-disk cache of crawled pages, keyed by the SHA-256 of the normalized URL.
+    The markdown lives in one file per page; a SQLite index tracks size, access
+    time and the HTTP validators used to revalidate stale entries.
+    """
+
+    def __init__(
+        self,
+        directory: str = CRAWL_CACHE_DIR,
+        ttl: int = CRAWL_CACHE_TTL,
+        max_bytes: int = CRAWL_CACHE_MAX_BYTES,
+    ):
+        if ttl < 0:
+            raise ValueError("ttl must be greater than or equal to 0.")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0.")
+        self._directory = directory
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self._directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, size INTEGER NOT NULL, "
+                "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "etag TEXT, last_modified TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(os.path.join(self._directory, "index.db"), timeout=30)
+        try:
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key[:2], f"{key}.md")
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """
+        Check whether a cached page is younger than the TTL.
+        :param page:
+        :return:
+        """
+        return time.time() - page.fetched_at < self._ttl
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        Get a cached page, fresh or stale.
+        :param url:
+        :return: The cached page, or None on a miss.
+        """
+        key = self.key(url)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, etag, last_modified FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        fetched_at, etag, last_modified = row
+        return CachedPage(
+            url=url,
+            content=content,
+            fetched_at=fetched_at,
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Store a crawled page, evicting the least recently used pages above the size limit.
+        :param url:
+        :param content:
+        :param etag:
+        :param last_modified:
+        :return:
+        """
+        key = self.key(url)
+        path = self._path(key)
+        data = content.encode("utf-8")
+        if len(data) > self._max_bytes:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            os.replace(tmp_path, path)
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, size, fetched_at, accessed_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), len(data), now, now, etag, last_modified),
+            )
+            self._evict(conn)
+
+    def touch(self, url: str) -> None:
+        """
+        Mark a stale page as fresh again after a successful revalidation.
+        :param url:
+        :return:
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, self.key(url))
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM pages ORDER BY accessed_at ASC").fetchall():
+            if total <= self._max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger(f"Crawl cache evicted {evicted} pages.", "debug")
+
+
+_crawl_cache: Optional[CrawlCache] = None
+
+
+def get_crawl_cache() -> CrawlCache:
+    """
+    Get the process-wide crawl cache.
+    :return: The shared CrawlCache.
+    """
+    global _crawl_cache
+    if _crawl_cache is None:
+        _crawl_cache = CrawlCache()
+    return _crawl_cache
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+from config import EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_DIR
+from loggings import logger
+from schemas import CacheStats
+from .memory import LRUCache
+
+_SQLITE_MAX_PARAMS = 500
+
+
+class EmbeddingCache:
+    """
+    Memoizes text embeddings, keyed by the SHA-256 of the text.
+    A bounded in-memory LRU tier sits in front of an optional on-disk tier: a memory-mapped
+    float32 matrix (`vectors.f32`) and a SQLite index of the row of each key (`index.db`).
+    Rows are only appended, so the index never points at a row that is being rewritten.
+    The on-disk tier is reset when vectors of another dimension are stored (a new model).
+    """
+
+    def __init__(
+        self,
+        max_items: int = EMBEDDING_CACHE_SIZE,
+        directory: Optional[str] = EMBEDDING_CACHE_DIR,
+    ):
+        self._memory: LRUCache[str, np.ndarray] = LRUCache(max_items)
+        self._directory = directory
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+        if self._directory:
+            os.makedirs(self._directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS vectors ("
+                    "key TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(os.path.join(self._directory, "index.db"), timeout=30)
+        try:
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self._directory, "vectors.f32")
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, name: str) -> Optional[int]:
+        row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _mapped(self, dim: int, rows: int) -> np.memmap:
+        """
+        Map the matrix file with room for at least `rows` rows, growing the file when needed.
+        Must be called with the lock held.
+        :param dim:
+        :param rows:
+        :return:
+        """
+        if self._matrix is not None and self._matrix.shape[1] == dim and len(self._matrix) >= rows:
+            return self._matrix
+        row_bytes = dim * 4
+        capacity = os.path.getsize(self._path) // row_bytes if os.path.exists(self._path) else 0
+        if capacity < rows:
+            capacity = max(rows, capacity * 2, 1024)
+            with open(self._path, "a+b") as f:
+                f.truncate(capacity * row_bytes)
+        self._matrix = np.memmap(self._path, dtype="<f4", mode="r+", shape=(capacity, dim))
+        return self._matrix
+
+    def _read(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, int] = {}
+        with self._connect() as conn:
+            dim = self._meta(conn, "dim")
+            if dim is None:
+                return {}
+            for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                batch = keys[start:start + _SQLITE_MAX_PARAMS]
+                found.update(conn.execute(
+                    f"SELECT key, row FROM vectors WHERE key IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall())
+        if not found:
+            return {}
+        with self._lock:
+            matrix = self._mapped(dim, max(found.values()) + 1)
+            return {key: np.array(matrix[row]) for key, row in found.items()}
+
+    def _write(self, vectors: dict[str, np.ndarray]) -> None:
+        dim = len(next(iter(vectors.values())))
+        with self._lock, self._connect() as conn:
+            stored_dim = self._meta(conn, "dim")
+            if stored_dim is not None and stored_dim != dim:
+                logger(
+                    f"Embedding dimension changed from {stored_dim} to {dim}, resetting the embedding cache.",
+                    "warning"
+                )
+                conn.execute("DELETE FROM vectors")
+                conn.execute("DELETE FROM meta")
+                self._matrix = None
+                if os.path.exists(self._path):
+                    os.remove(self._path)
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dim', ?)", (dim,))
+
+            keys = list(vectors)
+            existing = set()
+            for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                batch = keys[start:start + _SQLITE_MAX_PARAMS]
+                existing.update(key for key, in conn.execute(
+                    f"SELECT key FROM vectors WHERE key IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ))
+            new = [key for key in keys if key not in existing]
+            if not new:
+                return
+
+            first = self._meta(conn, "rows") or 0
+            matrix = self._mapped(dim, first + len(new))
+            matrix[first:first + len(new)] = np.stack([vectors[key] for key in new])
+            matrix.flush()  # the rows are on disk before the index points at them
+            conn.executemany(
+                "INSERT INTO vectors (key, row) VALUES (?, ?)",
+                [(key, first + i) for i, key in enumerate(new)],
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('rows', ?)", (first + len(new),))
+
+    def get_many(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """
+        Get the memoized embeddings of many texts.
+        :param texts:
+        :return: The embedding of each text, or None on a miss.
+        """
+        keys = [self.key(text) for text in texts]
+        vectors = [self._memory.get(key) for key in keys]
+        memory_hits = sum(vector is not None for vector in vectors)
+
+        disk_hits = 0
+        pending = list({key for key, vector in zip(keys, vectors) if vector is None})
+        if self._directory and pending:
+            stored = self._read(pending)
+            for key, vector in stored.items():
+                self._memory.put(key, vector)
+            for i, key in enumerate(keys):
+                if vectors[i] is None and key in stored:
+                    vectors[i] = stored[key]
+                    disk_hits += 1
+
+        with self._lock:
+            self._stats.memory_hits += memory_hits
+            self._stats.disk_hits += disk_hits
+            self._stats.misses += len(texts) - memory_hits - disk_hits
+        return vectors
+
+    def put_many(self, texts: list[str], embeddings: np.ndarray) -> None:
+        """
+        Memoize the embeddings of many texts.
+        :param texts:
+        :param embeddings: Array of shape (len(texts), dim).
+        :return:
+        """
+        if len(texts) != len(embeddings):
+            raise ValueError("Number of texts and embeddings must match.")
+        vectors = {
+            self.key(text): np.array(vector, dtype=np.float32)
+            for text, vector in zip(texts, embeddings)
+        }
+        for key, vector in vectors.items():
+            self._memory.put(key, vector)
+        if self._directory and vectors:
+            self._write(vectors)
+
+    def stats(self) -> CacheStats:
+        """
+        Get a snapshot of the hit/miss counters.
+        :return:
+        """
+        with self._lock:
+            return self._stats.model_copy()
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache.
+    :return: The shared EmbeddingCache.
+    """
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
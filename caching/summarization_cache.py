@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config import SUMMARIZATION_CACHE_SIZE, SUMMARIZATION_CACHE_DIR
+from schemas import CacheStats
+from .memory import LRUCache
+
+
+class SummarizationCache:
+    """
+    Memoizes chunk summaries, keyed by the SHA-256 of the query and the chunk text.
+    A bounded in-memory LRU tier sits in front of an optional SQLite tier that
+    survives restarts. Hits and misses are counted so the saved inference is visible.
+    """
+
+    def __init__(
+        self,
+        max_items: int = SUMMARIZATION_CACHE_SIZE,
+        directory: Optional[str] = SUMMARIZATION_CACHE_DIR,
+    ):
+        self._memory: LRUCache[str, str] = LRUCache(max_items)
+        self._directory = directory
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+        if self._directory:
+            os.makedirs(self._directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS summaries ("
+                    "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(os.path.join(self._directory, "summaries.db"), timeout=30)
+        try:
+            with conn:  # commit on success, rollback on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(query: str, chunk: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(query.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, query: str, chunk: str) -> Optional[str]:
+        """
+        Get the memoized summary of a chunk.
+        :param query:
+        :param chunk:
+        :return: The summary, or None on a miss.
+        """
+        key = self.key(query, chunk)
+        summary = self._memory.get(key)
+        if summary is not None:
+            with self._lock:
+                self._stats.memory_hits += 1
+            return summary
+
+        if self._directory:
+            with self._connect() as conn:
+                row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._memory.put(key, row[0])
+                with self._lock:
+                    self._stats.disk_hits += 1
+                return row[0]
+
+        with self._lock:
+            self._stats.misses += 1
+        return None
+
+    def put(self, query: str, chunk: str, summary: str) -> None:
+        """
+        Memoize the summary of a chunk.
+        :param query:
+        :param chunk:
+        :param summary:
+        :return:
+        """
+        key = self.key(query, chunk)
+        self._memory.put(key, summary)
+        if self._directory:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                    (key, summary, time.time()),
+                )
+
+    def stats(self) -> CacheStats:
+        """
+        Get a snapshot of the hit/miss counters.
+        :return:
+        """
+        with self._lock:
+            return self._stats.model_copy()
+
+
+_summarization_cache: Optional[SummarizationCache] = None
+
+
+def get_summarization_cache() -> SummarizationCache:
+    """
+    Get the process-wide summarization cache.
+    :return: The shared SummarizationCache.
+    """
+    global _summarization_cache
+    if _summarization_cache is None:
+        _summarization_cache = SummarizationCache()
+    return _summarization_cache
@@ -5,6 +5,15 @@ from .environment import (
     OPENAI_API_BASE,
     LOCALLY_API_BASE,
     LOCALLY_API_KEY,
+    LOCALLY_API_CONNECT_TIMEOUT,
+    LOCALLY_EMBEDDINGS_TIMEOUT,
+    LOCALLY_RERANK_TIMEOUT,
+    LOCALLY_SUMMARIZE_TIMEOUT,
+    USE_BINARY_EMBEDDINGS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    USE_HTTP2,
     OPENAI_API_KEY,
     OPENAI_MODEL,
     OPENAI_EMBEDDING_MODEL,
@@ -12,8 +21,28 @@ from .environment import (
     OPENAI_MAX_TOKENS,
     MONGODB_URI,
     MONGODB_DATABASE,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
     QDRANT_DSN,
     QDRANT_COLLECTION,
+    QDRANT_PREFER_GRPC,
+    QDRANT_GRPC_PORT,
+    QDRANT_POOL_SIZE,
+    QDRANT_QUANTIZATION,
+    QDRANT_VECTORS_ON_DISK,
+    QDRANT_RESCORE,
+    QDRANT_OVERSAMPLING,
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_HNSW_EF,
+    QDRANT_TENANT_INDEX,
+    QDRANT_SHARD_BY_NAMESPACE,
+    USE_HYBRID_SEARCH,
+    HYBRID_PREFETCH_MULTIPLIER,
+    INGEST_BATCH_SIZE,
+    INGEST_QUEUE_SIZE,
+    QDRANT_UPLOAD_BATCH_SIZE,
+    QDRANT_UPLOAD_PARALLEL,
     USE_RERANKER,
     USE_CHAT_MEMORY,
     USE_ARXIV,
@@ -23,6 +52,30 @@ from .environment import (
     TAVILY_API_KEY,
     CRAWLER_ENGINE,
     FIRECRAWL_API_KEY,
+    CRAWLER_POOL_SIZE,
+    CRAWLER_MAX_PAGES_PER_BROWSER,
+    USE_CRAWL_CACHE,
+    CRAWL_CACHE_DIR,
+    CRAWL_CACHE_TTL,
+    CRAWL_CACHE_MAX_BYTES,
+    SUMMARIZATION_BATCH_SIZE,
+    SUMMARIZATION_MAX_CONCURRENCY,
+    EMBEDDINGS_BATCH_SIZE,
+    EMBEDDINGS_MAX_CONCURRENCY,
+    RERANK_BATCH_SIZE,
+    RERANK_MAX_CONCURRENCY,
+    USE_SUMMARIZATION_CACHE,
+    SUMMARIZATION_CACHE_SIZE,
+    SUMMARIZATION_CACHE_DIR,
+    USE_EMBEDDING_CACHE,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_DIR,
+    LLM_CONTEXT_WINDOW,
+    CONTEXT_RECENCY_WEIGHT,
+    CONTEXT_MIN_COVERAGE,
+    DEEP_SEARCH_MAX_PARALLELISM,
+    DEEP_SEARCH_SOURCE_TIMEOUT,
+    TRACE_EXPORT_DIR,
 )
 
 __all__ = [
@@ -32,6 +85,15 @@ __all__ = [
     "OPENAI_API_BASE",
     "LOCALLY_API_BASE",
     "LOCALLY_API_KEY",
+    "LOCALLY_API_CONNECT_TIMEOUT",
+    "LOCALLY_EMBEDDINGS_TIMEOUT",
+    "LOCALLY_RERANK_TIMEOUT",
+    "LOCALLY_SUMMARIZE_TIMEOUT",
+    "USE_BINARY_EMBEDDINGS",
+    "HTTP_MAX_CONNECTIONS",
+    "HTTP_MAX_KEEPALIVE_CONNECTIONS",
+    "HTTP_KEEPALIVE_EXPIRY",
+    "USE_HTTP2",
     "OPENAI_API_KEY",
     "OPENAI_MODEL",
     "OPENAI_EMBEDDING_MODEL",
@@ -39,8 +101,28 @@ __all__ = [
     "OPENAI_MAX_TOKENS",
     "MONGODB_URI",
     "MONGODB_DATABASE",
+    "MONGODB_MAX_POOL_SIZE",
+    "MONGODB_MIN_POOL_SIZE",
     "QDRANT_DSN",
     "QDRANT_COLLECTION",
+    "QDRANT_PREFER_GRPC",
+    "QDRANT_GRPC_PORT",
+    "QDRANT_POOL_SIZE",
+    "QDRANT_QUANTIZATION",
+    "QDRANT_VECTORS_ON_DISK",
+    "QDRANT_RESCORE",
+    "QDRANT_OVERSAMPLING",
+    "QDRANT_HNSW_M",
+    "QDRANT_HNSW_EF_CONSTRUCT",
+    "QDRANT_HNSW_EF",
+    "QDRANT_TENANT_INDEX",
+    "QDRANT_SHARD_BY_NAMESPACE",
+    "USE_HYBRID_SEARCH",
+    "HYBRID_PREFETCH_MULTIPLIER",
+    "INGEST_BATCH_SIZE",
+    "INGEST_QUEUE_SIZE",
+    "QDRANT_UPLOAD_BATCH_SIZE",
+    "QDRANT_UPLOAD_PARALLEL",
     "USE_RERANKER",
     "USE_CHAT_MEMORY",
     "USE_ARXIV",
@@ -50,4 +132,28 @@ __all__ = [
     "TAVILY_API_KEY",
     "CRAWLER_ENGINE",
     "FIRECRAWL_API_KEY",
+    "CRAWLER_POOL_SIZE",
+    "CRAWLER_MAX_PAGES_PER_BROWSER",
+    "USE_CRAWL_CACHE",
+    "CRAWL_CACHE_DIR",
+    "CRAWL_CACHE_TTL",
+    "CRAWL_CACHE_MAX_BYTES",
+    "SUMMARIZATION_BATCH_SIZE",
+    "SUMMARIZATION_MAX_CONCURRENCY",
+    "EMBEDDINGS_BATCH_SIZE",
+    "EMBEDDINGS_MAX_CONCURRENCY",
+    "RERANK_BATCH_SIZE",
+    "RERANK_MAX_CONCURRENCY",
+    "USE_SUMMARIZATION_CACHE",
+    "SUMMARIZATION_CACHE_SIZE",
+    "SUMMARIZATION_CACHE_DIR",
+    "USE_EMBEDDING_CACHE",
+    "EMBEDDING_CACHE_SIZE",
+    "EMBEDDING_CACHE_DIR",
+    "LLM_CONTEXT_WINDOW",
+    "CONTEXT_RECENCY_WEIGHT",
+    "CONTEXT_MIN_COVERAGE",
+    "DEEP_SEARCH_MAX_PARALLELISM",
+    "DEEP_SEARCH_SOURCE_TIMEOUT",
+    "TRACE_EXPORT_DIR",
 ]
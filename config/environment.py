@@ -17,6 +17,32 @@ if not OPENAI_API_KEY:
 LOCALLY_API_BASE = environ.get("LOCALLY_API_BASE", "http://localhost:8502")
 LOCALLY_API_KEY = environ.get("LOCALLY_API_KEY", "default")
 
+# Timeouts, in seconds, of each local model server endpoint (summarize also covers summarize/batch)
+LOCALLY_API_CONNECT_TIMEOUT = float(environ.get("LOCALLY_API_CONNECT_TIMEOUT", 5))
+LOCALLY_EMBEDDINGS_TIMEOUT = float(environ.get("LOCALLY_EMBEDDINGS_TIMEOUT", 60))
+LOCALLY_RERANK_TIMEOUT = float(environ.get("LOCALLY_RERANK_TIMEOUT", 60))
+LOCALLY_SUMMARIZE_TIMEOUT = float(environ.get("LOCALLY_SUMMARIZE_TIMEOUT", 60))
+if min(
+    LOCALLY_API_CONNECT_TIMEOUT,
+    LOCALLY_EMBEDDINGS_TIMEOUT,
+    LOCALLY_RERANK_TIMEOUT,
+    LOCALLY_SUMMARIZE_TIMEOUT,
+) <= 0:
+    raise ValueError("LOCALLY_*_TIMEOUT values must be greater than 0.")
+
+# Ask the model server for raw float32 embeddings instead of JSON (falls back to JSON on older servers)
+USE_BINARY_EMBEDDINGS = bool(environ.get("USE_BINARY_EMBEDDINGS", "true") == "true")
+
+# Connection pool shared by every HTTP client of the process (HTTP/2 needs the `h2` package and TLS)
+HTTP_MAX_CONNECTIONS = int(environ.get("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(environ.get("HTTP_KEEPALIVE_EXPIRY", 30)) # seconds an idle connection is kept
+USE_HTTP2 = bool(environ.get("USE_HTTP2", "true") == "true")
+if HTTP_MAX_CONNECTIONS < 1:
+    raise ValueError("HTTP_MAX_CONNECTIONS must be greater than 0.")
+if not 0 <= HTTP_MAX_KEEPALIVE_CONNECTIONS <= HTTP_MAX_CONNECTIONS:
+    raise ValueError("HTTP_MAX_KEEPALIVE_CONNECTIONS must be between 0 and HTTP_MAX_CONNECTIONS.")
+
 # Set the OpenAI API base URL
 OPENAI_API_BASE = environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
 
@@ -37,6 +63,13 @@ MONGODB_URI: Optional[MongoDsn] = environ.get("MONGODB_URI")
 MONGODB_DATABASE: Optional[str] = environ.get("MONGODB_DATABASE", PROJECT_NAME)
 if MONGODB_URI is None:
     raise ValueError("MONGODB_URI not found in environment variables.")
+# Connections of the process-wide MongoClient
+MONGODB_MAX_POOL_SIZE = int(environ.get("MONGODB_MAX_POOL_SIZE", 100))
+MONGODB_MIN_POOL_SIZE = int(environ.get("MONGODB_MIN_POOL_SIZE", 0)) # kept open while idle
+if MONGODB_MAX_POOL_SIZE < 1:
+    raise ValueError("MONGODB_MAX_POOL_SIZE must be greater than 0.")
+if not 0 <= MONGODB_MIN_POOL_SIZE <= MONGODB_MAX_POOL_SIZE:
+    raise ValueError("MONGODB_MIN_POOL_SIZE must be between 0 and MONGODB_MAX_POOL_SIZE.")
 #
 
 # Qdrant configuration
@@ -44,6 +77,56 @@ QDRANT_DSN: Optional[str] = environ.get("QDRANT_DSN", "http://localhost:6333")
 QDRANT_COLLECTION: Optional[str] = environ.get("QDRANT_COLLECTION", PROJECT_NAME)
 if QDRANT_DSN is None:
     raise ValueError("QDRANT_DSN not found in environment variables.")
+# Transport of the process-wide QdrantClient: gRPC is faster than REST for uploads and searches.
+# QDRANT_POOL_SIZE is the number of gRPC channels or REST connections (client default when unset).
+QDRANT_PREFER_GRPC = bool(environ.get("QDRANT_PREFER_GRPC", "false") == "true")
+QDRANT_GRPC_PORT = int(environ.get("QDRANT_GRPC_PORT", 6334))
+QDRANT_POOL_SIZE: Optional[int] = int(environ.get("QDRANT_POOL_SIZE") or 0) or None
+if QDRANT_POOL_SIZE is not None and QDRANT_POOL_SIZE < 0:
+    raise ValueError("QDRANT_POOL_SIZE must be greater than 0.")
+
+# Vector storage: quantized copies kept in RAM (scalar = int8, 4x smaller; binary = 1 bit, 32x smaller),
+# full-precision originals on disk for rescoring the top candidates, and the HNSW graph settings.
+# Apply them to an existing collection with `python migrate_cli.py`.
+QDRANT_QUANTIZATION = environ.get("QDRANT_QUANTIZATION", "scalar").lower()
+QDRANT_VECTORS_ON_DISK = bool(environ.get("QDRANT_VECTORS_ON_DISK", "true") == "true")
+QDRANT_RESCORE = bool(environ.get("QDRANT_RESCORE", "true") == "true")
+QDRANT_OVERSAMPLING = float(environ.get("QDRANT_OVERSAMPLING", 2.0)) # candidates rescored, times the limit
+QDRANT_HNSW_M = int(environ.get("QDRANT_HNSW_M", 16)) # edges per node; per-namespace graphs with QDRANT_TENANT_INDEX
+QDRANT_HNSW_EF_CONSTRUCT = int(environ.get("QDRANT_HNSW_EF_CONSTRUCT", 100))
+QDRANT_HNSW_EF = int(environ.get("QDRANT_HNSW_EF", 128)) # search-time beam width
+if QDRANT_QUANTIZATION not in ("none", "scalar", "binary"):
+    raise ValueError("QDRANT_QUANTIZATION must be one of none, scalar or binary.")
+if QDRANT_OVERSAMPLING < 1:
+    raise ValueError("QDRANT_OVERSAMPLING must be greater than or equal to 1.")
+if min(QDRANT_HNSW_M, QDRANT_HNSW_EF_CONSTRUCT, QDRANT_HNSW_EF) < 1:
+    raise ValueError("QDRANT_HNSW_* values must be greater than 0.")
+
+# Multitenancy: all namespaces (one per conversation) share the collection. With the tenant index,
+# points are stored grouped by namespace and every namespace gets its own HNSW graph instead of a
+# global one (QDRANT_HNSW_M becomes the `payload_m` of those graphs and the global `m` is 0), so a
+# search only walks the points of its namespace. Searches without a namespace filter are then
+# exhaustive scans; every search of this project is filtered. QDRANT_SHARD_BY_NAMESPACE also
+# gives every namespace its own shard (custom sharding, for distributed deployments); it can only be
+# changed by recreating the collection (`python migrate_cli.py --recreate`).
+QDRANT_TENANT_INDEX = bool(environ.get("QDRANT_TENANT_INDEX", "true") == "true")
+QDRANT_SHARD_BY_NAMESPACE = bool(environ.get("QDRANT_SHARD_BY_NAMESPACE", "false") == "true")
+
+# Hybrid retrieval: BM25 sparse vectors fused with the dense ones (RRF), each fetching
+# HYBRID_PREFETCH_MULTIPLIER times the requested limit before fusion
+USE_HYBRID_SEARCH = bool(environ.get("USE_HYBRID_SEARCH", "true") == "true")
+HYBRID_PREFETCH_MULTIPLIER = int(environ.get("HYBRID_PREFETCH_MULTIPLIER", 4))
+if HYBRID_PREFETCH_MULTIPLIER < 1:
+    raise ValueError("HYBRID_PREFETCH_MULTIPLIER must be greater than 0.")
+
+# Bulk ingestion: chunks per embed/upload batch, batches buffered between pipeline stages
+# (backpressure on the splitter), and points per Qdrant upload request with its upload workers
+INGEST_BATCH_SIZE = int(environ.get("INGEST_BATCH_SIZE", 256))
+INGEST_QUEUE_SIZE = int(environ.get("INGEST_QUEUE_SIZE", 4))
+QDRANT_UPLOAD_BATCH_SIZE = int(environ.get("QDRANT_UPLOAD_BATCH_SIZE", 64))
+QDRANT_UPLOAD_PARALLEL = int(environ.get("QDRANT_UPLOAD_PARALLEL", 1))
+if min(INGEST_BATCH_SIZE, INGEST_QUEUE_SIZE, QDRANT_UPLOAD_BATCH_SIZE, QDRANT_UPLOAD_PARALLEL) < 1:
+    raise ValueError("INGEST_* and QDRANT_UPLOAD_* values must be greater than 0.")
 #
 
 USE_RERANKER = bool(environ.get("USE_RERANKER", "true") == "true")
@@ -76,3 +159,74 @@ FIRECRAWL_API_KEY: Optional[str] = environ.get("FIRECRAWL_API_KEY")
 if CRAWLER_ENGINE == "firecrawl" and FIRECRAWL_API_KEY is None:
     raise ValueError("FIRECRAWL_API_KEY not found in environment variables.")
 
+# Local crawler browser pool
+CRAWLER_POOL_SIZE = int(environ.get("CRAWLER_POOL_SIZE", 4)) # browsers kept alive (and concurrent crawls)
+CRAWLER_MAX_PAGES_PER_BROWSER = int(environ.get("CRAWLER_MAX_PAGES_PER_BROWSER", 50)) # recycle after N pages
+if CRAWLER_POOL_SIZE < 1:
+    raise ValueError("CRAWLER_POOL_SIZE must be greater than 0.")
+if CRAWLER_MAX_PAGES_PER_BROWSER < 1:
+    raise ValueError("CRAWLER_MAX_PAGES_PER_BROWSER must be greater than 0.")
+
+# On-disk cache of crawled pages (markdown)
+USE_CRAWL_CACHE = bool(environ.get("USE_CRAWL_CACHE", "true") == "true")
+CRAWL_CACHE_DIR = environ.get("CRAWL_CACHE_DIR", "./data/crawl_cache")
+CRAWL_CACHE_TTL = int(environ.get("CRAWL_CACHE_TTL", 24 * 60 * 60)) # seconds before an entry must be revalidated
+CRAWL_CACHE_MAX_BYTES = int(environ.get("CRAWL_CACHE_MAX_BYTES", 512 * 1024 * 1024)) # LRU eviction above this size
+
+# Chunk summarization: chunks per /summarize/batch request and requests in flight per document
+SUMMARIZATION_BATCH_SIZE = int(environ.get("SUMMARIZATION_BATCH_SIZE", 8))
+SUMMARIZATION_MAX_CONCURRENCY = int(environ.get("SUMMARIZATION_MAX_CONCURRENCY", 2))
+if not 1 <= SUMMARIZATION_BATCH_SIZE <= 64:
+    raise ValueError("SUMMARIZATION_BATCH_SIZE must be between 1 and 64.")
+if SUMMARIZATION_MAX_CONCURRENCY < 1:
+    raise ValueError("SUMMARIZATION_MAX_CONCURRENCY must be greater than 0.")
+
+# Auto-batching of large inputs: items sent per /embeddings and /rerank request (at most 100)
+# and requests in flight per call
+EMBEDDINGS_BATCH_SIZE = int(environ.get("EMBEDDINGS_BATCH_SIZE", 100))
+EMBEDDINGS_MAX_CONCURRENCY = int(environ.get("EMBEDDINGS_MAX_CONCURRENCY", 2))
+RERANK_BATCH_SIZE = int(environ.get("RERANK_BATCH_SIZE", 100))
+RERANK_MAX_CONCURRENCY = int(environ.get("RERANK_MAX_CONCURRENCY", 2))
+if not 1 <= EMBEDDINGS_BATCH_SIZE <= 100 or not 1 <= RERANK_BATCH_SIZE <= 100:
+    raise ValueError("EMBEDDINGS_BATCH_SIZE and RERANK_BATCH_SIZE must be between 1 and 100.")
+if EMBEDDINGS_MAX_CONCURRENCY < 1 or RERANK_MAX_CONCURRENCY < 1:
+    raise ValueError("EMBEDDINGS_MAX_CONCURRENCY and RERANK_MAX_CONCURRENCY must be greater than 0.")
+
+# Memoized chunk summaries (in-memory LRU, plus SQLite when a directory is set)
+USE_SUMMARIZATION_CACHE = bool(environ.get("USE_SUMMARIZATION_CACHE", "true") == "true")
+SUMMARIZATION_CACHE_SIZE = int(environ.get("SUMMARIZATION_CACHE_SIZE", 4096)) # summaries kept in memory
+SUMMARIZATION_CACHE_DIR: Optional[str] = environ.get("SUMMARIZATION_CACHE_DIR") or None # e.g. ./data/summaries
+if SUMMARIZATION_CACHE_SIZE < 1:
+    raise ValueError("SUMMARIZATION_CACHE_SIZE must be greater than 0.")
+
+# Memoized text embeddings (in-memory LRU, plus a memory-mapped float32 matrix when a directory is set)
+USE_EMBEDDING_CACHE = bool(environ.get("USE_EMBEDDING_CACHE", "true") == "true")
+EMBEDDING_CACHE_SIZE = int(environ.get("EMBEDDING_CACHE_SIZE", 16384)) # vectors kept in memory (4 KiB each at 1024 dims)
+EMBEDDING_CACHE_DIR: Optional[str] = environ.get("EMBEDDING_CACHE_DIR") or None # e.g. ./data/embeddings
+if EMBEDDING_CACHE_SIZE < 1:
+    raise ValueError("EMBEDDING_CACHE_SIZE must be greater than 0.")
+
+# Context packing: prompt window of the served LLM (vLLM --max-model-len), weight of recency
+# against rerank relevance, and the share of tokens a selection must keep before map-reduce kicks in
+LLM_CONTEXT_WINDOW = int(environ.get("LLM_CONTEXT_WINDOW", 15000))
+CONTEXT_RECENCY_WEIGHT = float(environ.get("CONTEXT_RECENCY_WEIGHT", 0.3))
+CONTEXT_MIN_COVERAGE = float(environ.get("CONTEXT_MIN_COVERAGE", 0.5))
+if LLM_CONTEXT_WINDOW <= OPENAI_MAX_TOKENS:
+    raise ValueError("LLM_CONTEXT_WINDOW must be greater than OPENAI_MAX_TOKENS.")
+if not 0 <= CONTEXT_RECENCY_WEIGHT <= 1:
+    raise ValueError("CONTEXT_RECENCY_WEIGHT must be between 0 and 1.")
+if not 0 <= CONTEXT_MIN_COVERAGE <= 1:
+    raise ValueError("CONTEXT_MIN_COVERAGE must be between 0 and 1.")
+
+# Deep search concurrency (1 = run sub-queries serially)
+DEEP_SEARCH_MAX_PARALLELISM = int(environ.get("DEEP_SEARCH_MAX_PARALLELISM", 4))
+if DEEP_SEARCH_MAX_PARALLELISM < 1:
+    raise ValueError("DEEP_SEARCH_MAX_PARALLELISM must be greater than 0.")
+
+# Seconds each deep search source (search engine, arXiv, ...) may take per sub-query
+DEEP_SEARCH_SOURCE_TIMEOUT = float(environ.get("DEEP_SEARCH_SOURCE_TIMEOUT", 90))
+if DEEP_SEARCH_SOURCE_TIMEOUT <= 0:
+    raise ValueError("DEEP_SEARCH_SOURCE_TIMEOUT must be greater than 0.")
+
+# Write the trace of every deep search run as JSON to this directory (unset = keep in memory only)
+TRACE_EXPORT_DIR: Optional[str] = environ.get("TRACE_EXPORT_DIR") or None # e.g. ./data/traces
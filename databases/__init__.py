@@ -7,21 +7,6 @@ from .qdrant import Qdrant
 _db: Optional[MongoDB] = None
 
 
-class Instance:
-    """
-    Base class for singleton instances.
-    """
-    init: bool = False
-    def __init__(self):
-        if not self.init:
-            Qdrant().initialize()   # Initialize Qdrant
-            MongoDB().initialize()  # Initialize MongoDB
-            self.init = True
-        else:
-            raise Exception("Instance already initialized.")
-
-Instance() # Initialize the singleton instance
-
 def get_db() -> MongoDB:
     """
     Returns the singleton instance of MongoDB.
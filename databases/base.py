@@ -1,125 +1,488 @@
+import threading
+import time
 from abc import ABC
 from typing import TypeVar, Optional, Type
 from uuid import uuid4
 
+import numpy as np
 from pydantic import BaseModel
 from pymongo import MongoClient
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance, FilterSelector, FieldCondition,
     MatchValue, Filter, VectorParams,
-    PointStruct, PointsSelector
+    PointStruct, PointsSelector,
+    SparseVectorParams, Modifier,
+    Prefetch, FusionQuery, Fusion,
+    HnswConfigDiff, VectorParamsDiff, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig, Disabled,
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation,
+    KeywordIndexParams, KeywordIndexType, PayloadSchemaType,
+    ShardingMethod, CollectionParams,
 )
+from qdrant_client.http.exceptions import UnexpectedResponse
 
-from config import QDRANT_DSN, QDRANT_COLLECTION
-from config.environment import MONGODB_URI, MONGODB_DATABASE
+from config import (
+    QDRANT_COLLECTION,
+    USE_HYBRID_SEARCH,
+    HYBRID_PREFETCH_MULTIPLIER,
+    QDRANT_QUANTIZATION,
+    QDRANT_VECTORS_ON_DISK,
+    QDRANT_RESCORE,
+    QDRANT_OVERSAMPLING,
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_HNSW_EF,
+    QDRANT_TENANT_INDEX,
+    QDRANT_SHARD_BY_NAMESPACE,
+)
+from config.environment import MONGODB_DATABASE
+from loggings import logger
 from schemas import UpsertSchema, QueryResultSchema, MetadataSchema
+from schemas.vectordb_schema import new_point_id
+from .clients import get_qdrant_client, get_mongo_client
+from .sparse import BM25Encoder
+
+SPARSE_VECTOR = "bm25"
 
 _T = TypeVar("_T", bound=BaseModel)
 
 
 class BaseMongoDB(ABC):
-    def __init__(self):
-        self._client = MongoClient(MONGODB_URI,  uuidRepresentation="standard")
+    # Databases whose indexes were verified by this process
+    _initialized: set[str] = set()
+    _initialize_lock = threading.Lock()
+
+    def __init__(self, client: Optional[MongoClient] = None):
+        self._client = client or get_mongo_client()
 
     def initialize(self) -> None:
         conversations = self._client[MONGODB_DATABASE].get_collection("conversations")
         conversations.create_index("namespace")
         conversations.create_index("id", unique=True)
 
+    def ensure_initialized(self) -> None:
+        """
+        Initialize the database on first use, once per process.
+        :return:
+        """
+        if MONGODB_DATABASE in BaseMongoDB._initialized:
+            return
+        with BaseMongoDB._initialize_lock:
+            if MONGODB_DATABASE not in BaseMongoDB._initialized:
+                self.initialize()
+                BaseMongoDB._initialized.add(MONGODB_DATABASE)
+
     def findOne(self, collection: str, filters: dict, T: Optional[Type[_T]] = None) -> Optional[_T | dict]:
+        self.ensure_initialized()
         result = self._client[MONGODB_DATABASE].get_collection(collection).find_one(filters)
         if result is None:
             return None
         return T(**result) if T else result
 
     def find(self, collection: str, filters: dict, T: Optional[Type[_T]] = None, limit: int = 25) -> list[_T | dict]:
+        self.ensure_initialized()
         result = self._client[MONGODB_DATABASE].get_collection(collection).find(filters).limit(limit)
         return [T(**r) for r in result] if T else list(result)
 
     def insertOne(self, collection: str, payload: _T | dict, T: Optional[Type[_T]] = None) -> None:
+        self.ensure_initialized()
         if not isinstance(payload, dict):
             payload = payload.model_dump()
         self._client[MONGODB_DATABASE].get_collection(collection).insert_one(payload)
 
     def updateOne(self, collection: str, payload: Type[_T] | dict, filters: dict) -> None:
+        self.ensure_initialized()
         if not isinstance(payload, dict):
             payload = payload.model_dump()
         self._client[MONGODB_DATABASE].get_collection(collection).update_one(filters, {"$set": payload})
 
     def deleteOne(self, collection: str, filters: dict) -> None:
+        self.ensure_initialized()
         self._client[MONGODB_DATABASE].get_collection(collection).delete_one(filters)
 
 
 
 class BaseQdrant(ABC):
-    def __init__(self, namespace: Optional[str] = None):
+    # The schema of each collection, fetched once per process
+    _collection_params: dict[str, CollectionParams] = {}
+    # Shard keys known to exist, as (collection, namespace)
+    _shard_keys: set[tuple[str, str]] = set()
+    # Collections whose schema was verified by this process
+    _initialized: set[str] = set()
+    _initialize_lock = threading.Lock()
+
+    def __init__(self, namespace: Optional[str] = None, client: Optional[QdrantClient] = None):
         self._namespace = namespace or str(uuid4())
-        self._client = QdrantClient(QDRANT_DSN)
+        self._client = client or get_qdrant_client()
         self._collection = QDRANT_COLLECTION
+        self._encoder = BM25Encoder()
 
-    def initialize(self) -> None:
-        if self._client.collection_exists(self._collection):
-            return # Collection already exists
+    @staticmethod
+    def _quantization() -> Optional[ScalarQuantization | BinaryQuantization]:
+        match QDRANT_QUANTIZATION:
+            case "scalar":
+                return ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True),
+                )
+            case "binary":
+                return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+            case _:
+                return None
 
-        # Create a new collection
+    @staticmethod
+    def _search_params() -> SearchParams:
+        return SearchParams(
+            hnsw_ef=QDRANT_HNSW_EF,
+            quantization=QuantizationSearchParams(
+                rescore=QDRANT_RESCORE,
+                oversampling=QDRANT_OVERSAMPLING,
+            ) if QDRANT_QUANTIZATION != "none" else None,
+        )
+
+    @staticmethod
+    def _hnsw_config() -> HnswConfigDiff:
+        return HnswConfigDiff(
+            # With the tenant index, only per-namespace graphs (payload_m) and no global one, so
+            # QDRANT_HNSW_M sizes those graphs: every search is filtered by namespace
+            m=0 if QDRANT_TENANT_INDEX else QDRANT_HNSW_M,
+            payload_m=QDRANT_HNSW_M,
+            ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+        )
+
+    def _create_payload_indexes(self, collection: str) -> None:
+        # Namespace of the points, the tenant of the collection
+        self._client.create_payload_index(
+            collection_name=collection,
+            field_name="namespace",
+            field_schema=KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=QDRANT_TENANT_INDEX),
+        )
+        # Deletes by document ID
+        self._client.create_payload_index(
+            collection_name=collection,
+            field_name="document_id",
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+
+    def _create(self, collection: str) -> None:
+        """
+        Create a collection with the configured schema, storage and index settings.
+        :param collection:
+        :return:
+        """
         self._client.create_collection(
-            collection_name=self._collection,
+            collection_name=collection,
             vectors_config=VectorParams(
                 size=1024, # Dim size based jina-embeddings-v3
                 distance=Distance.DOT,
-            )
-        )
-        #
-        # Create a payload index for the namespace
-        self._client.create_payload_index(
-            collection_name=self._collection,
-            field_name="namespace",
-            field_schema="keyword",
+                on_disk=QDRANT_VECTORS_ON_DISK,
+            ),
+            # BM25 term frequencies, weighted by the collection IDF at query time
+            sparse_vectors_config={
+                SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF),
+            } if USE_HYBRID_SEARCH else None,
+            hnsw_config=self._hnsw_config(),
+            quantization_config=self._quantization(),
+            sharding_method=ShardingMethod.CUSTOM if QDRANT_SHARD_BY_NAMESPACE else None,
         )
-        #
+        self._create_payload_indexes(collection)
+
+    def initialize(self) -> None:
+        if self._client.collection_exists(self._collection):
+            return # Collection already exists
+        if any(a.alias_name == self._collection for a in self._client.get_aliases().aliases):
+            return # Collection already exists behind an alias (see `migrate`)
+
+        # Create a new collection
+        self._create(self._collection)
+        BaseQdrant._collection_params.pop(self._collection, None)
+
+    def ensure_initialized(self) -> None:
+        """
+        Initialize the collection on first use, once per process.
+        :return:
+        """
+        if self._collection in BaseQdrant._initialized:
+            return
+        with BaseQdrant._initialize_lock:
+            if self._collection not in BaseQdrant._initialized:
+                self.initialize()
+                BaseQdrant._initialized.add(self._collection)
+
+    def migrate(self, recreate: bool = False, batch_size: int = 256) -> None:
+        """
+        Bring an existing collection to the configured settings.
+        Quantization, on-disk storage, HNSW settings and payload indexes are updated in place;
+        Qdrant rebuilds the index in the background while the collection keeps serving.
+        Missing sparse vectors and the sharding method cannot be changed in place: with `recreate`,
+        every point is copied into a new collection with the current schema (computing its BM25
+        vector from the text), the configured name becomes an alias of the new collection, and the
+        old one is dropped.
+        Writers must be stopped while recreating: points written during the copy are not carried
+        over. The copy is aborted (and the new collection dropped) when the point count of the old
+        collection changed meanwhile, but updates and deletes of existing points go unnoticed.
+        Searches fail between dropping the old collection and creating the alias, unless the
+        configured name already is an alias (from an earlier migration), which is swapped atomically.
+        :param recreate:
+        :param batch_size: Points copied per request when recreating.
+        :return:
+        """
+        self.ensure_initialized()
+        if not recreate:
+            quantization = self._quantization()
+            self._client.update_collection(
+                collection_name=self._collection,
+                vectors_config={"": VectorParamsDiff(on_disk=QDRANT_VECTORS_ON_DISK)},
+                hnsw_config=self._hnsw_config(),
+                quantization_config=quantization if quantization is not None else Disabled.DISABLED,
+            )
+            self._create_payload_indexes(self._collection)
+            if self.sharded != QDRANT_SHARD_BY_NAMESPACE:
+                logger(
+                    f"Collection '{self._collection}' sharding does not match QDRANT_SHARD_BY_NAMESPACE. "
+                    "Recreate it to change the sharding.",
+                    "warning"
+                )
+            logger(f"Collection '{self._collection}' updated in place.", "info")
+            return
+
+        aliases = {a.alias_name: a.collection_name for a in self._client.get_aliases().aliases}
+        source = aliases.get(self._collection, self._collection)
+        target = f"{self._collection}-{int(time.time())}"
+        self._create(target)
+
+        copied = 0
+        offset = None
+        while True:
+            points, offset = self._client.scroll(
+                collection_name=source,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                by_namespace: dict[str, list[PointStruct]] = {}
+                for p in points:
+                    by_namespace.setdefault(p.payload["namespace"], []).append(
+                        PointStruct(
+                            id=p.id,
+                            vector=self._vector_struct(
+                                p.vector[""] if isinstance(p.vector, dict) else p.vector,
+                                p.payload["text"],
+                                USE_HYBRID_SEARCH,
+                            ),
+                            payload=p.payload,
+                        )
+                    )
+                for namespace, structs in by_namespace.items():
+                    if QDRANT_SHARD_BY_NAMESPACE:
+                        self._create_shard_key(target, namespace)
+                    self._client.upsert(
+                        collection_name=target,
+                        points=structs,
+                        shard_key_selector=namespace if QDRANT_SHARD_BY_NAMESPACE else None,
+                    )
+                copied += len(points)
+            if offset is None:
+                break
+
+        if (count := self._client.count(source, exact=True).count) != copied:
+            self._client.delete_collection(target)
+            raise RuntimeError(
+                f"Collection '{source}' has {count} points but {copied} were copied: it was written to "
+                "during the migration. Stop the writers and migrate again."
+            )
+        if self._collection in aliases:
+            self._client.update_collection_aliases(change_aliases_operations=[
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self._collection)),
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=self._collection)),
+            ])
+        else:
+            self._client.delete_collection(source)
+            self._client.update_collection_aliases(change_aliases_operations=[
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=self._collection)),
+            ])
+        if source != self._collection and self._client.collection_exists(source):
+            self._client.delete_collection(source)
+        BaseQdrant._collection_params.pop(self._collection, None)
+        logger(f"Collection '{self._collection}' recreated as '{target}' with {copied} points.", "info")
+
+    @property
+    def hybrid(self) -> bool:
+        """
+        Whether points carry BM25 sparse vectors and queries fuse them with the dense ones.
+        Collections created before hybrid search have no sparse vectors and stay dense-only.
+        :return:
+        """
+        if not USE_HYBRID_SEARCH:
+            return False
+        return SPARSE_VECTOR in (self._params().sparse_vectors or {})
+
+    @property
+    def sharded(self) -> bool:
+        """
+        Whether every namespace lives in its own shard (custom sharding, keyed by namespace).
+        :return:
+        """
+        return self._params().sharding_method == ShardingMethod.CUSTOM
+
+    def _params(self) -> CollectionParams:
+        params = BaseQdrant._collection_params.get(self._collection)
+        if params is None:
+            params = self._client.get_collection(self._collection).config.params
+            if USE_HYBRID_SEARCH and SPARSE_VECTOR not in (params.sparse_vectors or {}):
+                logger(
+                    f"Collection '{self._collection}' has no '{SPARSE_VECTOR}' sparse vectors, "
+                    "falling back to dense search. Recreate it to enable hybrid search.",
+                    "warning"
+                )
+            BaseQdrant._collection_params[self._collection] = params
+        return params
+
+    def _create_shard_key(self, collection: str, namespace: str) -> None:
+        if (collection, namespace) in BaseQdrant._shard_keys:
+            return
+        try:
+            self._client.create_shard_key(collection_name=collection, shard_key=namespace)
+        except UnexpectedResponse as e:
+            if "already exists" not in str(e):
+                raise
+        BaseQdrant._shard_keys.add((collection, namespace))
+
+    def _shard_key(self) -> Optional[str]:
+        """
+        The shard key selector of the namespace, creating its shard on first use.
+        :return: None when the collection is not sharded by namespace.
+        """
+        if not self.sharded:
+            return None
+        self._create_shard_key(self._collection, self._namespace)
+        return self._namespace
+
+    def _vector_struct(self, vector: list[float], text: str, hybrid: bool) -> list[float] | dict:
+        if not hybrid:
+            return vector
+        return {"": vector, SPARSE_VECTOR: self._encoder.encode_document(text)}
+
+    def _point_vector(self, vector: list[float], text: str) -> list[float] | dict:
+        return self._vector_struct(vector, text, self.hybrid)
 
     def upsert(self, data: list[UpsertSchema]) -> None:
+        self.ensure_initialized()
         self._client.upsert(
             collection_name=self._collection,
             points=[
                 PointStruct(
                     id=d.id,
-                    vector=d.vector,
+                    vector=self._point_vector(d.vector, d.metadata.text),
                     payload=d.metadata.model_dump(),
                 )
                 for d in data
             ],
+            shard_key_selector=self._shard_key(),
+        )
+
+    def upload(
+        self,
+        vectors: np.ndarray,
+        metadata: list[MetadataSchema],
+        ids: Optional[list[int]] = None,
+        batch_size: int = 64,
+        parallel: int = 1,
+    ) -> None:
+        """
+        Bulk upload points, `batch_size` per request with `parallel` upload workers.
+        Without hybrid search, vectors are passed as an array, without building a PointStruct per point.
+        :param vectors: Array of shape (len(metadata), dim).
+        :param metadata:
+        :param ids: The ID of each point. Generated when not set.
+        :param batch_size:
+        :param parallel:
+        :return:
+        """
+        self.ensure_initialized()
+        if self.hybrid:
+            vectors = [self._point_vector(v.tolist(), m.text) for v, m in zip(vectors, metadata)]
+        self._client.upload_collection(
+            collection_name=self._collection,
+            vectors=vectors,
+            payload=[m.model_dump() for m in metadata],
+            ids=ids or [new_point_id() for _ in metadata],
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=True,
+            shard_key_selector=self._shard_key(),
         )
 
-    def query(self, vector: list[float], with_metadata: bool = True, limit: int = 10) -> list[QueryResultSchema]:
+    def query(
+        self,
+        vector: list[float],
+        with_metadata: bool = True,
+        limit: int = 10,
+        text: Optional[str] = None,
+    ) -> list[QueryResultSchema]:
+        """
+        Search the namespace for the nearest points.
+        With hybrid search and the query `text`, the dense and BM25 candidates are fused by
+        reciprocal rank (RRF), so scores are fusion scores rather than similarities.
+        :param vector: The dense query vector.
+        :param with_metadata:
+        :param limit:
+        :param text: The query text, for the BM25 retriever.
+        :return:
+        """
+        self.ensure_initialized()
+        namespace = Filter(must=[FieldCondition(key="namespace", match=MatchValue(value=self._namespace))])
+        sparse = self._encoder.encode_query(text) if text and self.hybrid else None
+        if sparse is not None and sparse.indices:
+            prefetch_limit = limit * HYBRID_PREFETCH_MULTIPLIER
+            response = self._client.query_points(
+                collection_name=self._collection,
+                prefetch=[
+                    Prefetch(query=vector, filter=namespace, params=self._search_params(), limit=prefetch_limit),
+                    Prefetch(query=sparse, using=SPARSE_VECTOR, filter=namespace, limit=prefetch_limit),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                query_filter=namespace,
+                with_payload=with_metadata,
+                limit=limit,
+                shard_key_selector=self._shard_key(),
+            )
+        else:
+            response = self._client.query_points(
+                collection_name=self._collection,
+                query=vector,
+                query_filter=namespace,
+                search_params=self._search_params(),
+                with_payload=with_metadata,
+                limit=limit,
+                shard_key_selector=self._shard_key(),
+            )
         return [
             QueryResultSchema(
                 id=r.id,
                 score=r.score,
                 metadata=MetadataSchema(**r.payload),
             )
-            for r in self._client.query_points(
-                collection_name=self._collection,
-                query=vector,
-                query_filter=Filter(must=[FieldCondition(key="namespace", match=MatchValue(value=self._namespace))]),
-                with_payload=with_metadata,
-                limit=limit,
-            ).points
+            for r in response.points
         ]
 
     def delete(self, ids: Optional[list[int]] = None, key: Optional[str] = None, value: Optional[str] = None) -> None:
         """
-        Delete points from the collection based on IDs or key-value pairs.
+        Delete points of the namespace based on IDs or key-value pairs.
         :param ids:
         :param key:
         :param value:
         :return:
         """
+        self.ensure_initialized()
         if ids is not None:
             self._client.delete(
                 collection_name=self._collection,
                 points_selector=PointsSelector(ids),
+                shard_key_selector=self._shard_key(),
             )
         elif (
             key is not None and
@@ -130,13 +493,18 @@ class BaseQdrant(ABC):
                 points_selector=FilterSelector(
                     filter=Filter(
                         must=[
+                            FieldCondition(
+                                key="namespace",
+                                match=MatchValue(value=self._namespace),
+                            ),
                             FieldCondition(
                                 key=key,
                                 match=MatchValue(value=value),
-                            )
+                            ),
                         ],
                     )
                 ),
+                shard_key_selector=self._shard_key(),
             )
 
     @property
@@ -0,0 +1,68 @@
+import atexit
+import threading
+from typing import Optional
+
+from pymongo import MongoClient
+from qdrant_client import QdrantClient
+
+from config import (
+    QDRANT_DSN,
+    QDRANT_PREFER_GRPC,
+    QDRANT_GRPC_PORT,
+    QDRANT_POOL_SIZE,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+)
+from config.environment import MONGODB_URI
+
+_qdrant_client: Optional[QdrantClient] = None
+_mongo_client: Optional[MongoClient] = None
+_lock = threading.Lock()
+
+
+def get_qdrant_client() -> QdrantClient:
+    """
+    Get the Qdrant client shared by every Qdrant instance of the process.
+    It keeps a pool of gRPC channels (QDRANT_PREFER_GRPC) or REST connections open, so creating a
+    Qdrant for every search does not open new connections. The client is closed when the interpreter exits.
+    :return: The shared QdrantClient.
+    """
+    global _qdrant_client
+    if _qdrant_client is None:
+        with _lock:
+            if _qdrant_client is None:
+                _qdrant_client = QdrantClient(
+                    QDRANT_DSN,
+                    prefer_grpc=QDRANT_PREFER_GRPC,
+                    grpc_port=QDRANT_GRPC_PORT,
+                    pool_size=QDRANT_POOL_SIZE,
+                )
+    return _qdrant_client
+
+
+def get_mongo_client() -> MongoClient:
+    """
+    Get the MongoDB client shared by every MongoDB instance of the process.
+    MongoClient is thread-safe and pools up to MONGODB_MAX_POOL_SIZE connections per server.
+    The client is closed when the interpreter exits.
+    :return: The shared MongoClient.
+    """
+    global _mongo_client
+    if _mongo_client is None:
+        with _lock:
+            if _mongo_client is None:
+                _mongo_client = MongoClient(
+                    MONGODB_URI,
+                    uuidRepresentation="standard",
+                    maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                    minPoolSize=MONGODB_MIN_POOL_SIZE,
+                )
+    return _mongo_client
+
+
+@atexit.register
+def _close_clients() -> None:
+    if _qdrant_client is not None:
+        _qdrant_client.close()
+    if _mongo_client is not None:
+        _mongo_client.close()
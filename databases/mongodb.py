@@ -1,6 +1,7 @@
 from typing import Optional, TypeVar, Type
 
 from pydantic import BaseModel
+from pymongo import MongoClient
 
 from .base import BaseMongoDB
 
@@ -8,8 +9,8 @@ _T = TypeVar("_T", bound=BaseModel)
 
 
 class MongoDB(BaseMongoDB):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, client: Optional[MongoClient] = None):
+        super().__init__(client)
 
     def findOne(self, collection: str, filters: Optional[dict] = None, T: Optional[Type[_T]] = None) -> Optional[_T | dict]:
         return super().findOne(collection, filters or {}, T)
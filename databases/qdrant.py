@@ -1,18 +1,40 @@
 from typing import Optional
 
-from schemas import QueryResultSchema, UpsertSchema
+import numpy as np
+from qdrant_client import QdrantClient
+
+from schemas import QueryResultSchema, UpsertSchema, MetadataSchema
 from .base import BaseQdrant
 
 
 class Qdrant(BaseQdrant):
-    def __init__(self, namespace: Optional[str] = None):
-        super().__init__(namespace)
+    def __init__(self, namespace: Optional[str] = None, client: Optional[QdrantClient] = None):
+        super().__init__(namespace, client)
+
+    def migrate(self, recreate: bool = False, batch_size: int = 256) -> None:
+        super().migrate(recreate=recreate, batch_size=batch_size)
 
     def upsert(self, data: list[UpsertSchema]) -> None:
         super().upsert(data)
 
-    def query(self, vector: list[float], with_metadata: bool = True, limit: int = 10) -> list[QueryResultSchema]:
-        return super().query(vector, with_metadata=with_metadata, limit=limit)
+    def upload(
+        self,
+        vectors: np.ndarray,
+        metadata: list[MetadataSchema],
+        ids: Optional[list[int]] = None,
+        batch_size: int = 64,
+        parallel: int = 1,
+    ) -> None:
+        super().upload(vectors, metadata, ids=ids, batch_size=batch_size, parallel=parallel)
+
+    def query(
+        self,
+        vector: list[float],
+        with_metadata: bool = True,
+        limit: int = 10,
+        text: Optional[str] = None,
+    ) -> list[QueryResultSchema]:
+        return super().query(vector, with_metadata=with_metadata, limit=limit, text=text)
 
     def delete(self, ids: Optional[list[int]] = None, key: Optional[str] = None, value: Optional[str] = None) -> None:
         super().delete(ids, key, value)
@@ -0,0 +1,67 @@
+import hashlib
+import re
+from collections import Counter
+
+from qdrant_client.models import SparseVector
+
+# Words, keeping identifiers such as "gpt-4o", "2401.12345" or "jina-embeddings-v3" whole
+_TOKEN = re.compile(r"\w+(?:[.\-]\w+)*")
+_PART = re.compile(r"[.\-]")
+
+
+class BM25Encoder:
+    """
+    Encodes texts as BM25 sparse vectors for Qdrant.
+    Tokens are hashed into the 32-bit index space, so no vocabulary has to be stored. Document
+    vectors hold the saturated term frequency; the IDF factor is applied by Qdrant at query time
+    (sparse vector `modifier=IDF`), from the statistics of the whole collection.
+    """
+    K1 = 1.2
+    B = 0.75
+    AVG_LENGTH = 160 # tokens in an average 1000-character chunk
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """
+        Lowercase the words of a text. Compound identifiers are kept whole and also split into
+        their parts, so "jina-embeddings-v3" matches both itself and "embeddings".
+        :param text:
+        :return:
+        """
+        tokens = []
+        for token in _TOKEN.findall(text.lower()):
+            tokens.append(token)
+            if _PART.search(token):
+                tokens.extend(part for part in _PART.split(token) if part)
+        return tokens
+
+    @staticmethod
+    def _index(token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+    def _vector(self, weights: dict[int, float]) -> SparseVector:
+        indices = sorted(weights)
+        return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+    def encode_document(self, text: str) -> SparseVector:
+        """
+        Encode a document (a chunk) for indexing.
+        :param text:
+        :return:
+        """
+        tokens = self.tokenize(text)
+        norm = self.K1 * (1 - self.B + self.B * len(tokens) / self.AVG_LENGTH)
+        weights: dict[int, float] = {}
+        for token, tf in Counter(tokens).items():
+            index = self._index(token)
+            weights[index] = weights.get(index, 0.0) + tf * (self.K1 + 1) / (tf + norm)
+        return self._vector(weights)
+
+    def encode_query(self, text: str) -> SparseVector:
+        """
+        Encode a query. Every distinct term weighs 1, so the score is the sum of the
+        IDF-weighted document term frequencies, as in BM25.
+        :param text:
+        :return:
+        """
+        return self._vector({self._index(token): 1.0 for token in self.tokenize(text)})
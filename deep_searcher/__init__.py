@@ -1 +1,3 @@
-from .agent_deep_search import AgentDeepSearch
\ No newline at end of file
+from .agent_deep_search import AgentDeepSearch
+from .chunks import ChunkStore
+from .context_packer import ContextPacker
@@ -0,0 +1,33 @@
+import threading
+from typing import Optional
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from async_runtime import ContextThreadPoolExecutor
+
+
+def _attach_script_run_ctx(ctx) -> None:
+    """
+    Attach the Streamlit script context to the current worker thread,
+    so `logger(..., ui=...)` calls made from workers still reach the UI.
+    :param ctx:
+    :return:
+    """
+    if ctx is not None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+
+def thread_pool(max_workers: int, name: Optional[str] = None) -> ContextThreadPoolExecutor:
+    """
+    Create a thread pool whose workers inherit the caller's Streamlit script context.
+    Each task also runs in a copy of the submitter's context variables, so spans nest under the active trace.
+    :param max_workers: The maximum number of worker threads.
+    :param name: The thread name prefix.
+    :return: A ContextThreadPoolExecutor.
+    """
+    return ContextThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix=name or "deep-search",
+        initializer=_attach_script_run_ctx,
+        initargs=(get_script_run_ctx(suppress_warning=True),),
+    )
@@ -1,7 +1,14 @@
-from typing import Optional
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
 
 from streamlit.delta_generator import DeltaGenerator
 
+from config import DEEP_SEARCH_MAX_PARALLELISM, DEEP_SEARCH_SOURCE_TIMEOUT, USE_RERANKER, TRACE_EXPORT_DIR
 from exceptions import (
     GenerativeError,
     SearchEngineError,
@@ -11,12 +18,29 @@ from exceptions import (
     SemanticUpsertError
 )
 from loggings import logger
-from schemas import ReflectionResultSchema
+from prompt_engineering import SUMMARIZER_PROMPT, REFLECT_PROMPT
+from schemas import ReflectionResultSchema, DeepSearchEvent
 from researchers import SemanticSearch, SearchEngine, ArxivSearch
+from researchers.base import BaseSearchService
+from tracing import Trace, current_trace, span, trace, traced
 from .base import DeepSearch
+from .context_packer import ContextPacker
+from ._concurrency import thread_pool
+from llm import get_reranker
 from llm.base import BaseLLM
 
 
+class _Cancelled(BaseException):
+    """
+    Raised in the workers of a `stream` run whose consumer stopped reading.
+    A BaseException, so the `except Exception` handlers of the sources do not swallow it.
+    """
+
+
+# Set by the consumer of a `stream` run when it stops reading; inherited by the worker threads of the run
+_cancelled: ContextVar[Optional[threading.Event]] = ContextVar("deep_search_cancelled", default=None)
+
+
 class AgentDeepSearch(DeepSearch):
     FLAG = "**🧠🔍 Deep Research Agent**"
 
@@ -27,16 +51,100 @@ class AgentDeepSearch(DeepSearch):
         max_tokens: int = 4096,
         result_limit: int = 5,
         ui: Optional[DeltaGenerator] = None,
+        max_parallelism: int = DEEP_SEARCH_MAX_PARALLELISM,
+        source_timeouts: Optional[dict[str, float]] = None,
+        context_packer: Optional[ContextPacker] = None,
+        semantic_search: Optional[BaseSearchService] = None,
+        search_engine: Optional[BaseSearchService] = None,
+        arxiv_search: Optional[BaseSearchService] = None,
     ):
         super().__init__(max_depth, max_tokens)
+        if max_parallelism <= 0:
+            raise ValueError("max_parallelism must be greater than 0.")
         self._depth: int = 0
         self._result_limit = result_limit
+        self._max_parallelism = max_parallelism
+        self._source_timeouts = source_timeouts or {}
         self._ui = ui
         self._namespace = "deep-searcher"
-        self._semantic_search = SemanticSearch(namespace=self._namespace)
-        self._arxiv_search = ArxivSearch()
-        self._search_engine = SearchEngine()
+        self._semantic_search = semantic_search or SemanticSearch(namespace=self._namespace)
+        self._arxiv_search = arxiv_search or ArxivSearch()
+        self._search_engine = search_engine or SearchEngine()
         self._llm = llm
+        self._context_packer = context_packer or ContextPacker(
+            llm,
+            reranker=get_reranker() if USE_RERANKER else None,
+            max_parallelism=max_parallelism,
+            tokenizer=self._tokenizer,
+            ui=ui,
+        )
+        # Runs the sources of every sub-query: one worker per source (search engine, arXiv) of each
+        # parallel sub-query. Sources that time out cannot be interrupted and keep their worker until
+        # they return, so the work left behind by slow sources is bounded by this pool.
+        self._source_executor = thread_pool(max_parallelism * 2, name="deep-search-source")
+        self._listener: Optional[Callable[[DeepSearchEvent], None]] = None
+        self._last_trace: Optional[Trace] = None
+
+    @property
+    def last_trace(self) -> Optional[Trace]:
+        """
+        Get the trace of the last run, with a span per stage (sources, crawl, summarization, ...).
+        :return: The Trace, or None before the first run.
+        """
+        return self._last_trace
+
+    @contextmanager
+    def _run_trace(self, query: str) -> Iterator[None]:
+        """
+        Trace a run. When the caller already traces, the run is recorded as one of its spans.
+        :param query:
+        :return:
+        """
+        nested = current_trace() is not None
+        run: Optional[Trace] = None
+        try:
+            with trace("deep_search", query=query) as run:
+                yield
+        finally:
+            if run is not None:
+                self._last_trace = run
+                if not nested:
+                    self._finish_trace(run)
+
+    def _finish_trace(self, run: Trace) -> None:
+        """
+        Log the per-stage summary of a run and export it if TRACE_EXPORT_DIR is set.
+        :param run:
+        :return:
+        """
+        logger(f"{self.FLAG} {run.format_summary()}", "info")
+        if TRACE_EXPORT_DIR is None:
+            return
+        try:
+            path = run.save(TRACE_EXPORT_DIR)
+            logger(f"{self.FLAG} Trace written to {path}", "debug")
+        except OSError as e:
+            logger(f"{self.FLAG} Failed to write the trace: {e}", "warning")
+
+    def _check_cancelled(self) -> None:
+        """
+        Stop the research when the `stream` consumer went away.
+        :return:
+        """
+        cancelled = _cancelled.get()
+        if cancelled is not None and cancelled.is_set():
+            raise _Cancelled()
+
+    def _emit(self, event: DeepSearchEvent) -> None:
+        """
+        Publish a progress event to the `stream` consumer, if any.
+        Raises _Cancelled when the consumer stopped reading.
+        :param event:
+        :return:
+        """
+        self._check_cancelled()
+        if self._listener is not None:
+            self._listener(event)
 
     def _upsert_documents(self, document: str) -> None:
         """
@@ -53,6 +161,34 @@ class AgentDeepSearch(DeepSearch):
                 self._ui,
             )
 
+    def _check_sub_queries(self, result: list[str]) -> list[str]:
+        """
+        Validate and log the generated sub-queries.
+        :param result:
+        :return:
+        """
+        if not isinstance(result, list):
+            logger(
+                f"{self.FLAG} Error generating sub-queries. Expected a list but got {type(result)}",
+                "error",
+                self._ui,
+            )
+            raise GenerativeError("Sub-queries must be a list.")
+        if len(result) == 0:
+            logger(
+                f"{self.FLAG} No sub-queries generated.",
+                "warning",
+                self._ui,
+            )
+            return []
+        logger(
+            f"{self.FLAG} Generated sub-queries: %s" % ", ".join(result),
+            "info",
+            self._ui,
+        )
+        return result
+
+    @traced("sub_queries")
     def _generate_sub_queries(self, query: str) -> list[str]:
         """
         Generate sub-queries based on the provided query.
@@ -65,28 +201,29 @@ class AgentDeepSearch(DeepSearch):
             self._ui,
         )
         try:
-            sub_queries = self._llm.generate_sub_queries(query)
-            result = sub_queries
-            if not isinstance(result, list):
-                logger(
-                    f"{self.FLAG} Error generating sub-queries. Expected a list but got {type(result)}",
-                    "error",
-                    self._ui,
-                )
-                raise GenerativeError("Sub-queries must be a list.")
-            if len(result) == 0:
-                logger(
-                    f"{self.FLAG} No sub-queries generated.",
-                    "warning",
-                    self._ui,
-                )
-                return []
+            return self._check_sub_queries(self._llm.generate_sub_queries(query))
+        except GenerativeError as e:
             logger(
-                f"{self.FLAG} Generated sub-queries: %s" % ", ".join(result),
-                "info",
+                f"{self.FLAG} Error generating sub-queries: {e.message}",
+                "error",
                 self._ui,
             )
-            return result
+            raise e
+
+    @traced("sub_queries")
+    async def _agenerate_sub_queries(self, query: str) -> list[str]:
+        """
+        Asynchronously generate sub-queries based on the provided query.
+        :param query:
+        :return:
+        """
+        logger(
+            f"{self.FLAG} Generating sub-queries for the query: {query}",
+            "info",
+            self._ui,
+        )
+        try:
+            return self._check_sub_queries(await self._llm.agenerate_sub_queries(query))
         except GenerativeError as e:
             logger(
                 f"{self.FLAG} Error generating sub-queries: {e.message}",
@@ -95,6 +232,33 @@ class AgentDeepSearch(DeepSearch):
             )
             raise e
 
+    def _check_summary(self, summary: str) -> str:
+        """
+        Validate and log a generated summary.
+        :param summary:
+        :return:
+        """
+        if not isinstance(summary, str):
+            logger(
+                f"{self.FLAG} Error summarizing results. Expected a string but got {type(summary)}",
+                "error",
+                self._ui,
+            )
+            raise GenerativeError("Summary must be a string.")
+        if len(summary) == 0:
+            logger(
+                f"{self.FLAG} No summary generated.",
+                "warning",
+                self._ui,
+            )
+            return ""
+        logger(
+            f"{self.FLAG} Generated summary: {summary}",
+            "info",
+            self._ui,
+        )
+        return summary
+
     def _summarize_results(self, query: str, documents: list[str]) -> str:
         """
         Summarize the results based on the provided query.
@@ -108,27 +272,31 @@ class AgentDeepSearch(DeepSearch):
             self._ui,
         )
         try:
-            summary = self._llm.summarize(query, documents)
-            if not isinstance(summary, str):
-                logger(
-                    f"{self.FLAG} Error summarizing results. Expected a string but got {type(summary)}",
-                    "error",
-                    self._ui,
-                )
-                raise GenerativeError("Summary must be a string.")
-            if len(summary) == 0:
-                logger(
-                    f"{self.FLAG} No summary generated.",
-                    "warning",
-                    self._ui,
-                )
-                return ""
+            with span("llm.summarize", chunks=len(documents), input_tokens=self._input_tokens(documents)):
+                return self._check_summary(self._llm.summarize(query, documents))
+        except GenerativeError as e:
             logger(
-                f"{self.FLAG} Generated summary: {summary}",
-                "info",
+                f"{self.FLAG} Error generating summary: {e.message}",
+                "error",
                 self._ui,
             )
-            return summary
+            raise e
+
+    async def _asummarize_results(self, query: str, documents: list[str]) -> str:
+        """
+        Asynchronously summarize the results based on the provided query.
+        :param query:
+        :param documents:
+        :return:
+        """
+        logger(
+            f"{self.FLAG} Summarizing results for the query: {query}\nchunks: %s" % "\n".join(documents),
+            "info",
+            self._ui,
+        )
+        try:
+            with span("llm.summarize", chunks=len(documents), input_tokens=self._input_tokens(documents)):
+                return self._check_summary(await self._llm.asummarize(query, documents))
         except GenerativeError as e:
             logger(
                 f"{self.FLAG} Error generating summary: {e.message}",
@@ -137,6 +305,7 @@ class AgentDeepSearch(DeepSearch):
             )
             raise e
 
+    @traced("reflection")
     def _reflection(self, query: str, sub_queries: list[str], chunks: list[str]) -> ReflectionResultSchema:
         """
         Generate a reflection based on the provided query, sub-queries, and chunks.
@@ -166,6 +335,65 @@ class AgentDeepSearch(DeepSearch):
             )
             raise e
 
+    @traced("reflection")
+    async def _areflection(self, query: str, sub_queries: list[str], chunks: list[str]) -> ReflectionResultSchema:
+        """
+        Asynchronously generate a reflection based on the provided query, sub-queries, and chunks.
+        :param query:
+        :param sub_queries:
+        :param chunks:
+        :return:
+        """
+        logger(
+            f"{self.FLAG} Generating reflection for the query: {query}\nsub_queries: %s" % "\n".join(sub_queries),
+            "info",
+            self._ui,
+        )
+        try:
+            reflection = await self._llm.areflection(query, sub_queries, chunks)
+            logger(
+                f"{self.FLAG} Generated reflection: %s" % "\n".join(reflection.sub_queries),
+                "info",
+                self._ui,
+            )
+            return reflection
+        except GenerativeError as e:
+            logger(
+                f"{self.FLAG} Error generating reflection: {e.message}",
+                "error",
+                self._ui,
+            )
+            raise e
+
+    def _check_search_result(self, source: str, result: str) -> str:
+        """
+        Validate and log the result of a search source.
+        :param source: The display name of the source (Google, Arxiv, ...).
+        :param result:
+        :return:
+        """
+        if not isinstance(result, str):
+            logger(
+                f"{self.FLAG} Error performing {source} search. Expected a string but got {type(result)}",
+                "error",
+                self._ui,
+            )
+            raise GenerativeError(f"{source} search result must be a string.")
+        if len(result) == 0:
+            logger(
+                f"{self.FLAG} No {source} search result found.",
+                "warning",
+                self._ui,
+            )
+            return ""
+        logger(
+            f"{self.FLAG} {source} search result: {result}",
+            "info",
+            self._ui,
+        )
+        return result
+
+    @traced("source.search_engine")
     def _query_search_engine(self, query: str) -> str:
         """
         Perform a search engine query based on the provided query.
@@ -179,26 +407,37 @@ class AgentDeepSearch(DeepSearch):
         )
         try:
             result = self._search_engine.search(query, limit=self._result_limit)
-            if not isinstance(result, str):
-                logger(
-                    f"{self.FLAG} Error performing Google search. Expected a string but got {type(result)}",
-                    "error",
-                    self._ui,
-                )
-                raise GenerativeError("Google search result must be a string.")
-            if len(result) == 0:
-                logger(
-                    f"{self.FLAG} No Google search result found.",
-                    "warning",
-                    self._ui,
-                )
-                return ""
+            return self._check_search_result("Google", result)
+        except SearchEngineError as e:
             logger(
-                f"{self.FLAG} Google search result: {result}",
-                "info",
+                f"{self.FLAG} Error performing Google search: {e.message}",
+                "error",
+                self._ui,
+            )
+            raise e
+        except BraveSearchError as e:
+            logger(
+                f"{self.FLAG} Error performing Brave search: {e.message}",
+                "error",
                 self._ui,
             )
-            return result
+            raise e
+
+    @traced("source.search_engine")
+    async def _aquery_search_engine(self, query: str) -> str:
+        """
+        Asynchronously perform a search engine query based on the provided query.
+        :param query:
+        :return:
+        """
+        logger(
+            f"{self.FLAG} Performing Google search for the query: {query}",
+            "info",
+            self._ui,
+        )
+        try:
+            result = await self._search_engine.asearch(query, limit=self._result_limit)
+            return self._check_search_result("Google", result)
         except SearchEngineError as e:
             logger(
                 f"{self.FLAG} Error performing Google search: {e.message}",
@@ -214,6 +453,7 @@ class AgentDeepSearch(DeepSearch):
             )
             raise e
 
+    @traced("source.arxiv")
     def _query_arxiv(self, query: str) -> str:
         """
         Perform an Arxiv search based on the provided query.
@@ -228,26 +468,31 @@ class AgentDeepSearch(DeepSearch):
 
         try:
             result = self._arxiv_search.search(query, limit=self._result_limit)
-            if not isinstance(result, str):
-                logger(
-                    f"{self.FLAG} Error performing Arxiv search. Expected a string but got {type(result)}",
-                    "error",
-                    self._ui,
-                )
-                raise GenerativeError("Arxiv search result must be a string.")
-            if len(result) == 0:
-                logger(
-                    f"{self.FLAG} No Arxiv search result found.",
-                    "warning",
-                    self._ui,
-                )
-                return ""
+            return self._check_search_result("Arxiv", result)
+        except ArxivSearchError as e:
             logger(
-                f"{self.FLAG} Arxiv search result: {result}",
-                "info",
+                f"{self.FLAG} Error performing Arxiv search: {e.message}",
+                "error",
                 self._ui,
             )
-            return result or ""
+            raise e
+
+    @traced("source.arxiv")
+    async def _aquery_arxiv(self, query: str) -> str:
+        """
+        Asynchronously perform an Arxiv search based on the provided query.
+        :param query:
+        :return:
+        """
+        logger(
+            f"{self.FLAG} Performing Arxiv search for the query: {query}",
+            "info",
+            self._ui,
+        )
+
+        try:
+            result = await self._arxiv_search.asearch(query, limit=self._result_limit)
+            return self._check_search_result("Arxiv", result)
         except ArxivSearchError as e:
             logger(
                 f"{self.FLAG} Error performing Arxiv search: {e.message}",
@@ -256,6 +501,7 @@ class AgentDeepSearch(DeepSearch):
             )
             raise e
 
+    @traced("source.documents")
     def _query_documents(self, query: str) -> str:
         """
         Perform a Documents search based on the provided query.
@@ -298,8 +544,54 @@ class AgentDeepSearch(DeepSearch):
             )
             raise e
 
+    def _input_tokens(self, documents: list[str]) -> int:
+        return sum(self._chunks.count_tokens(document) for document in documents)
+
     def _len_tokens(self, documents: list[str]) -> int:
-        return self.calc_tokens() + len(self._tokenizer.encode("\n".join(documents)))
+        return self.calc_tokens() + self._chunks.count_tokens("\n".join(documents))
+
+    def _source_timeout(self, name: str) -> float:
+        """
+        Get the timeout, in seconds, of a search source.
+        :param name:
+        :return:
+        """
+        return self._source_timeouts.get(name, DEEP_SEARCH_SOURCE_TIMEOUT)
+
+    def _log_source_error(self, name: str, error: BaseException) -> None:
+        """
+        Log the failure of a single search source.
+        :param name:
+        :param error:
+        :return:
+        """
+        if isinstance(error, TimeoutError):
+            logger(
+                f"{self.FLAG} {name} search timed out after {self._source_timeout(name):.0f}s, skipping it.",
+                "warning",
+                self._ui,
+            )
+        elif isinstance(error, (SearchEngineError, BraveSearchError, ArxivSearchError, SemanticSearchError)):
+            logger(
+                f"{self.FLAG} Error performing {name} search: {error.message}",
+                "error",
+                self._ui,
+            )
+        else:
+            logger(
+                f"{self.FLAG} Error performing {name} search: {error}",
+                "error",
+                self._ui,
+            )
+
+    def _emit_source_finished(self, name: str, query: str, success: bool) -> None:
+        self._emit(DeepSearchEvent(
+            type="source_finished",
+            depth=self._depth,
+            content=query,
+            source=name,
+            success=success,
+        ))
 
     def _pipeline_search(self, query: str) -> list[str]:
         results = []
@@ -308,24 +600,136 @@ class AgentDeepSearch(DeepSearch):
             "search_engine": self._query_search_engine,
             "arxiv": self._query_arxiv,
         }
-        for name, func in functions.items():
-            try:
-                result = func(query) # type: ignore
-                if result and len(result) > 0:
-                    results.append(result)
-            except (SearchEngineError, BraveSearchError, ArxivSearchError, SemanticSearchError) as e:
-                logger(
-                    f"{self.FLAG} Error performing {name} search: {e.message}",
-                    "error",
-                    self._ui,
+        # Dispatch every source at once; each one is awaited against its own deadline,
+        # so a slow or failing source never delays or breaks the others.
+        started = time.monotonic()
+        futures = {name: self._source_executor.submit(func, query) for name, func in functions.items()}
+        try:
+            for name, future in futures.items():
+                timeout = self._source_timeout(name)
+                try:
+                    result = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+                    if result and len(result) > 0:
+                        results.append(result)
+                    self._emit_source_finished(name, query, bool(result))
+                except Exception as e:
+                    self._log_source_error(name, e)
+                    self._emit_source_finished(name, query, False)
+        finally:
+            # Do not wait for timed-out sources; those still queued are dropped, the results of the others discarded.
+            for future in futures.values():
+                future.cancel()
+        return results
+
+    async def _apipeline_search(self, query: str) -> list[str]:
+        functions = {
+            # "documents": self._query_documents, # TODO: Enable this when the vector store is ready
+            "search_engine": self._aquery_search_engine,
+            "arxiv": self._aquery_arxiv,
+        }
+        outcomes = await asyncio.gather(
+            *(
+                asyncio.wait_for(func(query), timeout=self._source_timeout(name))
+                for name, func in functions.items()
+            ),
+            return_exceptions=True,
+        )
+        results = []
+        for name, outcome in zip(functions, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                self._log_source_error(name, outcome)
+                self._emit_source_finished(name, query, False)
+                continue
+            if outcome and len(outcome) > 0:
+                results.append(outcome)
+            self._emit_source_finished(name, query, bool(outcome))
+        return results
+
+    def _research_sub_query(self, sub_query: str) -> str:
+        """
+        Search the sources for a single sub-query and summarize the combined results.
+        :param sub_query:
+        :return:
+        """
+        self._check_cancelled()
+        with span("sub_query"):
+            combined_results = self._pipeline_search(sub_query)
+            self._check_cancelled()
+            return self._summarize_results(sub_query, combined_results)
+
+    def _research_sub_queries(self, sub_queries: list[str]) -> list[str]:
+        """
+        Research every sub-query, up to `max_parallelism` at a time.
+        The summaries are returned in the same order as the sub-queries.
+        :param sub_queries:
+        :return:
+        """
+        if self._max_parallelism == 1 or len(sub_queries) <= 1:
+            return [self._research_sub_query(sub_query) for sub_query in sub_queries]
+
+        with thread_pool(min(self._max_parallelism, len(sub_queries))) as executor:
+            return list(executor.map(self._research_sub_query, sub_queries))
+
+    async def _aresearch_sub_queries(self, sub_queries: list[str]) -> list[str]:
+        """
+        Asynchronously research every sub-query, up to `max_parallelism` at a time.
+        The summaries are returned in the same order as the sub-queries.
+        :param sub_queries:
+        :return:
+        """
+        semaphore = asyncio.Semaphore(self._max_parallelism)
+
+        async def research(sub_query: str) -> str:
+            async with semaphore:
+                with span("sub_query"):
+                    combined_results = await self._apipeline_search(sub_query)
+                    return await self._asummarize_results(sub_query, combined_results)
+
+        return list(await asyncio.gather(*(research(sub_query) for sub_query in sub_queries)))
+
+    def _research(self, query: str) -> None:
+        """
+        Research the query until a stopping condition is met, appending the summaries to the chunks.
+        :param query:
+        :return:
+        """
+        sub_queries = self._generate_sub_queries(query)
+        self._emit(DeepSearchEvent(type="sub_queries", depth=self._depth, sub_queries=sub_queries))
+
+        while (
+            self.calc_tokens() < self.max_tokens and
+            self._depth < self.max_depth and
+            len(sub_queries) > 0
+        ):
+            with span("depth", depth=self._depth, sub_queries=len(sub_queries)):
+                # Search and summarize the sub-queries, then append the summaries to the chunks
+                self._chunks.extend(self._research_sub_queries(sub_queries))
+                self._check_cancelled()
+
+                # Reflect on the results and generate new sub-queries
+                summary = self._summarize_results(
+                    query, self._context_packer.pack(query, self._chunks, SUMMARIZER_PROMPT)
                 )
-            except Exception as e:
-                logger(
-                    f"{self.FLAG} Error performing {name} search: {e}",
-                    "error",
-                    self._ui,
+                self._upsert_documents(summary)
+                reflection = self._reflection(
+                    query, sub_queries, self._context_packer.pack(query, [summary], REFLECT_PROMPT)
                 )
-        return results
+            # Increment depth
+            self._depth += 1
+            self._emit(DeepSearchEvent(type="depth_completed", depth=self._depth, content=summary))
+
+            # Check if the reflection is empty or if the search is complete
+            if (
+                len(reflection.sub_queries) == 0 or
+                reflection.complete_search
+            ):
+                break
+
+            # Generate new sub-queries
+            sub_queries = reflection.sub_queries
+            self._emit(DeepSearchEvent(type="sub_queries", depth=self._depth, sub_queries=sub_queries))
 
     def run(self, query: str) -> str:
         # 1. Submit a research query
@@ -336,25 +740,91 @@ class AgentDeepSearch(DeepSearch):
         # 6. Repeat the process until a stopping condition is met
         # 7. Return the final results
 
-        sub_queries = self._generate_sub_queries(query)
+        with self._run_trace(query):
+            self._research(query)
+
+            with span("final_summary"):
+                return self._summarize_results(
+                    query, self._context_packer.pack(query, self._chunks, SUMMARIZER_PROMPT)
+                )
+
+    def stream(self, query: str) -> Iterator[DeepSearchEvent]:
+        """
+        Run the deep search, yielding progress events as they happen and the final report token by token.
+        The research runs in a worker thread; the last event is either `done`, carrying the
+        whole report, or `error`. When the consumer stops early (e.g. a Streamlit rerun), the
+        worker stops at the next stage or token instead of finishing the research.
+        :param query:
+        :return:
+        """
+        events: "queue.Queue[Optional[DeepSearchEvent]]" = queue.Queue()
+
+        def work() -> None:
+            _cancelled.set(cancelled)
+            try:
+                with self._run_trace(query):
+                    self._research(query)
+                    with span("final_summary", streamed=True) as current:
+                        chunks = self._context_packer.pack(query, self._chunks, SUMMARIZER_PROMPT)
+                        current.set("input_tokens", self._input_tokens(chunks))
+                        logger(f"{self.FLAG} Streaming the final report for the query: {query}", "info", self._ui)
+                        report = []
+                        for token in self._llm.stream_summarize(query, chunks):
+                            report.append(token)
+                            self._emit(DeepSearchEvent(type="token", depth=self._depth, content=token))
+                        current.set("output_chunks", len(report))
+                    if not report:
+                        raise GenerativeError("No summary generated.")
+                self._emit(DeepSearchEvent(type="done", depth=self._depth, content="".join(report)))
+            except _Cancelled:
+                logger(f"{self.FLAG} Deep search cancelled: {query}", "info")
+            except Exception as e:
+                logger(f"{self.FLAG} Deep search failed: {e}", "error", self._ui)
+                self._emit(DeepSearchEvent(type="error", depth=self._depth, content=str(e)))
+            finally:
+                events.put(None)
+
+        cancelled = threading.Event()
+        self._listener = events.put
+        executor = thread_pool(1, name="deep-search-stream")
+        try:
+            executor.submit(work)
+            while (event := events.get()) is not None:
+                yield event
+        finally:
+            cancelled.set()  # no-op once the worker is done
+            self._listener = None
+            executor.shutdown(wait=False)
+
+    async def _aresearch(self, query: str) -> None:
+        """
+        Asynchronously research the query until a stopping condition is met, appending the summaries to the chunks.
+        :param query:
+        :return:
+        """
+        sub_queries = await self._agenerate_sub_queries(query)
+        self._emit(DeepSearchEvent(type="sub_queries", depth=self._depth, sub_queries=sub_queries))
 
         while (
             self.calc_tokens() < self.max_tokens and
             self._depth < self.max_depth and
             len(sub_queries) > 0
         ):
-            for sub_query in sub_queries:
-                # Combine the results and return and summarize them
-                combined_results = self._pipeline_search(sub_query)
-                # Append the summary to the chunks
-                self._chunks.append(self._summarize_results(sub_query, combined_results))
-
-            # Reflect on the results and generate new sub-queries
-            summary = self._summarize_results(query, self._chunks)
-            self._upsert_documents(summary)
-            reflection = self._reflection(query, sub_queries, [summary])
+            with span("depth", depth=self._depth, sub_queries=len(sub_queries)):
+                # Search and summarize the sub-queries, then append the summaries to the chunks
+                self._chunks.extend(await self._aresearch_sub_queries(sub_queries))
+
+                # Reflect on the results and generate new sub-queries
+                summary = await self._asummarize_results(
+                    query, await self._context_packer.apack(query, self._chunks, SUMMARIZER_PROMPT)
+                )
+                await asyncio.to_thread(self._upsert_documents, summary)
+                reflection = await self._areflection(
+                    query, sub_queries, await self._context_packer.apack(query, [summary], REFLECT_PROMPT)
+                )
             # Increment depth
             self._depth += 1
+            self._emit(DeepSearchEvent(type="depth_completed", depth=self._depth, content=summary))
 
             # Check if the reflection is empty or if the search is complete
             if (
@@ -365,6 +835,19 @@ class AgentDeepSearch(DeepSearch):
 
             # Generate new sub-queries
             sub_queries = reflection.sub_queries
+            self._emit(DeepSearchEvent(type="sub_queries", depth=self._depth, sub_queries=sub_queries))
 
-        return self._summarize_results(query, self._chunks)
+    async def arun(self, query: str) -> str:
+        """
+        Asynchronously run the deep search, following the same steps as `run`.
+        Every network call is awaited on the caller's event loop instead of blocking a thread.
+        :param query:
+        :return:
+        """
+        with self._run_trace(query):
+            await self._aresearch(query)
 
+            with span("final_summary"):
+                return await self._asummarize_results(
+                    query, await self._context_packer.apack(query, self._chunks, SUMMARIZER_PROMPT)
+                )
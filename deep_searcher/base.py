@@ -1,7 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 import tiktoken
 
+from .chunks import ChunkStore
+
 
 class DeepSearch(ABC):
     """
@@ -22,7 +25,7 @@ class DeepSearch(ABC):
         self._max_depth = max_depth
         self._max_tokens = max_tokens
         self._tokenizer = tiktoken.get_encoding("cl100k_base")
-        self._chunks: list[str] = []
+        self._chunks = ChunkStore(self._tokenizer)
 
     @abstractmethod
     def run(self, query: str) -> str:
@@ -35,12 +38,29 @@ class DeepSearch(ABC):
             "The run method must be implemented in subclasses."
         )
 
+    async def arun(self, query: str) -> str:
+        """
+        Asynchronously run the deep search algorithm.
+        Runs `run` in a worker thread unless overridden.
+        :param query:
+        :return:
+        """
+        return await asyncio.to_thread(self.run, query)
+
     def calc_tokens(self) -> int:
         """
         Calculate the number of tokens in the text chunks.
+        The count is kept up to date as chunks are appended.
         :return: The number of tokens in the text chunks.
         """
-        return sum(len(self._tokenizer.encode(chunk)) for chunk in self._chunks)
+        return self._chunks.tokens
+
+    def remaining_tokens(self) -> int:
+        """
+        Calculate how many tokens are left before reaching max_tokens.
+        :return: The number of remaining tokens.
+        """
+        return self._chunks.remaining(self._max_tokens)
 
     @property
     def chunks(self) -> list[str]:
@@ -48,7 +68,7 @@ class DeepSearch(ABC):
         Get the chunks of text.
         :return: The chunks of text.
         """
-        return self._chunks
+        return self._chunks.texts
 
     @property
     def max_depth(self) -> int:
@@ -0,0 +1,108 @@
+from typing import Iterable, Iterator, Optional
+
+import tiktoken
+
+
+class ChunkStore:
+    """
+    Ordered container of text chunks that keeps each chunk's token length.
+    Chunks are encoded once when appended, so the running total and the budget
+    queries cost O(1) or O(number of chunks) instead of re-encoding the text.
+    """
+
+    def __init__(self, tokenizer: Optional[tiktoken.Encoding] = None):
+        self._tokenizer = tokenizer or tiktoken.get_encoding("cl100k_base")
+        self._chunks: list[str] = []
+        self._lengths: list[int] = []
+        self._tokens = 0
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text with the store's tokenizer.
+        :param text:
+        :return:
+        """
+        return len(self._tokenizer.encode(text))
+
+    def append(self, chunk: str) -> None:
+        length = self.count_tokens(chunk)
+        self._chunks.append(chunk)
+        self._lengths.append(length)
+        self._tokens += length
+
+    def extend(self, chunks: Iterable[str]) -> None:
+        for chunk in chunks:
+            self.append(chunk)
+
+    def clear(self) -> None:
+        self._chunks.clear()
+        self._lengths.clear()
+        self._tokens = 0
+
+    @property
+    def tokens(self) -> int:
+        """
+        Get the total number of tokens of the chunks.
+        :return:
+        """
+        return self._tokens
+
+    @property
+    def texts(self) -> list[str]:
+        """
+        Get a copy of the chunks.
+        :return:
+        """
+        return list(self._chunks)
+
+    def token_length(self, index: int) -> int:
+        """
+        Get the number of tokens of one chunk.
+        :param index:
+        :return:
+        """
+        return self._lengths[index]
+
+    def remaining(self, budget: int) -> int:
+        """
+        Get how many tokens are left in the budget.
+        :param budget:
+        :return: The remaining tokens, never negative.
+        """
+        return max(budget - self._tokens, 0)
+
+    def fits(self, text: str, budget: int) -> bool:
+        """
+        Check whether a text still fits in the budget.
+        :param text:
+        :param budget:
+        :return:
+        """
+        return self._tokens + self.count_tokens(text) <= budget
+
+    def select(self, budget: int, order: Optional[Iterable[int]] = None) -> list[int]:
+        """
+        Pick the chunks that fit in the budget, greedily in the given order.
+        Chunks that do not fit are skipped, so smaller chunks later in the order can still be picked.
+        :param budget: Maximum number of tokens of the selected chunks.
+        :param order: Indexes of the chunks by priority. Defaults to insertion order.
+        :return: The indexes of the selected chunks, in priority order.
+        """
+        selected: list[int] = []
+        used = 0
+        for index in (range(len(self._chunks)) if order is None else order):
+            length = self._lengths[index]
+            if used + length > budget:
+                continue
+            selected.append(index)
+            used += length
+        return selected
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._chunks)
+
+    def __getitem__(self, index: int) -> str:
+        return self._chunks[index]
@@ -0,0 +1,260 @@
+import asyncio
+from typing import Optional
+
+import tiktoken
+from streamlit.delta_generator import DeltaGenerator
+
+from config import (
+    LLM_CONTEXT_WINDOW,
+    OPENAI_MAX_TOKENS,
+    CONTEXT_RECENCY_WEIGHT,
+    CONTEXT_MIN_COVERAGE,
+    DEEP_SEARCH_MAX_PARALLELISM,
+)
+from exceptions import RerankError, InvalidRerankValue
+from llm.base import BaseLLM, BaseReranker
+from loggings import logger
+from tracing import span
+from ._concurrency import thread_pool
+from .chunks import ChunkStore
+
+# cl100k_base undercounts the served model's tokenizer; keep a margin for the difference.
+_TOKENIZER_MARGIN = 0.85
+_MAX_REDUCE_LEVELS = 3
+
+
+class ContextPacker:
+    """
+    Fits research chunks into the token budget of a prompt.
+    When every chunk fits they are all kept. Otherwise the chunks are ranked by
+    rerank score and recency and greedily selected until the budget is full. If
+    the selection would drop too much of the text, the chunks are condensed with
+    a hierarchical map-reduce summary instead.
+    """
+    FLAG = "**🧠🔍 Deep Research Agent**"
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        reranker: Optional[BaseReranker] = None,
+        context_window: int = LLM_CONTEXT_WINDOW,
+        reserved_tokens: int = OPENAI_MAX_TOKENS,
+        recency_weight: float = CONTEXT_RECENCY_WEIGHT,
+        min_coverage: float = CONTEXT_MIN_COVERAGE,
+        max_parallelism: int = DEEP_SEARCH_MAX_PARALLELISM,
+        tokenizer: Optional[tiktoken.Encoding] = None,
+        ui: Optional[DeltaGenerator] = None,
+    ):
+        if reserved_tokens >= context_window:
+            raise ValueError("reserved_tokens must be lower than context_window.")
+        if not 0 <= recency_weight <= 1:
+            raise ValueError("recency_weight must be between 0 and 1.")
+        if not 0 <= min_coverage <= 1:
+            raise ValueError("min_coverage must be between 0 and 1.")
+        self._llm = llm
+        self._reranker = reranker
+        self._context_window = context_window
+        self._reserved_tokens = reserved_tokens
+        self._recency_weight = recency_weight
+        self._min_coverage = min_coverage
+        self._max_parallelism = max_parallelism
+        self._tokenizer = tokenizer or tiktoken.get_encoding("cl100k_base")
+        self._ui = ui
+
+    def budget(self, query: str, template: str = "") -> int:
+        """
+        Calculate how many chunk tokens fit in a prompt.
+        :param query:
+        :param template: The prompt template the chunks are rendered into.
+        :return: The token budget of the chunks.
+        """
+        overhead = len(self._tokenizer.encode(template)) + len(self._tokenizer.encode(query))
+        return max(int((self._context_window - self._reserved_tokens - overhead) * _TOKENIZER_MARGIN), 1)
+
+    def _store(self, chunks: ChunkStore | list[str]) -> ChunkStore:
+        if isinstance(chunks, ChunkStore):
+            return chunks
+        store = ChunkStore(self._tokenizer)
+        store.extend(chunks)
+        return store
+
+    def _truncate(self, text: str, budget: int) -> str:
+        return self._tokenizer.decode(self._tokenizer.encode(text)[:budget])
+
+    def _priority(self, store: ChunkStore, scores: Optional[list[float]]) -> list[int]:
+        """
+        Order the chunks by a blend of rerank score and recency, best first.
+        """
+        n = len(store)
+        recency = [i / (n - 1) if n > 1 else 1.0 for i in range(n)]
+        if scores is None:
+            return sorted(range(n), key=lambda i: recency[i], reverse=True)
+
+        low, high = min(scores), max(scores)
+        relevance = [(s - low) / (high - low) if high > low else 1.0 for s in scores]
+        weight = self._recency_weight
+        return sorted(
+            range(n),
+            key=lambda i: (1 - weight) * relevance[i] + weight * recency[i],
+            reverse=True,
+        )
+
+    def _scores(self, query: str, store: ChunkStore) -> Optional[list[float]]:
+        """
+        Score the chunks with the reranker. Documents filtered out by its threshold score 0.
+        :return: The score of each chunk, or None when no reranker is available.
+        """
+        if self._reranker is None or len(store) < 2:
+            return None
+        try:
+            reranked = self._reranker.rerank(query, store.texts)
+        except (RerankError, InvalidRerankValue) as e:
+            logger(f"{self.FLAG} Rerank failed while packing the context, using recency only: {e}", "warning", self._ui)
+            return None
+        return self._to_scores(store, reranked)
+
+    async def _ascores(self, query: str, store: ChunkStore) -> Optional[list[float]]:
+        if self._reranker is None or len(store) < 2:
+            return None
+        try:
+            reranked = await self._reranker.arerank(query, store.texts)
+        except (RerankError, InvalidRerankValue) as e:
+            logger(f"{self.FLAG} Rerank failed while packing the context, using recency only: {e}", "warning", self._ui)
+            return None
+        return self._to_scores(store, reranked)
+
+    @staticmethod
+    def _to_scores(store: ChunkStore, reranked) -> Optional[list[float]]:
+        by_document = {r.document: r.score for r in reranked if r.score is not None}
+        if not by_document:
+            return None
+        return [by_document.get(chunk, 0.0) for chunk in store]
+
+    def _select(self, store: ChunkStore, scores: Optional[list[float]], budget: int) -> Optional[list[str]]:
+        """
+        Select the best chunks that fit in the budget, keeping their original order.
+        :return: The selected chunks, or None if they cover less than `min_coverage` of the tokens.
+        """
+        selected = sorted(store.select(budget, self._priority(store, scores)))
+        covered = sum(store.token_length(i) for i in selected)
+        if not selected or covered < self._min_coverage * store.tokens:
+            return None
+        logger(
+            f"{self.FLAG} Packed {len(selected)}/{len(store)} chunks ({covered}/{store.tokens} tokens) "
+            f"into a budget of {budget} tokens.",
+            "info",
+            self._ui,
+        )
+        return [store[i] for i in selected]
+
+    def _groups(self, store: ChunkStore, budget: int) -> list[list[str]]:
+        """
+        Split the chunks into consecutive groups that each fit in the budget.
+        Chunks larger than the budget are truncated.
+        """
+        groups: list[list[str]] = [[]]
+        used = 0
+        for i, chunk in enumerate(store):
+            length = store.token_length(i)
+            if length > budget:
+                chunk, length = self._truncate(chunk, budget), budget
+            if used + length > budget and groups[-1]:
+                groups.append([])
+                used = 0
+            groups[-1].append(chunk)
+            used += length
+        return groups
+
+    def _reduced(self, summaries: list[str], budget: int, level: int) -> Optional[list[str]]:
+        """
+        Decide what to do with the summaries of a map step.
+        :return: The summaries if they fit, a truncated summary if the levels ran out, or None to reduce again.
+        """
+        store = self._store(summaries)
+        if store.tokens <= budget:
+            return summaries
+        if level + 1 >= _MAX_REDUCE_LEVELS:
+            logger(f"{self.FLAG} Map-reduce did not converge, truncating the context.", "warning", self._ui)
+            return [self._truncate("\n\n".join(summaries), budget)]
+        return None
+
+    def _map_reduce(self, query: str, store: ChunkStore, budget: int, level: int = 0) -> list[str]:
+        groups = self._groups(store, budget)
+        logger(
+            f"{self.FLAG} Context of {store.tokens} tokens exceeds the budget of {budget}, "
+            f"summarizing {len(groups)} groups (level {level + 1}).",
+            "info",
+            self._ui,
+        )
+        with thread_pool(min(self._max_parallelism, len(groups)), name="context-map") as executor:
+            summaries = list(executor.map(lambda group: self._llm.summarize(query, group), groups))
+
+        reduced = self._reduced(summaries, budget, level)
+        if reduced is not None:
+            return reduced
+        return self._map_reduce(query, self._store(summaries), budget, level + 1)
+
+    async def _amap_reduce(self, query: str, store: ChunkStore, budget: int, level: int = 0) -> list[str]:
+        groups = self._groups(store, budget)
+        logger(
+            f"{self.FLAG} Context of {store.tokens} tokens exceeds the budget of {budget}, "
+            f"summarizing {len(groups)} groups (level {level + 1}).",
+            "info",
+            self._ui,
+        )
+        semaphore = asyncio.Semaphore(self._max_parallelism)
+
+        async def summarize(group: list[str]) -> str:
+            async with semaphore:
+                return await self._llm.asummarize(query, group)
+
+        summaries = list(await asyncio.gather(*(summarize(group) for group in groups)))
+
+        reduced = self._reduced(summaries, budget, level)
+        if reduced is not None:
+            return reduced
+        return await self._amap_reduce(query, self._store(summaries), budget, level + 1)
+
+    def pack(self, query: str, chunks: ChunkStore | list[str], template: str = "") -> list[str]:
+        """
+        Fit the chunks into the token budget of a prompt.
+        :param query:
+        :param chunks:
+        :param template: The prompt template the chunks are rendered into.
+        :return: The chunks to send to the LLM.
+        """
+        store = self._store(chunks)
+        budget = self.budget(query, template)
+        with span("context_pack", chunks=len(store), tokens=store.tokens, budget=budget) as current:
+            if store.tokens <= budget:
+                current.set("strategy", "all")
+                return store.texts
+
+            selected = self._select(store, self._scores(query, store), budget)
+            if selected is not None:
+                current.set("strategy", "select")
+                return selected
+            current.set("strategy", "map_reduce")
+            return self._map_reduce(query, store, budget)
+
+    async def apack(self, query: str, chunks: ChunkStore | list[str], template: str = "") -> list[str]:
+        """
+        Asynchronously fit the chunks into the token budget of a prompt.
+        :param query:
+        :param chunks:
+        :param template: The prompt template the chunks are rendered into.
+        :return: The chunks to send to the LLM.
+        """
+        store = self._store(chunks)
+        budget = self.budget(query, template)
+        with span("context_pack", chunks=len(store), tokens=store.tokens, budget=budget) as current:
+            if store.tokens <= budget:
+                current.set("strategy", "all")
+                return store.texts
+
+            selected = self._select(store, await self._ascores(query, store), budget)
+            if selected is not None:
+                current.set("strategy", "select")
+                return selected
+            current.set("strategy", "map_reduce")
+            return await self._amap_reduce(query, store, budget)
@@ -0,0 +1,36 @@
+import struct
+
+import numpy as np
+
+# Media type of the binary /embeddings response, negotiated through the Accept header.
+# Layout: (rows, dim) as two little-endian uint32, then rows * dim little-endian float32 in row-major order.
+EMBEDDINGS_MEDIA_TYPE = "application/x-embeddings-f32"
+
+_HEADER = struct.Struct("<II")
+
+
+def encode_embeddings(embeddings: np.ndarray) -> bytes:
+    """
+    Serialize an embedding matrix to the binary transport format.
+    :param embeddings: Array of shape (rows, dim).
+    :return:
+    """
+    matrix = np.ascontiguousarray(embeddings, dtype="<f4")
+    if matrix.ndim != 2:
+        raise ValueError(f"Embeddings must be a 2-D array, got {matrix.ndim} dimensions.")
+    return _HEADER.pack(*matrix.shape) + matrix.tobytes()
+
+
+def decode_embeddings(content: bytes) -> np.ndarray:
+    """
+    Deserialize the binary transport format without copying the vectors.
+    The array is a read-only view of `content`.
+    :param content:
+    :return: Array of shape (rows, dim) and dtype float32.
+    """
+    if len(content) < _HEADER.size:
+        raise ValueError("Embeddings payload is shorter than its header.")
+    rows, dim = _HEADER.unpack_from(content)
+    if len(content) != _HEADER.size + rows * dim * 4:
+        raise ValueError(f"Embeddings payload does not match its shape ({rows}, {dim}).")
+    return np.frombuffer(content, dtype="<f4", count=rows * dim, offset=_HEADER.size).reshape(rows, dim)
@@ -0,0 +1,78 @@
+import asyncio
+import atexit
+import importlib.util
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+from config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    USE_HTTP2,
+)
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _http2() -> bool:
+    """
+    HTTP/2 is only negotiated when enabled and the `h2` package is installed.
+    It applies to TLS origins; plain http:// connections keep using HTTP/1.1.
+    :return:
+    """
+    return USE_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _options() -> dict:
+    return dict(
+        timeout=60,
+        follow_redirects=True,
+        http2=_http2(),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_client() -> httpx.Client:
+    """
+    Get the HTTP client shared by every thread of the process.
+    Its connection pool keeps connections alive between requests, so repeated calls to the same
+    host skip the TCP and TLS handshakes. The client is closed when the interpreter exits.
+    :return: The shared httpx.Client.
+    """
+    global _client
+    client = _client
+    if client is None or client.is_closed:
+        with _client_lock:
+            if _client is None or _client.is_closed:
+                _client = httpx.Client(**_options())
+            client = _client
+    return client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get the HTTP client shared by every coroutine on the running event loop.
+    httpx clients are bound to the loop they were first used on, so one client is kept per loop.
+    :return: The shared httpx.AsyncClient.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_options())
+        _async_clients[loop] = client
+    return client
+
+
+@atexit.register
+def _close_client() -> None:
+    if _client is not None:
+        _client.close()
@@ -0,0 +1,55 @@
+import argparse
+
+from loggings import logger
+from researchers import SemanticSearch
+from researchers.ingest import load_documents
+
+parser = argparse.ArgumentParser(
+    description="Bulk load text, Markdown and PDF files into a namespace of the vector database."
+)
+
+parser.add_argument(
+    "paths",
+    nargs="+",
+    help="Files or directories (walked recursively) to load.",
+)
+
+parser.add_argument(
+    "--namespace",
+    type=str,
+    default="deep-searcher",
+    help="Namespace to load the documents into. `deep-searcher` is the one searched by the deep search.",
+)
+
+parser.add_argument(
+    "--batch-size",
+    type=int,
+    default=None,
+    help="Chunks per embed/upload batch. Defaults to INGEST_BATCH_SIZE.",
+)
+
+parser.add_argument(
+    "--queue-size",
+    type=int,
+    default=None,
+    help="Batches buffered between the pipeline stages. Defaults to INGEST_QUEUE_SIZE.",
+)
+
+args = parser.parse_args()
+
+report = SemanticSearch(namespace=args.namespace).ingest(
+    load_documents(args.paths),
+    batch_size=args.batch_size,
+    queue_size=args.queue_size,
+)
+
+logger(
+    f"{report.documents} documents, {report.chunks} chunks ({report.failed_chunks} failed) "
+    f"in {report.seconds:.1f}s: {report.chunks_per_second:.1f} chunks/s",
+    level="info",
+)
+for stage, seconds in report.stage_seconds.items():
+    logger(
+        f"{stage} stage busy {seconds:.1f}s",
+        level="info",
+    )
@@ -0,0 +1,16 @@
+import math
+
+
+def balanced_batches(count: int, max_size: int) -> list[slice]:
+    """
+    Split `count` items into the fewest batches of at most `max_size` items, with sizes
+    differing by at most one, so no request is left with a small tail (101 items at 100 -> 51 + 50).
+    :param count:
+    :param max_size:
+    :return: The slice of each batch, in order.
+    """
+    if count <= 0:
+        return []
+    batches = math.ceil(count / max_size)
+    bounds = [count * i // batches for i in range(batches + 1)]
+    return [slice(start, end) for start, end in zip(bounds, bounds[1:])]
@@ -1,95 +1,181 @@
 from typing import Optional, Literal
 
-import requests
-from requests.exceptions import RequestException, JSONDecodeError, Timeout
+import httpx
 
-from config import LOCALLY_API_BASE, LOCALLY_API_KEY
+from config import (
+    LOCALLY_API_BASE,
+    LOCALLY_API_KEY,
+    LOCALLY_API_CONNECT_TIMEOUT,
+    LOCALLY_EMBEDDINGS_TIMEOUT,
+    LOCALLY_RERANK_TIMEOUT,
+    LOCALLY_SUMMARIZE_TIMEOUT,
+    USE_BINARY_EMBEDDINGS,
+)
+from embedding_codec import EMBEDDINGS_MEDIA_TYPE, decode_embeddings
+from http_client import get_client, get_async_client
 from schemas import (
     RerankResponse,
     EmbeddingsResponse,
     EmbeddingsRequest,
     RerankRequest,
     SummarizeRequest,
-    SummarizeResponse
+    SummarizeResponse,
+    SummarizeBatchRequest,
+    SummarizeBatchResponse,
 )
 from exceptions import APIRequestError
 from loggings import logger
 
 
-class LocallyCallAPI:
-    def __init__(self, api_key: str = LOCALLY_API_KEY, api_base: str = LOCALLY_API_BASE):
-        self._api_key = api_key
-        self._api_base = api_base
-        self._session = requests.Session()
+_URI = Literal["embeddings", "rerank", "summarize", "summarize/batch"]
 
-    def request(
+
+class LocallyCallAPI:
+    def __init__(
         self,
-        uri: Literal["embeddings", "rerank", "summarize"],
-        payload: EmbeddingsRequest | RerankRequest | SummarizeRequest,
-    ) -> Optional[RerankResponse | EmbeddingsResponse | SummarizeResponse]:
+        api_key: str = LOCALLY_API_KEY,
+        api_base: str = LOCALLY_API_BASE,
+        timeouts: Optional[dict[str, float]] = None,
+        binary_embeddings: bool = USE_BINARY_EMBEDDINGS,
+    ):
         """
-        Make a request to the local API.
-        :param uri: The endpoint to call (embeddings or rerank).
-        :param payload: The payload to send in the request.
-        :return: The response from the API as a dictionary.
+        Client of the local model server.
+        Requests go through the process-wide connection pools of `http_client`.
+        :param api_key:
+        :param api_base:
+        :param timeouts: Read timeout in seconds by endpoint, overriding the LOCALLY_*_TIMEOUT settings.
+        :param binary_embeddings: Accept raw float32 embeddings, decoded into a NumPy array.
         """
+        self._api_key = api_key
+        self._api_base = api_base
+        self._binary_embeddings = binary_embeddings
+        self._timeouts = {
+            "embeddings": LOCALLY_EMBEDDINGS_TIMEOUT,
+            "rerank": LOCALLY_RERANK_TIMEOUT,
+            "summarize": LOCALLY_SUMMARIZE_TIMEOUT,
+            "summarize/batch": LOCALLY_SUMMARIZE_TIMEOUT,
+            **(timeouts or {}),
+        }
+
+    @staticmethod
+    def _validate(
+        uri: _URI,
+        payload: EmbeddingsRequest | RerankRequest | SummarizeRequest | SummarizeBatchRequest,
+    ) -> None:
         if uri == "embeddings" and not isinstance(payload, EmbeddingsRequest):
             raise ValueError("Payload must be an instance of EmbeddingsRequest.")
         if uri == "rerank" and not isinstance(payload, RerankRequest):
             raise ValueError("Payload must be an instance of RerankRequest.")
         if uri == "summarize" and not isinstance(payload, SummarizeRequest):
             raise ValueError("Payload must be an instance of SummarizeRequest.")
+        if uri == "summarize/batch" and not isinstance(payload, SummarizeBatchRequest):
+            raise ValueError("Payload must be an instance of SummarizeBatchRequest.")
 
-        try:
-            response = self._session.post(
-                "/".join([self._api_base, uri]),
-                timeout=60,
-                headers={"Authorization": f"Bearer {self._api_key}"},
-                json=payload.model_dump(),
+    @staticmethod
+    def _parse(
+        uri: _URI,
+        content: bytes,
+    ) -> RerankResponse | EmbeddingsResponse | SummarizeResponse | SummarizeBatchResponse:
+        match uri:
+            case "embeddings":
+                return EmbeddingsResponse.model_validate_json(content)
+            case "rerank":
+                return RerankResponse.model_validate_json(content)
+            case "summarize":
+                return SummarizeResponse.model_validate_json(content)
+            case "summarize/batch":
+                return SummarizeBatchResponse.model_validate_json(content)
+            case _:
+                raise ValueError(f"Invalid URI: {uri}")
+
+    def _timeout(self, uri: _URI) -> httpx.Timeout:
+        return httpx.Timeout(self._timeouts[uri], connect=LOCALLY_API_CONNECT_TIMEOUT)
+
+    def _post_options(self, uri: _URI, payload) -> dict:
+        headers = {"Authorization": f"Bearer {self._api_key}"}
+        if uri == "embeddings" and self._binary_embeddings:
+            # Servers without the binary format ignore it and answer in JSON
+            headers["Accept"] = f"{EMBEDDINGS_MEDIA_TYPE}, application/json;q=0.5"
+        return dict(
+            url="/".join([self._api_base, uri]),
+            timeout=self._timeout(uri),
+            headers=headers,
+            json=payload.model_dump(),
+        )
+
+    def _read(
+        self,
+        uri: _URI,
+        response: httpx.Response,
+    ) -> RerankResponse | EmbeddingsResponse | SummarizeResponse | SummarizeBatchResponse:
+        if not response.is_success:
+            raise APIRequestError(
+                f"API request failed with status code {response.status_code}",
+                status_code=response.status_code,
             )
-            if not response.ok:
-                raise APIRequestError(
-                    f"API request failed with status code {response.status_code}",
-                    status_code=response.status_code,
-                )
-            data = response.json()
-            match uri:
-                case "embeddings":
-                    return EmbeddingsResponse(**data)
-                case "rerank":
-                    return RerankResponse(**data)
-                case "summarize":
-                    return SummarizeResponse(**data)
-                case _:
-                    raise ValueError(f"Invalid URI: {uri}")
-        except Timeout:
+        try:
+            if uri == "embeddings" and response.headers.get("content-type", "").startswith(EMBEDDINGS_MEDIA_TYPE):
+                return EmbeddingsResponse(embeddings=decode_embeddings(response.content))
+            return self._parse(uri, response.content)
+        except ValueError:
             logger(
-                "Request timed out. Please check your connection and try again.",
+                "Failed to decode the response from the API.",
                 "error"
             )
-            raise APIRequestError("Request timed out")
-        except JSONDecodeError:
+            raise APIRequestError("Failed to decode the response")
+
+    @staticmethod
+    def _error(e: Exception) -> APIRequestError:
+        if isinstance(e, httpx.TimeoutException):
             logger(
-                "Failed to decode JSON response from the API.",
+                "Request timed out. Please check your connection and try again.",
                 "error"
             )
-            raise APIRequestError("Failed to decode JSON response")
-        except RequestException as e:
-            logger(
-                f"An error occurred while making the request: {e}",
-                "error"
+            return APIRequestError("Request timed out")
+        logger(
+            f"An error occurred while making the request: {e}",
+            "error"
+        )
+        return APIRequestError(
+            f"An error occurred while making the request: {e}"
+        )
 
-            )
-            raise APIRequestError(
-                f"An error occurred while making the request: {e}",
-                status_code=e.response.status_code if e.response else None,
-            )
+    def request(
+        self,
+        uri: _URI,
+        payload: EmbeddingsRequest | RerankRequest | SummarizeRequest | SummarizeBatchRequest,
+    ) -> Optional[RerankResponse | EmbeddingsResponse | SummarizeResponse | SummarizeBatchResponse]:
+        """
+        Make a request to the local API.
+        Uses the HTTP client shared by the process.
+        :param uri: The endpoint to call (embeddings, rerank, summarize or summarize/batch).
+        :param payload: The payload to send in the request.
+        :return: The response from the API.
+        """
+        self._validate(uri, payload)
+
+        try:
+            response = get_client().post(**self._post_options(uri, payload))
         except Exception as e:
-            logger(
-                f"An error occurred while making the request: {e}",
-                "error"
+            raise self._error(e)
+        return self._read(uri, response)
 
-            )
-            raise APIRequestError(
-                f"An error occurred while making the request: {e}"
-            )
+    async def arequest(
+        self,
+        uri: _URI,
+        payload: EmbeddingsRequest | RerankRequest | SummarizeRequest | SummarizeBatchRequest,
+    ) -> Optional[RerankResponse | EmbeddingsResponse | SummarizeResponse | SummarizeBatchResponse]:
+        """
+        Make a request to the local API without blocking the event loop.
+        Uses the HTTP client shared by the running event loop.
+        :param uri: The endpoint to call (embeddings, rerank, summarize or summarize/batch).
+        :param payload: The payload to send in the request.
+        :return: The response from the API.
+        """
+        self._validate(uri, payload)
+
+        try:
+            response = await get_async_client().post(**self._post_options(uri, payload))
+        except Exception as e:
+            raise self._error(e)
+        return self._read(uri, response)
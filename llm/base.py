@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from typing import Iterator, TypeVar
 
 from langchain_core.messages import BaseMessage
 
@@ -71,6 +72,42 @@ class BaseLLM(ABC):
             "Subclasses must implement the 'summarize' method to produce a summary based on the provided text."
         )
 
+    async def agenerate_sub_queries(self, query: str) -> list[str]:
+        """
+        Asynchronously generate sub-queries based on the provided query.
+        Runs `generate_sub_queries` in a worker thread unless overridden.
+        :param query:
+        :return:
+        """
+        return await asyncio.to_thread(self.generate_sub_queries, query)
+
+    async def areflection(self, query: str, sub_queries: list[str], chunks: list[str]) -> ReflectionResultSchema:
+        """
+        Asynchronously generate a reflection based on the provided query, sub-queries, and chunks.
+        Runs `reflection` in a worker thread unless overridden.
+        :param query:
+        :param sub_queries:
+        :param chunks:
+        :return:
+        """
+        return await asyncio.to_thread(self.reflection, query, sub_queries, chunks)
+
+    async def asummarize(self, query: str, chunks: list[str]) -> str:
+        """
+        Asynchronously generate a summary based on the provided text.
+        Runs `summarize` in a worker thread unless overridden.
+        :return:
+        """
+        return await asyncio.to_thread(self.summarize, query, chunks)
+
+    def stream_summarize(self, query: str, chunks: list[str]) -> Iterator[str]:
+        """
+        Generate a summary based on the provided text, yielding it as it is produced.
+        Yields the whole `summarize` result at once unless overridden.
+        :return:
+        """
+        yield self.summarize(query, chunks)
+
 
 class BaseEmbedding(ABC):
     """
@@ -86,6 +123,13 @@ class BaseEmbedding(ABC):
             "Subclasses must implement the 'embed' method to produce embeddings based on the provided text."
         )
 
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Asynchronously generate embeddings based on the provided text.
+        Runs `embed` in a worker thread unless overridden.
+        """
+        return await asyncio.to_thread(self.embed, texts)
+
 
 class BaseReranker(ABC):
     """
@@ -101,6 +145,13 @@ class BaseReranker(ABC):
             "Subclasses must implement the 'rerank' method to reorder documents based on the provided query."
         )
 
+    async def arerank(self, query: str, documents: list[str]) -> list[RerankResponse]:
+        """
+        Asynchronously rerank the provided documents based on the query.
+        Runs `rerank` in a worker thread unless overridden.
+        """
+        return await asyncio.to_thread(self.rerank, query, documents)
+
 
 class BaseSummarization(ABC):
     """
@@ -116,3 +167,9 @@ class BaseSummarization(ABC):
             "Subclasses must implement the 'summarize' method to produce a summary based on the provided documents."
         )
 
+    async def asummarize(self, query: str, document: str) -> str:
+        """
+        Asynchronously summarize the provided document based on the query.
+        Runs `summarize` in a worker thread unless overridden.
+        """
+        return await asyncio.to_thread(self.summarize, query, document)
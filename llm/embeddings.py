@@ -1,11 +1,20 @@
+import asyncio
+from typing import Optional
+
+import numpy as np
 from tenacity import (
     wait_random_exponential,
     stop_after_attempt,
     retry
 )
 
-from schemas import EmbeddingsRequest
+from async_runtime import ContextThreadPoolExecutor
+from caching import EmbeddingCache, get_embedding_cache
+from config import USE_EMBEDDING_CACHE, EMBEDDINGS_BATCH_SIZE, EMBEDDINGS_MAX_CONCURRENCY
+from schemas import EmbeddingsRequest, CacheStats
+from tracing import Span, span
 from .base import BaseEmbedding
+from ._batching import balanced_batches
 from ._locally_call_api import LocallyCallAPI
 from exceptions import (
     APIRequestError,
@@ -17,26 +26,57 @@ from exceptions import (
 class Embeddings(BaseEmbedding):
     """
     Locally embedding class.
+    Embeddings are memoized by text, so only the cache misses are sent to the server,
+    split into batches embedded concurrently.
     """
-    def __init__(self):
-        self._client = LocallyCallAPI()
+    def __init__(
+        self,
+        client: Optional[LocallyCallAPI] = None,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = EMBEDDINGS_BATCH_SIZE,
+        max_concurrency: int = EMBEDDINGS_MAX_CONCURRENCY,
+    ):
+        if not 1 <= batch_size <= 100:
+            raise ValueError("batch_size must be between 1 and 100.")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0.")
+        self._client = client or LocallyCallAPI()
+        self._cache = cache or (get_embedding_cache() if USE_EMBEDDING_CACHE else None)
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
 
 
-    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
-    def embed(self, texts: list[str]) -> list[list[float]]:
-        """
-        Generate embeddings for a list of texts.
-        :param texts:
-        :return:
-        """
-        if len(texts) == 0 or len(texts) > 100:
-            raise InvalidEmbedValue("Number of texts must be between 1 and 100.")
+    @staticmethod
+    def _validate(texts: list[str]) -> None:
+        if len(texts) == 0:
+            raise InvalidEmbedValue("Texts must not be empty.")
+
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6), reraise=True)
+    def _embed(self, texts: list[str]) -> list[list[float]] | np.ndarray:
+        try:
+            with span("embed.batch", texts=len(texts), bytes=sum(len(text) for text in texts)):
+                response = self._client.request(
+                    "embeddings",
+                    EmbeddingsRequest(texts=texts),
+                )
+            result = response.embeddings
+            if len(result) == 0:
+                raise EmbedError("No embeddings were returned.")
+            return result
+        except APIRequestError as e:
+            raise EmbedError(
+                f"Failed to get embeddings: {e}" +
+                (f" Status code: {e.status_code}" if e.status_code else ""),
+            ) from e
 
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6), reraise=True)
+    async def _aembed(self, texts: list[str]) -> list[list[float]] | np.ndarray:
         try:
-            response = self._client.request(
-                "embeddings",
-                EmbeddingsRequest(texts=texts),
-            )
+            with span("embed.batch", texts=len(texts), bytes=sum(len(text) for text in texts)):
+                response = await self._client.arequest(
+                    "embeddings",
+                    EmbeddingsRequest(texts=texts),
+                )
             result = response.embeddings
             if len(result) == 0:
                 raise EmbedError("No embeddings were returned.")
@@ -44,5 +84,125 @@ class Embeddings(BaseEmbedding):
         except APIRequestError as e:
             raise EmbedError(
                 f"Failed to get embeddings: {e}" +
-                f"Status code: {e.status_code}" if e.status_code else "",
-            )
+                (f" Status code: {e.status_code}" if e.status_code else ""),
+            ) from e
+
+    @staticmethod
+    def _concat(results: list[list[list[float]] | np.ndarray]) -> np.ndarray:
+        if len(results) == 1:
+            return np.asarray(results[0], dtype=np.float32)  # keeps the binary response zero-copy
+        return np.concatenate([np.asarray(result, dtype=np.float32) for result in results])
+
+    def _embed_batches(self, texts: list[str], current: Span) -> np.ndarray:
+        """
+        Embed `batch_size` texts per request, with up to `max_concurrency` requests in flight.
+        :param texts:
+        :param current:
+        :return: The embeddings, in order.
+        """
+        batches = balanced_batches(len(texts), self._batch_size)
+        current.set("batches", len(batches))
+        if len(batches) <= 1:
+            return self._concat([self._embed(texts)])
+        with ContextThreadPoolExecutor(max_workers=min(self._max_concurrency, len(batches))) as executor:
+            return self._concat(list(executor.map(lambda batch: self._embed(texts[batch]), batches)))
+
+    async def _aembed_batches(self, texts: list[str], current: Span) -> np.ndarray:
+        batches = balanced_batches(len(texts), self._batch_size)
+        current.set("batches", len(batches))
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def perform(batch: slice) -> list[list[float]] | np.ndarray:
+            async with semaphore:
+                return await self._aembed(texts[batch])
+
+        return self._concat(list(await asyncio.gather(*(perform(batch) for batch in batches))))
+
+    def _plan(self, texts: list[str]) -> tuple[list[Optional[np.ndarray]], list[str]]:
+        """
+        Resolve the memoized embeddings and list the distinct texts still to embed.
+        :param texts:
+        :return: The embedding of each text (None when pending) and the pending texts.
+        """
+        vectors = self._cache.get_many(texts) if self._cache is not None else [None] * len(texts)
+        pending = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        return vectors, pending
+
+    def _assemble(
+        self,
+        texts: list[str],
+        vectors: list[Optional[np.ndarray]],
+        pending: list[str],
+        embedded: Optional[np.ndarray],
+        current: Span,
+    ) -> np.ndarray:
+        """
+        Memoize the new embeddings and stack every embedding in input order.
+        :param texts:
+        :param vectors: The memoized embedding of each text, None when it was pending.
+        :param pending: The texts that were embedded.
+        :param embedded: The embeddings of the pending texts.
+        :param current:
+        :return:
+        """
+        current.set("cache_hits", len(texts) - sum(vector is None for vector in vectors))
+        if embedded is None:
+            return np.stack(vectors)
+        if len(embedded) != len(pending):
+            raise EmbedError(f"Expected {len(pending)} embeddings, got {len(embedded)}.")
+        if self._cache is not None:
+            self._cache.put_many(pending, embedded)
+        if len(pending) == len(texts):
+            return embedded
+        rows = dict(zip(pending, embedded))
+        return np.stack([vector if vector is not None else rows[text] for text, vector in zip(texts, vectors)])
+
+    def embed_array(self, texts: list[str]) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts as a float32 array of shape (len(texts), dim).
+        With the binary transport and no cache hits the array is a read-only view of the response.
+        :param texts:
+        :return:
+        """
+        self._validate(texts)
+
+        with span("embed", texts=len(texts), bytes=sum(len(text) for text in texts)) as current:
+            vectors, pending = self._plan(texts)
+            embedded = self._embed_batches(pending, current) if pending else None
+            return self._assemble(texts, vectors, pending, embedded, current)
+
+    async def aembed_array(self, texts: list[str]) -> np.ndarray:
+        """
+        Asynchronously generate embeddings for a list of texts as a float32 array.
+        :param texts:
+        :return:
+        """
+        self._validate(texts)
+
+        with span("embed", texts=len(texts), bytes=sum(len(text) for text in texts)) as current:
+            vectors, pending = self._plan(texts)
+            embedded = await self._aembed_batches(pending, current) if pending else None
+            return self._assemble(texts, vectors, pending, embedded, current)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for a list of texts.
+        :param texts:
+        :return:
+        """
+        return self.embed_array(texts).tolist()
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Asynchronously generate embeddings for a list of texts.
+        :param texts:
+        :return:
+        """
+        return (await self.aembed_array(texts)).tolist()
+
+    def cache_stats(self) -> Optional[CacheStats]:
+        """
+        Get the hit/miss counters of the embedding cache.
+        :return: The counters, or None when the cache is disabled.
+        """
+        return self._cache.stats() if self._cache is not None else None
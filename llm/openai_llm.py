@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Any, Optional, TypeVar
+from typing import List, Any, Iterator, Optional, TypeVar
 from uuid import UUID
 
 from langchain.agents import AgentExecutor, create_tool_calling_agent
@@ -170,7 +170,7 @@ class OpenAILLM(BaseLLM):
         except Exception as e:
             return f"An error occurred: {e}"
 
-    def _generate_structured_output(self, template: str, prompt: str, schema: type[T], inputs: dict) -> T:
+    def _structured_chain(self, template: str, prompt: str, schema: type[T], inputs: dict):
         system_prompt = ChatPromptTemplate.from_messages(
             messages=[
                 SystemMessagePromptTemplate(
@@ -187,11 +187,14 @@ class OpenAILLM(BaseLLM):
 
         structured_schema = self._chat_llm.with_structured_output(schema, method="json_schema")
 
-        chain = (
+        return (
             system_prompt |
             structured_schema
         )
 
+    def _generate_structured_output(self, template: str, prompt: str, schema: type[T], inputs: dict) -> T:
+        chain = self._structured_chain(template, prompt, schema, inputs)
+
         try:
             output: schema = chain.invoke(inputs)
             return output
@@ -200,6 +203,17 @@ class OpenAILLM(BaseLLM):
                 f"Failed to generate structured output: {e}"
             ) from e
 
+    async def _agenerate_structured_output(self, template: str, prompt: str, schema: type[T], inputs: dict) -> T:
+        chain = self._structured_chain(template, prompt, schema, inputs)
+
+        try:
+            output: schema = await chain.ainvoke(inputs)
+            return output
+        except Exception as e:
+            raise GenerativeError(
+                f"Failed to generate structured output: {e}"
+            ) from e
+
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
     def flashcard(self, prompt: str, quantities: int = 5) -> List[FlashCardSchema]:
         """
@@ -237,6 +251,24 @@ class OpenAILLM(BaseLLM):
 
         return output.flashcards
 
+    @staticmethod
+    def _sub_queries_inputs(query: str) -> dict:
+        return {
+            "current_date": datetime.now().strftime("%Y"),
+            "original_query": query,
+        }
+
+    def _check_sub_queries(self, query: str, output: SubQueriesResultSchema) -> list[str]:
+        if not output.queries:
+            logger(
+                f"No sub-queries generated for query: {query}",
+                level="error",
+                ui=self._ui,
+            )
+            raise GenerativeError("No sub-queries generated.")
+
+        return output.queries
+
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
     def generate_sub_queries(self, query: str) -> list[str]:
         """
@@ -256,21 +288,51 @@ class OpenAILLM(BaseLLM):
             template=template,
             prompt=query,
             schema=SubQueriesResultSchema,
-            inputs={
-                "current_date": datetime.now().strftime("%Y"),
-                "original_query": query,
-            },
+            inputs=self._sub_queries_inputs(query),
         )
 
-        if not output.queries:
+        return self._check_sub_queries(query, output)
+
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+    async def agenerate_sub_queries(self, query: str) -> list[str]:
+        """
+        Asynchronously generate sub-queries based on the provided query.
+        :param query:
+        :return:
+        """
+        logger(
+            f"Generating sub-queries for query: {query}",
+            level="info",
+            ui=self._ui,
+        )
+
+        output = await self._agenerate_structured_output(
+            template=SUB_QUERY_PROMPT,
+            prompt=query,
+            schema=SubQueriesResultSchema,
+            inputs=self._sub_queries_inputs(query),
+        )
+
+        return self._check_sub_queries(query, output)
+
+    @staticmethod
+    def _reflection_inputs(query: str, sub_queries: list[str], chunks: list[str]) -> dict:
+        return {
+            "original_query": query,
+            "previous_queries": sub_queries,
+            "previous_documents": "\n".join(chunks),
+        }
+
+    def _check_reflection(self, query: str, output: ReflectionResultSchema) -> ReflectionResultSchema:
+        if not output.sub_queries:
             logger(
-                f"No sub-queries generated for query: {query}",
+                f"No reflection generated for query: {query}",
                 level="error",
                 ui=self._ui,
             )
-            raise GenerativeError("No sub-queries generated.")
+            raise GenerativeError("No reflection generated.")
 
-        return output.queries
+        return output
 
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
     def reflection(self, query: str, sub_queries: list[str], chunks: list[str]) -> ReflectionResultSchema:
@@ -287,25 +349,30 @@ class OpenAILLM(BaseLLM):
             template=template,
             prompt=query,
             schema=ReflectionResultSchema,
-            inputs={
-                "original_query": query,
-                "previous_queries": sub_queries,
-                "previous_documents": "\n".join(chunks),
-            },
+            inputs=self._reflection_inputs(query, sub_queries, chunks),
         )
 
-        if not output.sub_queries:
-            logger(
-                f"No reflection generated for query: {query}",
-                level="error",
-                ui=self._ui,
-            )
-            raise GenerativeError("No reflection generated.")
-
-        return output
+        return self._check_reflection(query, output)
 
     @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
-    def summarize(self, query: str, chunks: list[str]) -> str:
+    async def areflection(self, query: str, sub_queries: list[str], chunks: list[str]) -> ReflectionResultSchema:
+        """
+        Asynchronously generate a reflection based on the provided query, sub-queries, and chunks.
+        :param query:
+        :param sub_queries:
+        :param chunks:
+        :return:
+        """
+        output = await self._agenerate_structured_output(
+            template=REFLECT_PROMPT,
+            prompt=query,
+            schema=ReflectionResultSchema,
+            inputs=self._reflection_inputs(query, sub_queries, chunks),
+        )
+
+        return self._check_reflection(query, output)
+
+    def _summarize_chain(self):
         template = SUMMARIZER_PROMPT
 
         prompt_system = ChatPromptTemplate.from_messages(
@@ -322,11 +389,26 @@ class OpenAILLM(BaseLLM):
             ]
         )
 
-        chain = (
+        return (
             prompt_system |
             self._chat_llm
         )
 
+    def _check_summary(self, query: str, result) -> str:
+        if not result:
+            logger(
+                f"No summary generated for query: {query}",
+                level="error",
+                ui=self._ui,
+            )
+            raise GenerativeError("No summary generated.")
+
+        return result.content
+
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+    def summarize(self, query: str, chunks: list[str]) -> str:
+        chain = self._summarize_chain()
+
         try:
             result = chain.invoke(
                 {
@@ -335,15 +417,49 @@ class OpenAILLM(BaseLLM):
                 }
             )
 
-            if not result:
-                logger(
-                    f"No summary generated for query: {query}",
-                    level="error",
-                    ui=self._ui,
-                )
-                raise GenerativeError("No summary generated.")
+            return self._check_summary(query, result)
+        except Exception as e:
+            raise GenerativeError(
+                f"Failed to generate summary: {e}"
+            ) from e
+
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+    async def asummarize(self, query: str, chunks: list[str]) -> str:
+        chain = self._summarize_chain()
+
+        try:
+            result = await chain.ainvoke(
+                {
+                    "original_query": query,
+                    "chunks": "\n\n".join(chunks),
+                }
+            )
 
-            return result.content
+            return self._check_summary(query, result)
+        except Exception as e:
+            raise GenerativeError(
+                f"Failed to generate summary: {e}"
+            ) from e
+
+    def stream_summarize(self, query: str, chunks: list[str]) -> Iterator[str]:
+        """
+        Generate a summary, yielding its tokens as the model streams them.
+        Not retried: tokens already yielded cannot be taken back.
+        :param query:
+        :param chunks:
+        :return:
+        """
+        chain = self._summarize_chain()
+
+        try:
+            for message in chain.stream(
+                {
+                    "original_query": query,
+                    "chunks": "\n\n".join(chunks),
+                }
+            ):
+                if message.content:
+                    yield message.content
         except Exception as e:
             raise GenerativeError(
                 f"Failed to generate summary: {e}"
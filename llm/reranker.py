@@ -1,12 +1,18 @@
+import asyncio
+from typing import Optional
+
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 
-from config import USE_RERANKER
+from async_runtime import ContextThreadPoolExecutor
+from config import USE_RERANKER, RERANK_BATCH_SIZE, RERANK_MAX_CONCURRENCY
 from schemas import RerankRequest, RerankedDocument
+from tracing import span
 from exceptions import (
     APIRequestError,
     RerankError,
     InvalidRerankValue
 )
+from ._batching import balanced_batches
 from ._locally_call_api import LocallyCallAPI
 from .base import BaseReranker
 
@@ -14,48 +20,127 @@ from .base import BaseReranker
 class Reranker(BaseReranker):
     """
     Locally reranker class.
+    Large inputs are split into batches reranked concurrently, then sorted again as a whole.
     """
     THRESHOLD = 0.51
 
-    def __init__(self):
-        self._client = LocallyCallAPI()
+    def __init__(
+        self,
+        client: Optional[LocallyCallAPI] = None,
+        batch_size: int = RERANK_BATCH_SIZE,
+        max_concurrency: int = RERANK_MAX_CONCURRENCY,
+    ):
+        if not 1 <= batch_size <= 100:
+            raise ValueError("batch_size must be between 1 and 100.")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0.")
+        self._client = client or LocallyCallAPI()
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
 
 
-    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
-    def rerank(self, query: str, documents: list[str]) -> list[RerankedDocument]:
+    def _filter(self, result: list[RerankedDocument]) -> list[RerankedDocument]:
         """
-        Rerank the provided documents based on the query.
-        :param query:
-        :param documents:
+        Filter out documents with score less than the threshold.
+        :param result:
         :return:
         """
-        if len(documents) == 0 or len(documents) > 100:
-            raise InvalidRerankValue("Number of documents must be between 1 and 100.")
+        return [
+            RerankedDocument(
+                document=document.document,
+                score=document.score,
+            )
+            for document in result
+            if document.score >= self.THRESHOLD
+        ]
+
+    @staticmethod
+    def _validate(query: str, documents: list[str]) -> None:
+        if len(documents) == 0:
+            raise InvalidRerankValue("Documents must not be empty.")
         if not isinstance(query, str):
             raise InvalidRerankValue("Query must be a string.")
-        if not USE_RERANKER:
-            return [RerankedDocument(document=doc, score=None) for doc in documents]
 
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6), reraise=True)
+    def _rerank(self, query: str, documents: list[str]) -> list[RerankedDocument]:
         try:
-            response = self._client.request(
-                "rerank",
-                RerankRequest(query=query, documents=documents),
-            )
-            result = response.reranked
-            if len(result) == 0:
-                return []
-            # Filter out documents with score less than the threshold
-            return [
-                RerankedDocument(
-                    document=document.document,
-                    score=document.score,
+            with span("rerank.batch", documents=len(documents), bytes=sum(len(doc) for doc in documents)):
+                response = self._client.request(
+                    "rerank",
+                    RerankRequest(query=query, documents=documents),
                 )
-                for document in result
-                if document.score >= self.THRESHOLD
-            ]
+            return response.reranked
             #
         except APIRequestError as e:
             raise RerankError(
                 f"Failed to get reranked documents: {e}" +
-                f"Status code: {e.status_code}" if e.status_code else "",
+                (f" Status code: {e.status_code}" if e.status_code else ""),
             ) from e
+
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6), reraise=True)
+    async def _arerank(self, query: str, documents: list[str]) -> list[RerankedDocument]:
+        try:
+            with span("rerank.batch", documents=len(documents), bytes=sum(len(doc) for doc in documents)):
+                response = await self._client.arequest(
+                    "rerank",
+                    RerankRequest(query=query, documents=documents),
+                )
+            return response.reranked
+        except APIRequestError as e:
+            raise RerankError(
+                f"Failed to get reranked documents: {e}" +
+                (f" Status code: {e.status_code}" if e.status_code else ""),
+            ) from e
+
+    def _merge(self, results: list[list[RerankedDocument]]) -> list[RerankedDocument]:
+        """
+        Sort the documents of every batch by score, as if they were reranked in one request.
+        """
+        if len(results) == 1:
+            return self._filter(results[0])
+        merged = [document for result in results for document in result]
+        return self._filter(sorted(merged, key=lambda document: document.score or 0, reverse=True))
+
+    def rerank(self, query: str, documents: list[str]) -> list[RerankedDocument]:
+        """
+        Rerank the provided documents based on the query.
+        Documents are sent `batch_size` per request, with up to `max_concurrency` requests in flight.
+        :param query:
+        :param documents:
+        :return:
+        """
+        self._validate(query, documents)
+        if not USE_RERANKER:
+            return [RerankedDocument(document=doc, score=None) for doc in documents]
+
+        batches = balanced_batches(len(documents), self._batch_size)
+        with span("rerank", documents=len(documents), bytes=sum(len(doc) for doc in documents), batches=len(batches)):
+            if len(batches) <= 1:
+                results = [self._rerank(query, documents)]
+            else:
+                with ContextThreadPoolExecutor(max_workers=min(self._max_concurrency, len(batches))) as executor:
+                    results = list(executor.map(lambda batch: self._rerank(query, documents[batch]), batches))
+        return self._merge(results)
+
+    async def arerank(self, query: str, documents: list[str]) -> list[RerankedDocument]:
+        """
+        Asynchronously rerank the provided documents based on the query.
+        Documents are sent `batch_size` per request, with up to `max_concurrency` requests in flight.
+        :param query:
+        :param documents:
+        :return:
+        """
+        self._validate(query, documents)
+        if not USE_RERANKER:
+            return [RerankedDocument(document=doc, score=None) for doc in documents]
+
+        batches = balanced_batches(len(documents), self._batch_size)
+        with span("rerank", documents=len(documents), bytes=sum(len(doc) for doc in documents), batches=len(batches)):
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+
+            async def perform(batch: slice) -> list[RerankedDocument]:
+                async with semaphore:
+                    return await self._arerank(query, documents[batch])
+
+            results = await asyncio.gather(*(perform(batch) for batch in batches))
+        return self._merge(list(results))
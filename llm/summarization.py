@@ -1,16 +1,36 @@
+import asyncio
+from typing import Optional
+
 import tiktoken
 from langchain_text_splitters import CharacterTextSplitter
 
+from async_runtime import ContextThreadPoolExecutor
+from caching import SummarizationCache, get_summarization_cache
+from config import USE_SUMMARIZATION_CACHE, SUMMARIZATION_BATCH_SIZE, SUMMARIZATION_MAX_CONCURRENCY
 from exceptions import SummarizationError, APIRequestError
 from loggings import logger
-from schemas import SummarizeRequest
+from schemas import SummarizeBatchRequest, CacheStats
+from tracing import Span, span
 from .base import BaseSummarization
 from ._locally_call_api import LocallyCallAPI
 
 
 class Summarization(BaseSummarization):
-    def __init__(self):
-        self._client = LocallyCallAPI()
+    def __init__(
+        self,
+        cache: Optional[SummarizationCache] = None,
+        client: Optional[LocallyCallAPI] = None,
+        batch_size: int = SUMMARIZATION_BATCH_SIZE,
+        max_concurrency: int = SUMMARIZATION_MAX_CONCURRENCY,
+    ):
+        if not 1 <= batch_size <= 64:
+            raise ValueError("batch_size must be between 1 and 64.")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0.")
+        self._client = client or LocallyCallAPI()
+        self._cache = cache or (get_summarization_cache() if USE_SUMMARIZATION_CACHE else None)
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
         self._tokenizer = tiktoken.get_encoding("cl100k_base")
         self._splitter = CharacterTextSplitter.from_tiktoken_encoder(
             encoding_name="cl100k_base",
@@ -29,46 +49,196 @@ class Summarization(BaseSummarization):
         """
         return len(self._tokenizer.encode(document))
 
-    def _perform(self, query: str, doc: str) -> str:
+    def _plan(self, query: str, docs: list[str]) -> tuple[list[Optional[str]], list[list[int]]]:
         """
-        Perform the summarization on the provided text.
+        Resolve the memoized summaries and group the remaining chunks into batches.
         :param query:
-        :param doc:
-        :return:
+        :param docs:
+        :return: The summary of each chunk (None when pending) and the indexes of each batch.
         """
-        return self._client.request(
-            "summarize",
-            SummarizeRequest(
-                query=query,
-                document=doc,
-            ),
-        ).summary
+        summaries = [
+            self._cache.get(query, doc) if self._cache is not None else None
+            for doc in docs
+        ]
+        pending = [i for i, summary in enumerate(summaries) if summary is None]
+        batches = [pending[i:i + self._batch_size] for i in range(0, len(pending), self._batch_size)]
+        return summaries, batches
 
-    def summarize(self, query: str, document: str) -> str:
+    def _memoize(self, query: str, docs: list[str], summaries: list[str]) -> None:
+        if self._cache is None or len(summaries) != len(docs):
+            return # a mismatched batch is dropped by `_merge`
+        for doc, summary in zip(docs, summaries):
+            if summary:
+                self._cache.put(query, doc, summary)
+
+    def _perform(self, query: str, docs: list[str]) -> list[str]:
         """
-        Generate a summary based on the provided text.
+        Summarize a batch of chunks in a single request.
         :param query:
-        :param document:
-        :return:
+        :param docs:
+        :return: The summary of each chunk, in order.
+        """
+        with span("summarize.batch", chunks=len(docs), bytes=sum(len(doc) for doc in docs)):
+            summaries = self._client.request(
+                "summarize/batch",
+                SummarizeBatchRequest(
+                    query=query,
+                    documents=docs,
+                ),
+            ).summaries
+        self._memoize(query, docs, summaries)
+        return summaries
+
+    async def _aperform(self, query: str, docs: list[str]) -> list[str]:
+        """
+        Asynchronously summarize a batch of chunks in a single request.
+        :param query:
+        :param docs:
+        :return: The summary of each chunk, in order.
+        """
+        with span("summarize.batch", chunks=len(docs), bytes=sum(len(doc) for doc in docs)):
+            response = await self._client.arequest(
+                "summarize/batch",
+                SummarizeBatchRequest(
+                    query=query,
+                    documents=docs,
+                ),
+            )
+        self._memoize(query, docs, response.summaries)
+        return response.summaries
+
+    def _perform_batch(self, query: str, docs: list[str]) -> Optional[list[str]]:
+        try:
+            return self._perform(query, docs)
+        except SummarizationError as e:
+            logger(e)
+        except APIRequestError as e:
+            logger(e)
+        except Exception as e:
+            raise SummarizationError(
+                f"An error occurred during summarization: {str(e)}"
+            )
+        return None
+
+    async def _aperform_batch(self, query: str, docs: list[str]) -> Optional[list[str]]:
+        try:
+            return await self._aperform(query, docs)
+        except SummarizationError as e:
+            logger(e)
+        except APIRequestError as e:
+            logger(e)
+        except Exception as e:
+            raise SummarizationError(
+                f"An error occurred during summarization: {str(e)}"
+            )
+        return None
+
+    @staticmethod
+    def _merge(
+        summaries: list[Optional[str]],
+        batches: list[list[int]],
+        results: list[Optional[list[str]]],
+    ) -> str:
+        """
+        Join the chunk summaries in document order, skipping the batches that failed.
+        """
+        for batch, result in zip(batches, results):
+            if result is None:
+                continue
+            if len(result) != len(batch):
+                logger(
+                    f"Summarization returned {len(result)} summaries for a batch of {len(batch)} chunks, "
+                    "skipping the batch.",
+                    "warning"
+                )
+                continue
+            for i, summary in zip(batch, result):
+                summaries[i] = summary
+        return "\n".join(summary for summary in summaries if summary is not None)
+
+    def _record(self, current: Span, documents: list[str], batches: list[list[int]]) -> None:
+        """
+        Attach the chunk, token and cache hit counts of a summarization to its span.
+        """
+        if not current.recording:
+            return
+        current.set("chunks", len(documents))
+        current.set("tokens", sum(self._calc_tokens(doc) for doc in documents))
+        current.set("cache_hits", len(documents) - sum(len(batch) for batch in batches))
+        current.set("batches", len(batches))
+
+    def _log_cache_stats(self) -> None:
+        if self._cache is None:
+            return
+        stats = self._cache.stats()
+        logger(
+            f"Summarization cache: {stats.hits} hits ({stats.memory_hits} memory, {stats.disk_hits} disk), "
+            f"{stats.misses} misses, hit rate {stats.hit_rate:.1%}",
+            "debug",
+        )
+
+    def cache_stats(self) -> Optional[CacheStats]:
+        """
+        Get the hit/miss counters of the summarization cache.
+        :return: The counters, or None when the cache is disabled.
         """
+        return self._cache.stats() if self._cache is not None else None
+
+    @staticmethod
+    def _validate(query: str, document: str) -> None:
         if not isinstance(query, str):
             raise SummarizationError("Query must be a string.")
         if not isinstance(document, str):
             raise SummarizationError("Document must be a string.")
 
-        documents = self._split_text(document)
-        chunks: list[str] = []
-
-        for doc in documents:
-            try:
-                chunks.append(self._perform(query, doc))
-            except SummarizationError as e:
-                logger(e)
-            except APIRequestError as e:
-                logger(e)
-            except Exception as e:
-                raise SummarizationError(
-                    f"An error occurred during summarization: {str(e)}"
-                )
+    def summarize(self, query: str, document: str) -> str:
+        """
+        Generate a summary based on the provided text.
+        Chunks are sent `batch_size` per request, with up to `max_concurrency` requests in flight.
+        :param query:
+        :param document:
+        :return:
+        """
+        self._validate(query, document)
+
+        with span("summarize", bytes=len(document)) as current:
+            documents = self._split_text(document)
+            summaries, batches = self._plan(query, documents)
+            self._record(current, documents, batches)
+
+            if len(batches) <= 1:
+                results = [self._perform_batch(query, [documents[i] for i in batch]) for batch in batches]
+            else:
+                with ContextThreadPoolExecutor(max_workers=min(self._max_concurrency, len(batches))) as executor:
+                    results = list(executor.map(
+                        lambda batch: self._perform_batch(query, [documents[i] for i in batch]),
+                        batches,
+                    ))
+
+        self._log_cache_stats()
+        return self._merge(summaries, batches, results)
+
+    async def asummarize(self, query: str, document: str) -> str:
+        """
+        Asynchronously generate a summary based on the provided text.
+        Chunks are sent `batch_size` per request, with up to `max_concurrency` requests in flight.
+        :param query:
+        :param document:
+        :return:
+        """
+        self._validate(query, document)
+
+        with span("summarize", bytes=len(document)) as current:
+            documents = self._split_text(document)
+            summaries, batches = self._plan(query, documents)
+            self._record(current, documents, batches)
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+
+            async def perform(batch: list[int]) -> Optional[list[str]]:
+                async with semaphore:
+                    return await self._aperform_batch(query, [documents[i] for i in batch])
+
+            results = await asyncio.gather(*(perform(batch) for batch in batches))
 
-        return "\n".join(chunks)
+        self._log_cache_stats()
+        return self._merge(summaries, batches, list(results))
@@ -0,0 +1,26 @@
+import argparse
+
+from databases import Qdrant
+
+parser = argparse.ArgumentParser(
+    description="Apply the QDRANT_* storage and index settings to the existing Qdrant collection."
+)
+
+parser.add_argument(
+    "--recreate",
+    action="store_true",
+    help="Copy every point into a new collection with the current schema (e.g. to add the BM25 sparse "
+         "vectors of hybrid search) and alias the configured name to it. Stop the app and any ingestion "
+         "first: points written during the copy are not carried over.",
+)
+
+parser.add_argument(
+    "--batch-size",
+    type=int,
+    default=256,
+    help="Points copied per request with --recreate.",
+)
+
+args = parser.parse_args()
+
+Qdrant().migrate(recreate=args.recreate, batch_size=args.batch_size)
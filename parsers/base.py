@@ -1,6 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from schemas import CrawledPage
+
 
 class BaseParser(ABC):
     """
@@ -17,3 +20,55 @@ class BaseParser(ABC):
         raise NotImplementedError(
             "The parse method must be implemented in subclasses."
         )
+
+    async def aparse(self, contents: str | bytes | dict) -> Optional[str | bytes | dict]:
+        """
+        Asynchronously parse the content and return the parsed data.
+        Runs `parse` in a worker thread unless overridden.
+        :param contents:
+        :return:
+        """
+        return await asyncio.to_thread(self.parse, contents)
+
+
+class BaseCrawlerParser(BaseParser):
+    """
+    Base class for parsers that crawl web pages.
+    `fetch` also returns the HTTP validators the crawl cache uses to revalidate pages.
+    """
+
+    @abstractmethod
+    def fetch(self, url: str) -> CrawledPage:
+        """
+        Crawl the URL.
+        :param url:
+        :return: The crawled page.
+        """
+        raise NotImplementedError(
+            "The fetch method must be implemented in subclasses."
+        )
+
+    async def afetch(self, url: str) -> CrawledPage:
+        """
+        Asynchronously crawl the URL.
+        Runs `fetch` in a worker thread unless overridden.
+        :param url:
+        :return: The crawled page.
+        """
+        return await asyncio.to_thread(self.fetch, url)
+
+    def parse(self, url: str) -> Optional[str]:
+        """
+        Get the Markdown content of the URL.
+        :param url:
+        :return: The content in Markdown format.
+        """
+        return self.fetch(url).content
+
+    async def aparse(self, url: str) -> Optional[str]:
+        """
+        Asynchronously get the Markdown content of the URL.
+        :param url:
+        :return: The content in Markdown format.
+        """
+        return (await self.afetch(url)).content
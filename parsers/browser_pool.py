@@ -0,0 +1,132 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+from crawl4ai.browser_manager import BrowserManager
+
+from config import CRAWLER_POOL_SIZE, CRAWLER_MAX_PAGES_PER_BROWSER
+from loggings import logger
+
+
+class _PooledCrawler:
+    def __init__(self, crawler: AsyncWebCrawler):
+        self.crawler = crawler
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    Bounded pool of long-lived headless browsers shared by every crawl.
+    Browsers are started on demand, health checked before reuse and
+    recycled after `max_pages` pages. All methods must run on the same event loop.
+    """
+
+    def __init__(
+        self,
+        browser_config: BrowserConfig,
+        size: int = CRAWLER_POOL_SIZE,
+        max_pages: int = CRAWLER_MAX_PAGES_PER_BROWSER,
+    ):
+        if size <= 0:
+            raise ValueError("size must be greater than 0.")
+        if max_pages <= 0:
+            raise ValueError("max_pages must be greater than 0.")
+        self._browser_config = browser_config
+        self._size = size
+        self._max_pages = max_pages
+        self._idle: list[_PooledCrawler] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def _start(self) -> _PooledCrawler:
+        """
+        Start a new browser.
+        Starts are serialized and the Playwright instance cached by crawl4ai is cleared
+        afterward, so each browser owns its driver and closing one never stops the others.
+        https://github.com/unclecode/crawl4ai/issues/842
+        """
+        async with self._start_lock:
+            crawler = AsyncWebCrawler(config=self._browser_config)
+            try:
+                await crawler.start()
+            finally:
+                BrowserManager._playwright_instance = None
+        return _PooledCrawler(crawler)
+
+    @staticmethod
+    async def _stop(pooled: _PooledCrawler) -> None:
+        try:
+            await pooled.crawler.close()
+        except Exception as e:
+            logger(f"Failed to close browser: {e}", "warning")
+
+    @staticmethod
+    def _is_healthy(pooled: _PooledCrawler) -> bool:
+        """
+        Check that the crawler is started and its browser is still connected.
+        """
+        if not getattr(pooled.crawler, "ready", False):
+            return False
+        strategy = getattr(pooled.crawler, "crawler_strategy", None)
+        browser = getattr(getattr(strategy, "browser_manager", None), "browser", None)
+        return browser is None or browser.is_connected()
+
+    async def _checkout(self) -> _PooledCrawler:
+        while self._idle:
+            pooled = self._idle.pop()
+            if self._is_healthy(pooled):
+                return pooled
+            logger("Discarding unhealthy browser from the pool.", "warning")
+            await self._stop(pooled)
+        return await self._start()
+
+    async def _checkin(self, pooled: _PooledCrawler) -> None:
+        if pooled.pages >= self._max_pages or not self._is_healthy(pooled):
+            await self._stop(pooled)
+            return
+        self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AsyncWebCrawler]:
+        """
+        Borrow a browser from the pool, waiting while all of them are busy.
+        :return: A started AsyncWebCrawler.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._size)
+            self._start_lock = asyncio.Lock()
+
+        async with self._slots:
+            pooled = await self._checkout()
+            try:
+                yield pooled.crawler
+            finally:
+                pooled.pages += 1
+                await self._checkin(pooled)
+
+    async def crawl(self, url: str, config: CrawlerRunConfig):
+        """
+        Crawl a URL with a pooled browser.
+        :param url:
+        :param config:
+        :return: The crawl4ai result.
+        """
+        async with self.acquire() as crawler:
+            return await crawler.arun(url, config=config)
+
+    async def close(self) -> None:
+        """
+        Close every idle browser.
+        :return:
+        """
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._stop(pooled) for pooled in idle))
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def browser_config(self) -> BrowserConfig:
+        return self._browser_config
@@ -1,15 +1,63 @@
-from typing import Optional
+import atexit
 import asyncio
+from typing import Optional
 
-from crawl4ai.browser_manager import BrowserManager
-
+from async_runtime import get_event_loop, run_on_loop, run_sync
 from config import PROJECT_NAME
 from exceptions import CrawlerParserError
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, DefaultMarkdownGenerator, CacheMode
-from .base import BaseParser
+from crawl4ai import BrowserConfig, CrawlerRunConfig, DefaultMarkdownGenerator, CacheMode
+from schemas import CrawledPage
+from .base import BaseCrawlerParser
+from .browser_pool import BrowserPool
+
+
+_default_pool: Optional[BrowserPool] = None
+# Pools of the browser configs passed to WebBrowserCrawlerParser, by config identity; closed at exit
+_pools: dict[int, BrowserPool] = {}
+
+
+def _default_browser_config() -> BrowserConfig:
+    return BrowserConfig(
+        browser_type = "firefox",
+        headless = True,
+        viewport_width = 1280,
+        viewport_height = 720,
+        user_agent=f"Mozilla/5.0 AppleWebKit/537.36 (KHTML, like Gecko; compatible; {PROJECT_NAME}/1.0; "
+                   f"+https://github.com/prodesk98/advanced-deep-research)",
+    )
+
+
+@atexit.register
+def _close_pools() -> None:
+    for pool in [_default_pool, *_pools.values()]:
+        if pool is None:
+            continue
+        asyncio.run_coroutine_threadsafe(pool.close(), get_event_loop()).result(timeout=10)
 
 
-class WebBrowserCrawlerParser(BaseParser):
+def _config_pool(browser_config: BrowserConfig) -> BrowserPool:
+    """
+    Get the pool of a browser config, so parsers created with the same config share their browsers.
+    The pool keeps a reference to the config, so its id is not reused.
+    """
+    pool = _pools.get(id(browser_config))
+    if pool is None:
+        pool = _pools[id(browser_config)] = BrowserPool(browser_config)
+    return pool
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Get the browser pool shared by every WebBrowserCrawlerParser using the default browser config.
+    :return: The shared BrowserPool.
+    """
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BrowserPool(_default_browser_config())
+    return _default_pool
+
+
+class WebBrowserCrawlerParser(BaseCrawlerParser):
     def __init__(self, **kwargs):
         self.run_config = CrawlerRunConfig(
             markdown_generator = DefaultMarkdownGenerator(
@@ -27,27 +75,18 @@ class WebBrowserCrawlerParser(BaseParser):
                 "link"
             ],
         )
-        self.browser_config: BrowserConfig = kwargs.get('browser_config', BrowserConfig(
-            browser_type = "firefox",
-            headless = True,
-            viewport_width = 1280,
-            viewport_height = 720,
-            user_agent=f"Mozilla/5.0 AppleWebKit/537.36 (KHTML, like Gecko; compatible; {PROJECT_NAME}/1.0; "
-                       f"+https://github.com/prodesk98/advanced-deep-research)",
-        ))
-        self._crawler: Optional[AsyncWebCrawler] = None # Lazy initialization
-
-    def _lazy_init(self):
-        """
-        Lazy initialization of the AsyncWebCrawler.
-        """
-        if self._crawler is None:
-            self._crawler = AsyncWebCrawler(config=self.browser_config)
+        if "browser_config" in kwargs:
+            self.browser_config: BrowserConfig = kwargs["browser_config"]
+            self._pool = _config_pool(self.browser_config)
+        else:
+            self._pool = get_browser_pool()
+            self.browser_config: BrowserConfig = self._pool.browser_config
 
-    async def _run_web_crawler(self, url: str) -> Optional[str]:
+    async def _run_web_crawler(self, url: str) -> CrawledPage:
         """
-        Fetch the content of the URLs using AsyncWebCrawler.
-        :return: The content of the URLs.
+        Fetch the content of the URL using a pooled AsyncWebCrawler.
+        Must run on the shared event loop, where the browsers live.
+        :return: The crawled page.
         """
         if not url:
             raise ValueError("URL cannot be empty.")
@@ -56,26 +95,30 @@ class WebBrowserCrawlerParser(BaseParser):
         if not url.startswith("http"):
             raise ValueError("URL must start with http or https.")
 
-        if self._crawler is None:
-            self._lazy_init()
+        try:
+            result = await self._pool.crawl(url, self.run_config)
+        except Exception as e:
+            raise CrawlerParserError(url, str(e))
 
-        async with self._crawler as crawler:
-            try:
-                result = await crawler.arun(url, config=self.run_config)
-            except Exception as e:
-                raise CrawlerParserError(url, str(e))
+        headers = {k.lower(): v for k, v in (result.response_headers or {}).items()}
+        return CrawledPage(
+            url=url,
+            content=result.markdown or "",
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
 
-            content = result.markdown or ""
-            # https://github.com/unclecode/crawl4ai/issues/842
-            # Bug Fix: Close the browser instance after use
-            BrowserManager._playwright_instance = None
-            #
-            return content
+    def fetch(self, url: str) -> CrawledPage:
+        """
+        Crawl the URL.
+        The crawl runs on the shared event loop instead of a new loop per URL.
+        :return: The crawled page.
+        """
+        return run_sync(self._run_web_crawler(url))
 
-    def parse(self, url: str) -> Optional[str]:
+    async def afetch(self, url: str) -> CrawledPage:
         """
-        Get the Markdown content of the URL.
-        Use the synchronous method to fetch the content of the URL.
-        :return: The content in Markdown format.
+        Asynchronously crawl the URL.
+        :return: The crawled page.
         """
-        return asyncio.run(self._run_web_crawler(url))
+        return await run_on_loop(self._run_web_crawler(url))
@@ -1,9 +1,19 @@
+import asyncio
 from typing import Optional
 
-from config import CRAWLER_ENGINE
+import httpx
+
+from async_runtime import run_sync
+from caching import get_crawl_cache
+from config import CRAWLER_ENGINE, CRAWLER_POOL_SIZE, USE_CRAWL_CACHE
 from exceptions import CrawlerParserError
+from http_client import get_client, get_async_client
+from loggings import logger
+from schemas import CachedPage, CrawledPage
+from tracing import Span, span
 from .firecrawl_parser import FirecrawlParser
 from .crawl4ai_parser import WebBrowserCrawlerParser
+from .base import BaseCrawlerParser
 
 
 class CrawlEngine:
@@ -12,9 +22,149 @@ class CrawlEngine:
     """
 
     @staticmethod
-    def perform(url: str) -> Optional[str]:
+    def _parser(url: str) -> BaseCrawlerParser:
         if CRAWLER_ENGINE == "local":
-            return WebBrowserCrawlerParser().parse(url)
+            return WebBrowserCrawlerParser()
         elif CRAWLER_ENGINE == "firecrawl":
-            return FirecrawlParser().parse(url)
+            return FirecrawlParser()
         raise CrawlerParserError(url, "Crawler engine not configured.")
+
+    @staticmethod
+    def _validators(page: CachedPage) -> dict[str, str]:
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    @staticmethod
+    def _revalidate(page: CachedPage) -> bool:
+        """
+        Ask the origin whether a stale page changed, using a conditional GET on the shared HTTP client.
+        :param page:
+        :return: True if the origin answered 304 Not Modified.
+        """
+        headers = CrawlEngine._validators(page)
+        if not headers:
+            return False
+        try:
+            with get_client().stream("GET", page.url, headers=headers, timeout=10) as response:
+                return response.status_code == 304
+        except httpx.HTTPError as e:
+            logger(f"Failed to revalidate {page.url}: {e}", "debug")
+            return False
+
+    @staticmethod
+    async def _arevalidate(page: CachedPage) -> bool:
+        headers = CrawlEngine._validators(page)
+        if not headers:
+            return False
+        try:
+            async with get_async_client().stream("GET", page.url, headers=headers, timeout=10) as response:
+                return response.status_code == 304
+        except httpx.HTTPError as e:
+            logger(f"Failed to revalidate {page.url}: {e}", "debug")
+            return False
+
+    @staticmethod
+    def _store(page: CrawledPage) -> None:
+        if page.content:
+            get_crawl_cache().put(page.url, page.content, page.etag, page.last_modified)
+
+    @staticmethod
+    def _served(current: Span, content: Optional[str], cache_hit: bool) -> Optional[str]:
+        current.set("cache_hit", cache_hit)
+        current.set("bytes", len(content.encode()) if content else 0)
+        return content
+
+    @staticmethod
+    def perform(url: str, parser: Optional[BaseCrawlerParser] = None) -> Optional[str]:
+        """
+        Get the Markdown content of the URL, served from the crawl cache when possible.
+        Stale pages are revalidated with their ETag/Last-Modified before being crawled again.
+        :param url:
+        :param parser: The crawler to use. Defaults to the one of CRAWLER_ENGINE.
+        :return: The content in Markdown format.
+        """
+        with span("crawl", url=url) as current:
+            return CrawlEngine._perform(url, parser or CrawlEngine._parser(url), current)
+
+    @staticmethod
+    def _perform(url: str, parser: BaseCrawlerParser, current: Span) -> Optional[str]:
+        if not USE_CRAWL_CACHE:
+            return CrawlEngine._served(current, parser.parse(url), False)
+
+        cache = get_crawl_cache()
+        cached = cache.get(url)
+        if cached is not None:
+            if cache.is_fresh(cached):
+                return CrawlEngine._served(current, cached.content, True)
+            if CrawlEngine._revalidate(cached):
+                cache.touch(url)
+                return CrawlEngine._served(current, cached.content, True)
+
+        page = parser.fetch(url)
+        CrawlEngine._store(page)
+        return CrawlEngine._served(current, page.content, False)
+
+    @staticmethod
+    async def aperform(url: str, parser: Optional[BaseCrawlerParser] = None) -> Optional[str]:
+        """
+        Asynchronously get the Markdown content of the URL, served from the crawl cache when possible.
+        :param url:
+        :param parser: The crawler to use. Defaults to the one of CRAWLER_ENGINE.
+        :return: The content in Markdown format.
+        """
+        with span("crawl", url=url) as current:
+            return await CrawlEngine._aperform(url, parser or CrawlEngine._parser(url), current)
+
+    @staticmethod
+    async def _aperform(url: str, parser: BaseCrawlerParser, current: Span) -> Optional[str]:
+        if not USE_CRAWL_CACHE:
+            return CrawlEngine._served(current, await parser.aparse(url), False)
+
+        cache = get_crawl_cache()
+        cached = await asyncio.to_thread(cache.get, url)
+        if cached is not None:
+            if cache.is_fresh(cached):
+                return CrawlEngine._served(current, cached.content, True)
+            if await CrawlEngine._arevalidate(cached):
+                await asyncio.to_thread(cache.touch, url)
+                return CrawlEngine._served(current, cached.content, True)
+
+        page = await parser.afetch(url)
+        await asyncio.to_thread(CrawlEngine._store, page)
+        return CrawlEngine._served(current, page.content, False)
+
+    @staticmethod
+    async def acrawl_many(urls: list[str], parser: Optional[BaseCrawlerParser] = None) -> list[Optional[str]]:
+        """
+        Crawl many URLs concurrently, at most CRAWLER_POOL_SIZE at a time.
+        :param urls:
+        :param parser: The crawler to use. Defaults to the one of CRAWLER_ENGINE.
+        :return: The content of each URL, in order. None for the URLs that failed.
+        """
+        semaphore = asyncio.Semaphore(CRAWLER_POOL_SIZE)
+
+        async def crawl(url: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await CrawlEngine.aperform(url, parser)
+                except CrawlerParserError:
+                    return None # logged when raised
+                except Exception as e:
+                    logger(f"Failed to crawl {url}: {e}", "warning")
+                    return None
+
+        return list(await asyncio.gather(*(crawl(url) for url in urls)))
+
+    @staticmethod
+    def crawl_many(urls: list[str], parser: Optional[BaseCrawlerParser] = None) -> list[Optional[str]]:
+        """
+        Crawl many URLs concurrently, filling the browser pool.
+        :param urls:
+        :param parser: The crawler to use. Defaults to the one of CRAWLER_ENGINE.
+        :return: The content of each URL, in order. None for the URLs that failed.
+        """
+        return run_sync(CrawlEngine.acrawl_many(urls, parser))
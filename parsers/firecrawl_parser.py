@@ -1,13 +1,12 @@
-from typing import Optional
-
 from firecrawl import FirecrawlApp
 
 from config import FIRECRAWL_API_KEY
 from exceptions import CrawlerParserError
-from .base import BaseParser
+from schemas import CrawledPage
+from .base import BaseCrawlerParser
 
 
-class FirecrawlParser(BaseParser):
+class FirecrawlParser(BaseCrawlerParser):
     BASE_URL = "https://api.firecrawl.dev"
 
     def __init__(self, **kwargs):
@@ -28,10 +27,11 @@ class FirecrawlParser(BaseParser):
             ]),
         }
 
-    def parse(self, url: str) -> Optional[str]:
+    def fetch(self, url: str) -> CrawledPage:
         """
-        Get the Markdown content of the URL.
+        Crawl the URL.
         Using Firecrawl API to fetch the content of the URL.
+        Firecrawl does not forward the HTTP validators, so the page is never revalidated.
         :param url:
         :return:
         """
@@ -50,7 +50,7 @@ class FirecrawlParser(BaseParser):
             content = result.get("markdown", '')
             if not content:
                 raise CrawlerParserError(url, "No content found in the response.")
-            return content
+            return CrawledPage(url=url, content=content)
         except Exception as e:
             raise CrawlerParserError(
                 url,
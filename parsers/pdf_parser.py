@@ -1,6 +1,7 @@
 import os
 from typing import Optional
 from exceptions import PDFParserError
+from tracing import span
 
 import pymupdf4llm
 import tempfile
@@ -22,17 +23,19 @@ class PDFParser(BaseParser):
         :param values:
         :return:
         """
-        try:
-            path = self._temporary_file(values)
-        except Exception:
-            raise PDFParserError("Failed to create temporary file for PDF parsing")
-        try:
-            content = pymupdf4llm.to_markdown(path)
-            return content
-        except Exception as e:
-            raise PDFParserError(f"Failed to convert PDF to text: {e}")
-        finally:
+        with span("pdf_parse", bytes_in=len(values)) as current:
             try:
-                os.remove(path)
-            except FileNotFoundError:
-                pass
+                path = self._temporary_file(values)
+            except Exception:
+                raise PDFParserError("Failed to create temporary file for PDF parsing")
+            try:
+                content = pymupdf4llm.to_markdown(path)
+                current.set("bytes_out", len(content.encode()))
+                return content
+            except Exception as e:
+                raise PDFParserError(f"Failed to convert PDF to text: {e}")
+            finally:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
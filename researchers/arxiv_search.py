@@ -1,14 +1,18 @@
+import asyncio
 from typing import Optional
 
+import httpx
 import requests
 from requests import RequestException
 
 from llm import get_reranker, get_summarization
 from exceptions import ArxivSearchError, ArxivDownloadError
+from http_client import get_async_client
 from llm.reranker import Reranker
 from llm.summarization import Summarization
 from loggings import logger
 from parsers import PDFParser
+from parsers.base import BaseParser
 from schemas import SearchResult
 from .base import BaseSearchService
 
@@ -16,10 +20,16 @@ import arxiv
 
 
 class ArxivSearch(BaseSearchService):
-    def __init__(self, reranker: Optional[Reranker] = None, summarization: Optional[Summarization] = None) -> None:
+    def __init__(
+        self,
+        reranker: Optional[Reranker] = None,
+        summarization: Optional[Summarization] = None,
+        pdf_parser: Optional[BaseParser] = None,
+    ) -> None:
         self._client = arxiv.Client()
         self._reranker = reranker or get_reranker()
         self._summarization = summarization or get_summarization()
+        self._pdf_parser = pdf_parser or PDFParser()
 
     @staticmethod
     def _download_pdf(pdf_url: Optional[str]) -> Optional[bytes]:
@@ -45,6 +55,52 @@ class ArxivSearch(BaseSearchService):
         except Exception as e:
             raise ArxivDownloadError(f"Failed to download paper: {e}")
 
+    @staticmethod
+    async def _adownload_pdf(pdf_url: Optional[str]) -> Optional[bytes]:
+        """
+        Asynchronously download the PDF of a paper from arXiv.
+        :param pdf_url:
+        :return:
+        """
+        if not pdf_url:
+            raise ValueError("PDF URL is empty.")
+        if not pdf_url.startswith("http"):
+            raise ValueError("Invalid PDF URL.")
+        try:
+            headers = {
+                "Accept": "application/pdf",
+            }
+            response = await get_async_client().get(pdf_url, headers=headers)
+            if not response.is_success:
+                raise ArxivDownloadError(f"Failed to download paper: {response.status_code}")
+            return response.content
+        except ArxivDownloadError:
+            raise
+        except httpx.HTTPError as e:
+            raise ArxivDownloadError(f"HTTPError Failed to download paper: {e}")
+        except Exception as e:
+            raise ArxivDownloadError(f"Failed to download paper: {e}")
+
+    def _fetch_results(self, query: str, limit: int) -> list[SearchResult]:
+        """
+        Query the arXiv API for the papers matching the query.
+        :param query:
+        :param limit:
+        :return:
+        """
+        search = arxiv.Search(
+            query=query,
+            max_results=limit,
+            sort_by=arxiv.SortCriterion.Relevance,
+        )
+        return [
+            SearchResult(
+                title=result.title,
+                description=result.summary,
+                link=result.pdf_url,
+            ) for result in self._client.results(search)
+        ]
+
     def search(self, query: str, limit: int = 3, parser: bool = True) -> str:
         """
         Search for papers on arXiv based on a query.
@@ -58,23 +114,9 @@ class ArxivSearch(BaseSearchService):
         """
         try:
             # Search for papers
-            search = arxiv.Search(
-                query=query,
-                max_results=limit,
-                sort_by=arxiv.SortCriterion.Relevance,
-            )
-
-            # Get the results
-            results = [
-                SearchResult(
-                    title=result.title,
-                    description=result.summary,
-                    link=result.pdf_url,
-                ) for result in self._client.results(search)
-            ]
+            results = self._fetch_results(query, limit)
 
             if parser:
-                pdf_parser = PDFParser()
                 for result in results:
                     try:
                         pdf_content = self._download_pdf(result.link)
@@ -83,7 +125,7 @@ class ArxivSearch(BaseSearchService):
                         if pdf_content:
                             result.content = self._summarization.summarize(
                                 query,
-                                pdf_parser.parse(values=pdf_content)
+                                self._pdf_parser.parse(pdf_content)
                             )
                     except ValueError as e:
                         logger(
@@ -111,3 +153,65 @@ class ArxivSearch(BaseSearchService):
             return self._summarization.summarize(query, formatted_results)
         except Exception as e:
             raise ArxivSearchError(f"Failed to fetch papers from arXiv: {e}")
+
+    async def _aparse_result(self, query: str, result: SearchResult) -> None:
+        """
+        Download, parse and summarize the PDF of a single paper into `result.content`.
+        :param query:
+        :param result:
+        :return:
+        """
+        try:
+            pdf_content = await self._adownload_pdf(result.link)
+            if not pdf_content:
+                raise ArxivDownloadError("PDF content is empty.")
+            result.content = await self._summarization.asummarize(
+                query,
+                await self._pdf_parser.aparse(pdf_content)
+            )
+        except ValueError as e:
+            logger(
+                f"Failed to parse the content from {result.link}: {e}"
+            )
+        except ArxivDownloadError:
+            logger(
+                f"Failed to download the content from {result.link}",
+                "error"
+            )
+
+    async def asearch(self, query: str, limit: int = 3, parser: bool = True) -> str:
+        """
+        Asynchronously search for papers on arXiv based on a query.
+        The PDFs are downloaded, parsed and summarized concurrently.
+        :param parser:
+        :param query: str
+            The search query.
+        :param limit: int
+            The maximum number of results to return.
+        :return:
+            str: The titles and summaries of the papers found.
+        """
+        try:
+            results = await asyncio.to_thread(self._fetch_results, query, limit)
+
+            if parser:
+                await asyncio.gather(
+                    *(self._aparse_result(query, result) for result in results)
+                )
+
+            reranked_results = await self._reranker.arerank(
+                query, [
+                    f"**{result.title}**\n\n{result.description + result.content}"
+                    for result in results
+                ]
+            )
+
+            formatted_results = "\n".join(
+                [
+                    result.document
+                    for result in reranked_results
+                ]
+            )
+            return await self._summarization.asummarize(query, formatted_results)
+        except Exception as e:
+            raise ArxivSearchError(f"Failed to fetch papers from arXiv: {e}")
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional
 
@@ -7,6 +8,12 @@ class BaseSearchService(ABC):
     def search(self, query: str, limit: int = 5) -> list:
         raise NotImplementedError("Subclasses should implement this method.")
 
+    async def asearch(self, query: str, limit: int = 5) -> list:
+        """
+        Asynchronously search. Runs `search` in a worker thread unless overridden.
+        """
+        return await asyncio.to_thread(self.search, query, limit)
+
     def query(self, query: str, limit: int = 5) -> list:
         raise NotImplementedError("Subclasses should implement this method.")
 
@@ -0,0 +1,256 @@
+import os
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+from uuid import uuid4
+
+import numpy as np
+from langchain_text_splitters import TextSplitter
+
+from async_runtime import ContextThreadPoolExecutor
+from config import INGEST_BATCH_SIZE, INGEST_QUEUE_SIZE, QDRANT_UPLOAD_BATCH_SIZE, QDRANT_UPLOAD_PARALLEL
+from databases import Qdrant
+from exceptions import PDFParserError
+from llm.embeddings import Embeddings
+from loggings import logger
+from parsers.base import BaseParser
+from parsers.pdf_parser import PDFParser
+from schemas import IngestDocument, IngestReport, MetadataSchema
+from tracing import span
+
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown", ".rst"}
+
+_DONE = object()
+
+
+def load_documents(paths: Iterable[str], pdf_parser: Optional[BaseParser] = None) -> Iterator[IngestDocument]:
+    """
+    Read the documents of files and directories, walking directories recursively.
+    PDFs are converted to Markdown and text files (TEXT_EXTENSIONS) are read as UTF-8; other files are skipped.
+    The absolute path is the document ID, so a file can be deleted with `delete_by_document_id` before reloading it.
+    :param paths:
+    :param pdf_parser: Defaults to PDFParser.
+    :return:
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, filenames in os.walk(path):
+                yield from load_documents(
+                    (os.path.join(root, filename) for filename in sorted(filenames)),
+                    pdf_parser,
+                )
+            continue
+
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            if extension == ".pdf":
+                pdf_parser = pdf_parser or PDFParser()
+                with open(path, "rb") as f:
+                    text = pdf_parser.parse(f.read())
+            elif extension in TEXT_EXTENSIONS:
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+            else:
+                logger(f"Skipping unsupported file: {path}", "debug")
+                continue
+        except (OSError, UnicodeDecodeError, PDFParserError) as e:
+            logger(f"Failed to read {path}: {e}", "warning")
+            continue
+        if text and text.strip():
+            yield IngestDocument(text=text, document_id=os.path.abspath(path))
+
+
+class _Batch:
+    """
+    Chunks that travel through the pipeline together.
+    """
+
+    def __init__(self):
+        self.metadata: list[MetadataSchema] = []
+        self.vectors: Optional[np.ndarray] = None
+
+    @property
+    def texts(self) -> list[str]:
+        return [m.text for m in self.metadata]
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+
+class IngestPipeline:
+    """
+    Streaming bulk ingestion into a namespace of the vector store.
+    Splitting, embedding and uploading run as overlapped stages in their own threads, connected by
+    bounded queues: when embedding or uploading falls behind, the splitter blocks instead of
+    buffering the whole corpus. A batch that fails to embed or upload is logged and counted, and
+    ingestion goes on with the next one.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        splitter: TextSplitter,
+        embeddings: Embeddings,
+        vectorstore: Qdrant,
+        batch_size: int = INGEST_BATCH_SIZE,
+        queue_size: int = INGEST_QUEUE_SIZE,
+        upload_batch_size: int = QDRANT_UPLOAD_BATCH_SIZE,
+        upload_parallel: int = QDRANT_UPLOAD_PARALLEL,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0.")
+        if queue_size <= 0:
+            raise ValueError("queue_size must be greater than 0.")
+        self._namespace = namespace
+        self._splitter = splitter
+        self._embeddings = embeddings
+        self._vectorstore = vectorstore
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._upload_batch_size = upload_batch_size
+        self._upload_parallel = upload_parallel
+
+    @staticmethod
+    def _put(outbox: queue.Queue, item, stop: threading.Event) -> bool:
+        """
+        Block until the next stage has room for the item.
+        :return: False when the pipeline was stopped meanwhile.
+        """
+        while not stop.is_set():
+            try:
+                outbox.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _get(inbox: queue.Queue, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                return inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _split(
+        self,
+        documents: Iterable[str | IngestDocument],
+        outbox: queue.Queue,
+        stop: threading.Event,
+        report: IngestReport,
+    ) -> None:
+        busy = 0.0
+        batch = _Batch()
+        try:
+            for document in documents:
+                started = time.perf_counter()
+                if isinstance(document, str):
+                    document = IngestDocument(text=document)
+                document_id = document.document_id or str(uuid4())
+                report.documents += 1
+                for text in self._splitter.split_text(document.text):
+                    batch.metadata.append(
+                        MetadataSchema(text=text, document_id=document_id, namespace=self._namespace)
+                    )
+                    if len(batch) == self._batch_size:
+                        busy += time.perf_counter() - started
+                        if not self._put(outbox, batch, stop):
+                            return
+                        batch = _Batch()
+                        started = time.perf_counter()
+                busy += time.perf_counter() - started
+            if len(batch) > 0:
+                self._put(outbox, batch, stop)
+        finally:
+            report.stage_seconds["split"] = busy
+            self._put(outbox, _DONE, stop)
+
+    def _stage(
+        self,
+        name: str,
+        work: Callable[[_Batch], None],
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        stop: threading.Event,
+        report: IngestReport,
+        lock: threading.Lock,
+    ) -> None:
+        """
+        Apply `work` to every batch of the inbox and hand it to the outbox.
+        """
+        busy = 0.0
+        try:
+            while (batch := self._get(inbox, stop)) is not _DONE:
+                started = time.perf_counter()
+                try:
+                    work(batch)
+                except Exception as e:
+                    logger(f"Failed to {name} a batch of {len(batch)} chunks: {e}", "warning")
+                    with lock:
+                        report.failed_chunks += len(batch)
+                    continue
+                finally:
+                    busy += time.perf_counter() - started
+                if outbox is not None:
+                    if not self._put(outbox, batch, stop):
+                        return
+                else:
+                    with lock:
+                        report.chunks += len(batch)
+        finally:
+            report.stage_seconds[name] = busy
+            if outbox is not None:
+                self._put(outbox, _DONE, stop)
+
+    def _embed(self, batch: _Batch) -> None:
+        batch.vectors = self._embeddings.embed_array(batch.texts)
+
+    def _upload(self, batch: _Batch) -> None:
+        with span("qdrant.upload", points=len(batch)):
+            self._vectorstore.upload(
+                batch.vectors,
+                batch.metadata,
+                batch_size=self._upload_batch_size,
+                parallel=self._upload_parallel,
+            )
+
+    def run(self, documents: Iterable[str | IngestDocument]) -> IngestReport:
+        """
+        Split, embed and upload every document.
+        :param documents: Texts or IngestDocuments, consumed lazily.
+        :return: The counts, wall time and throughput of the ingestion.
+        """
+        report = IngestReport()
+        lock = threading.Lock()
+        stop = threading.Event()
+        to_embed: queue.Queue = queue.Queue(maxsize=self._queue_size)
+        to_upload: queue.Queue = queue.Queue(maxsize=self._queue_size)
+
+        started = time.perf_counter()
+        with span("ingest", namespace=self._namespace) as current:
+            with ContextThreadPoolExecutor(max_workers=3, thread_name_prefix="ingest") as executor:
+                stages = [
+                    executor.submit(self._split, documents, to_embed, stop, report),
+                    executor.submit(self._stage, "embed", self._embed, to_embed, to_upload, stop, report, lock),
+                    executor.submit(self._stage, "upload", self._upload, to_upload, None, stop, report, lock),
+                ]
+                try:
+                    for stage in stages:
+                        stage.result()
+                except BaseException:
+                    stop.set()  # unblock the other stages
+                    raise
+            report.seconds = time.perf_counter() - started
+            current.set("documents", report.documents)
+            current.set("chunks", report.chunks)
+            current.set("failed_chunks", report.failed_chunks)
+
+        logger(
+            f"Ingested {report.chunks} chunks from {report.documents} documents into '{self._namespace}' "
+            f"in {report.seconds:.1f}s ({report.chunks_per_second:.1f} chunks/s), "
+            f"{report.failed_chunks} chunks failed",
+            "info",
+        )
+        return report
@@ -1,9 +1,11 @@
+import asyncio
 from typing import Optional
 
 import googlesearch
 from serpapi import GoogleSearch as SerpapiGoogleSearch
 
 from parsers import CrawlEngine
+from parsers.base import BaseCrawlerParser
 from .brave_search import BraveSearch
 from .tavily_search import TavilySearch
 
@@ -14,7 +16,6 @@ from config import (
 )
 from exceptions import (
     SearchEngineError,
-    CrawlerParserError,
     SummarizationError, BraveSearchError
 )
 from llm import get_reranker, get_summarization
@@ -26,9 +27,15 @@ from .base import BaseSearchService
 
 
 class SearchEngine(BaseSearchService):
-    def __init__(self, reranker: Optional[Reranker] = None, summarization: Optional[Summarization] = None) -> None:
+    def __init__(
+        self,
+        reranker: Optional[Reranker] = None,
+        summarization: Optional[Summarization] = None,
+        parser: Optional[BaseCrawlerParser] = None,
+    ) -> None:
         self._reranker = reranker or get_reranker()
         self._summarization = summarization or get_summarization()
+        self._parser = parser
 
     @staticmethod
     def _perform(query: str, limit: int = 10) -> Optional[list[SearchResult]]:
@@ -133,18 +140,20 @@ class SearchEngine(BaseSearchService):
                 ]
 
             if parser:
-                for result in results:
+                # Crawl every result at once; failed URLs come back as None
+                pages = CrawlEngine.crawl_many([result.link for result in results], self._parser)
+                for result, contents in zip(results, pages):
+                    if contents is None:
+                        logger(
+                            f"Failed to parse the content from {result.link}"
+                        )
+                        continue
                     try:
-                        contents = CrawlEngine.perform(result.link)
                         summarized = self._summarization.summarize(
                             query,
                             contents
                         )
                         chunks.append(summarized)
-                    except CrawlerParserError as e:
-                        logger(
-                            f"Failed to parse the content from {e.url}"
-                        )
                     except SummarizationError as e:
                         logger(
                             f"Failed to summarize the content from {e.message}"
@@ -169,3 +178,73 @@ class SearchEngine(BaseSearchService):
             raise SearchEngineError(f"Failed to fetch documents from Brave: {e.message}")
         except Exception as e:
             raise SearchEngineError(f"An unexpected error occurred: {str(e)}")
+
+    async def _asummarize_page(self, query: str, result: SearchResult, contents: Optional[str]) -> Optional[str]:
+        """
+        Summarize the crawled content of a single search result.
+        :param query:
+        :param result:
+        :param contents: The crawled content, or None if the crawl failed.
+        :return: The summarized content, or None if the result could not be parsed.
+        """
+        if contents is None:
+            logger(
+                f"Failed to parse the content from {result.link}"
+            )
+            return None
+        try:
+            return await self._summarization.asummarize(
+                query,
+                contents
+            )
+        except SummarizationError as e:
+            logger(
+                f"Failed to summarize the content from {e.message}"
+            )
+        except Exception as e:
+            logger(
+                f"Failed to parse the content from {e}"
+            )
+        return None
+
+    async def asearch(self, query: str, limit: int = 10, parser: bool = True) -> str:
+        """
+        Asynchronously search for the most relevant documents based on the query using researchers.
+        The results are crawled and summarized concurrently, crawling at most CRAWLER_POOL_SIZE at a time.
+        :param parser: Whether to parse the results or not. Get Content from the URL return markdown.
+        :param query: The query string to search for.
+        :param limit: The maximum number of results to return.
+        :return:
+            str: The titles and snippets of the documents found.
+        """
+        try:
+            results = await asyncio.to_thread(self._perform, query, limit)
+
+            if not results:
+                raise SearchEngineError("Google Search Engine returned no results.")
+
+            chunks: list[str] = []
+
+            if parser:
+                # Crawl every result at once, at most CRAWLER_POOL_SIZE at a time; failed URLs come back as None
+                pages = await CrawlEngine.acrawl_many([result.link for result in results], self._parser)
+                parsed = await asyncio.gather(
+                    *(self._asummarize_page(query, result, contents) for result, contents in zip(results, pages))
+                )
+                chunks = [chunk for chunk in parsed if chunk is not None]
+
+            reranked_results = await self._reranker.arerank(query, chunks)
+
+            formatted_results = "\n".join(
+                [
+                    result.document
+                    for result in reranked_results
+                ]
+            )
+            return await self._summarization.asummarize(query, formatted_results)
+        except SearchEngineError as e:
+            raise SearchEngineError(f"Failed to fetch documents from Google: {e.message}")
+        except BraveSearchError as e:
+            raise SearchEngineError(f"Failed to fetch documents from Brave: {e.message}")
+        except Exception as e:
+            raise SearchEngineError(f"An unexpected error occurred: {str(e)}")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterable, Optional
 from uuid import uuid4
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -7,8 +7,9 @@ from databases import Qdrant
 from llm import get_embeddings, get_reranker
 from llm.embeddings import Embeddings
 from llm.reranker import Reranker
-from schemas import MetadataSchema, UpsertSchema, SearchResultSchema
+from schemas import MetadataSchema, UpsertSchema, SearchResultSchema, IngestDocument, IngestReport
 from .base import BaseSearchService
+from .ingest import IngestPipeline
 from exceptions import SemanticSearchError, SemanticUpsertError, InvalidRerankValue, RerankError
 
 
@@ -104,6 +105,39 @@ class SemanticSearch(BaseSearchService):
                 f"Failed to upsert document into vector database: {e}"
             )
 
+    def ingest(
+        self,
+        documents: Iterable[str | IngestDocument],
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ) -> IngestReport:
+        """
+        Bulk load documents into the namespace, streaming them through split, embed and upload stages.
+        Use `load_documents` to read them from files.
+        :param documents: Texts or IngestDocuments, consumed lazily.
+        :param batch_size: Chunks per embed/upload batch. Defaults to INGEST_BATCH_SIZE.
+        :param queue_size: Batches buffered between stages. Defaults to INGEST_QUEUE_SIZE.
+        :return: The counts, wall time and throughput of the ingestion.
+        """
+        options = {
+            key: value
+            for key, value in {"batch_size": batch_size, "queue_size": queue_size}.items()
+            if value is not None
+        }
+        pipeline = IngestPipeline(
+            self._namespace,
+            self._splitter,
+            self._embedding,
+            self._vectorstore,
+            **options,
+        )
+        try:
+            return pipeline.run(documents)
+        except Exception as e:
+            raise SemanticUpsertError(
+                f"Failed to ingest documents into vector database: {e}"
+            )
+
     def query(self, query: str, limit: int = 10) -> list["SearchResultSchema"]:
         """
         Query the vector database for the most relevant documents.
@@ -113,7 +147,7 @@ class SemanticSearch(BaseSearchService):
         """
         try:
             vectors = self._embedding.embed([query])
-            results = self._vectorstore.query(vectors[0], limit=limit)
+            results = self._vectorstore.query(vectors[0], limit=limit, text=query)
             return [
                 SearchResultSchema(
                     score=result.score,
@@ -128,7 +162,7 @@ class SemanticSearch(BaseSearchService):
 
     def delete_by_document_id(self, document_id: str) -> None:
         """
-        Delete a document from the vector database by document ID.
+        Delete a document from the namespace by document ID.
         :param document_id: The document ID to delete.
         :return: None
         """
@@ -6,7 +6,8 @@ from .generative_schema import (
 )
 from .vectordb_schema import (
     UpsertSchema, MetadataSchema,
-    QueryResultSchema, SearchResultSchema
+    QueryResultSchema, SearchResultSchema,
+    IngestDocument, IngestReport,
 )
 from .conversations_schema import Message
 from .reranker_schema import RerankRequest, RerankResponse, RerankedDocument
@@ -19,9 +20,18 @@ from .tools_schema import (
     SearchGoogleEngineSchema,
     SearchDeepResearcherSchema,
 )
-from .summarize_schema import SummarizeRequest, SummarizeResponse
+from .summarize_schema import (
+    SummarizeRequest,
+    SummarizeResponse,
+    SummarizeBatchRequest,
+    SummarizeBatchResponse,
+)
 from .search_engine_schema import (
     BraveSearchResult,
     TavilySearchResult,
     SearchResult
-)
\ No newline at end of file
+)
+from .crawler_schema import CrawledPage, CachedPage
+from .cache_schema import CacheStats
+from .deepsearch_schema import DeepSearchEvent
+from .tracing_schema import SpanRecord, StageSummary, TraceSummary, TraceRecord
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+
+
+class CacheStats(BaseModel):
+    memory_hits: int = Field(
+        default=0,
+        description="Lookups answered by the in-memory tier.",
+    )
+    disk_hits: int = Field(
+        default=0,
+        description="Lookups answered by the on-disk tier.",
+    )
+    misses: int = Field(
+        default=0,
+        description="Lookups that had to be computed.",
+    )
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
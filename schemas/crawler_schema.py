@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class CrawledPage(BaseModel):
+    url: str
+    content: str = ""
+    etag: Optional[str] = Field(
+        default=None,
+        description="ETag response header, used to revalidate the cached page.",
+    )
+    last_modified: Optional[str] = Field(
+        default=None,
+        description="Last-Modified response header, used to revalidate the cached page.",
+    )
+
+
+class CachedPage(BaseModel):
+    url: str
+    content: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
@@ -0,0 +1,30 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DeepSearchEvent(BaseModel):
+    type: Literal["sub_queries", "source_finished", "depth_completed", "token", "done", "error"] = Field(
+        ...,
+        description="Kind of progress event emitted while the deep search runs.",
+    )
+    depth: int = Field(
+        default=0,
+        description="Depth of the search when the event was emitted.",
+    )
+    content: str = Field(
+        default="",
+        description="Report token, final report, source query or error message, depending on the type.",
+    )
+    sub_queries: list[str] = Field(
+        default_factory=list,
+        description="Sub-queries generated, for sub_queries events.",
+    )
+    source: Optional[str] = Field(
+        default=None,
+        description="Search source that finished, for source_finished events.",
+    )
+    success: bool = Field(
+        default=True,
+        description="Whether the source returned results, for source_finished events.",
+    )
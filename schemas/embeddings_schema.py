@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, ConfigDict
 
 
 class EmbeddingsRequest(BaseModel):
@@ -6,4 +7,7 @@ class EmbeddingsRequest(BaseModel):
 
 
 class EmbeddingsResponse(BaseModel):
-    embeddings: list[list[float]] = []
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # A float32 array of shape (len(texts), dim) when the server answered in the binary format
+    embeddings: list[list[float]] | np.ndarray = []
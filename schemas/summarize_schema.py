@@ -17,3 +17,21 @@ class SummarizeRequest(BaseModel):
         ...,
         description="Document to summarize.",
     )
+
+
+class SummarizeBatchRequest(BaseModel):
+    query: str = Field(
+        ...,
+        description="Query to summarize documents."
+    )
+    documents: list[str] = Field(
+        ...,
+        description="Documents to summarize, each one separately.",
+    )
+
+
+class SummarizeBatchResponse(BaseModel):
+    summaries: list[str] = Field(
+        ...,
+        description="Summary of each document, in order."
+    )
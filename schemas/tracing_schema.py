@@ -0,0 +1,58 @@
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SpanRecord(BaseModel):
+    name: str = Field(
+        ...,
+        description="Stage the span measures, e.g. `crawl` or `source.arxiv`.",
+    )
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time_ns: int = Field(
+        ...,
+        description="Wall-clock start, in nanoseconds since the epoch.",
+    )
+    end_time_ns: Optional[int] = None
+    duration_ms: float = 0.0
+    attributes: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Bytes, token counts, cache hits and other measurements of the stage.",
+    )
+    status: Literal["ok", "error"] = "ok"
+    error: Optional[str] = None
+
+
+class StageSummary(BaseModel):
+    name: str
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    totals: dict[str, float] = Field(
+        default_factory=dict,
+        description="Sum of every numeric attribute of the stage's spans.",
+    )
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class TraceSummary(BaseModel):
+    trace_id: str
+    name: str
+    duration_ms: float
+    stages: list[StageSummary] = Field(
+        default_factory=list,
+        description="Per-stage aggregates, slowest total first.",
+    )
+
+
+class TraceRecord(BaseModel):
+    trace_id: str
+    name: str
+    spans: list[SpanRecord]
+    summary: TraceSummary
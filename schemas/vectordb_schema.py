@@ -1,8 +1,16 @@
+from typing import Optional
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
 
+def new_point_id() -> int:
+    """
+    Random unsigned 64-bit point ID.
+    """
+    return (uuid4().int >> 64) & ((1 << 64) - 1)
+
+
 class MetadataSchema(BaseModel):
     text: str = Field(
         ...,
@@ -23,7 +31,7 @@ class MetadataSchema(BaseModel):
 
 class UpsertSchema(BaseModel):
     id: int = Field(
-        default_factory=lambda: (uuid4().int >> 64) & ((1 << 64) - 1),
+        default_factory=new_point_id,
         title="ID",
         description="The ID of the vector. It must be unique.",
     )
@@ -52,3 +60,43 @@ class QueryResultSchema(BaseModel):
 class SearchResultSchema(BaseModel):
     score: float
     text: str
+
+
+class IngestDocument(BaseModel):
+    text: str = Field(
+        ...,
+        title="Text",
+        description="The content of the document.",
+    )
+    document_id: Optional[str] = Field(
+        default=None,
+        title="Document ID",
+        description="The ID of the document. Generated when not set.",
+    )
+
+
+class IngestReport(BaseModel):
+    documents: int = Field(
+        default=0,
+        description="Documents split into chunks.",
+    )
+    chunks: int = Field(
+        default=0,
+        description="Chunks embedded and upserted.",
+    )
+    failed_chunks: int = Field(
+        default=0,
+        description="Chunks dropped because their batch failed to embed or upsert.",
+    )
+    seconds: float = Field(
+        default=0.0,
+        description="Wall time of the ingestion.",
+    )
+    stage_seconds: dict[str, float] = Field(
+        default_factory=dict,
+        description="Busy time of each pipeline stage (split, embed, upsert). The busiest one is the bottleneck.",
+    )
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
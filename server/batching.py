@@ -0,0 +1,150 @@
+import asyncio
+from typing import Callable, Generic, Optional, TypeVar
+
+from loggings import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Pending(Generic[T, R]):
+    def __init__(self, item: T):
+        self.item = item
+        self.future: "asyncio.Future[R]" = asyncio.get_running_loop().create_future()
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects concurrent calls to one model into batches.
+    Requests wait at most `max_wait` seconds for companions, up to `max_size` units
+    (texts, pairs or documents, as measured by `weight`). Each batch runs as a single
+    `handler` call in a worker thread, one batch at a time, so the model is never
+    shared between threads. If a batch fails, its items are retried one by one so a
+    bad request does not fail the others.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[list[T]], list[R]],
+        max_size: int,
+        max_wait: float,
+        weight: Callable[[T], int] = lambda _: 1,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0.")
+        if max_wait < 0:
+            raise ValueError("max_wait must be greater than or equal to 0.")
+        self._name = name
+        self._handler = handler
+        self._max_size = max_size
+        self._max_wait = max_wait
+        self._weight = weight
+        self._queue: Optional["asyncio.Queue[_Pending[T, R]]"] = None
+        self._carry: Optional[_Pending[T, R]] = None
+        self._inflight: list[_Pending[T, R]] = []
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start the batching worker on the running event loop.
+        :return:
+        """
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name=f"{self._name}-batcher")
+
+    async def stop(self) -> None:
+        """
+        Stop the worker and fail the requests still waiting.
+        :return:
+        """
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        pending = self._inflight + ([self._carry] if self._carry is not None else [])
+        self._inflight, self._carry = [], None
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for p in pending:
+            if not p.future.done():
+                p.future.set_exception(RuntimeError(f"{self._name} batcher stopped."))
+
+    async def submit(self, item: T) -> R:
+        """
+        Queue an item and wait for its result.
+        :param item:
+        :return: The result of the item.
+        """
+        if self._worker is None:
+            raise RuntimeError(f"{self._name} batcher is not running.")
+        pending: _Pending[T, R] = _Pending(item)
+        await self._queue.put(pending)
+        return await pending.future
+
+    async def _next(self) -> _Pending[T, R]:
+        if self._carry is not None:
+            pending, self._carry = self._carry, None
+            return pending
+        return await self._queue.get()
+
+    async def _collect(self) -> list[_Pending[T, R]]:
+        """
+        Wait for a first item, then gather companions until the batch is full or `max_wait` elapses.
+        """
+        loop = asyncio.get_running_loop()
+        first = await self._next()
+        batch, size = [first], self._weight(first.item)
+        self._inflight = batch  # failed by stop() if the worker is cancelled mid-collection
+        deadline = loop.time() + self._max_wait
+
+        while size < self._max_size:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    pending = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    pending = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            weight = self._weight(pending.item)
+            if size + weight > self._max_size:
+                self._carry = pending  # opens the next batch
+                break
+            batch.append(pending)
+            size += weight
+
+        return [p for p in batch if not p.future.cancelled()]
+
+    async def _execute(self, batch: list[_Pending[T, R]]) -> None:
+        try:
+            results = await asyncio.to_thread(self._handler, [p.item for p in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0].future.done():
+                    batch[0].future.set_exception(e)
+                return
+            logger(f"{self._name} batch of {len(batch)} failed, retrying one by one: {e}", "warning")
+            for p in batch:
+                await self._execute([p])
+            return
+
+        for p, result in zip(batch, results):
+            if not p.future.done():
+                p.future.set_result(result)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            logger(f"Running {self._name} batch of {len(batch)} requests.", "debug")
+            await self._execute(batch)
+            self._inflight = []
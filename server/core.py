@@ -1,13 +1,21 @@
 import asyncio
 from typing import Optional, Literal
 
+import numpy as np
 import torch
 from transformers import (
     AutoModel, AutoModelForSequenceClassification,
     AutoTokenizer, AutoModelForSeq2SeqLM
 )
 
-from .env import RERANKER_MODEL, EMBEDDING_MODEL, SUMMARIZATION_MODEL
+from .env import (
+    RERANKER_MODEL, EMBEDDING_MODEL, SUMMARIZATION_MODEL,
+    EMBEDDING_BATCH_SIZE, SUMMARIZATION_GENERATE_BATCH_SIZE,
+    SUMMARIZATION_NUM_BEAMS, SUMMARIZATION_MAX_LENGTH, SUMMARIZATION_MIN_LENGTH,
+    MICRO_BATCH_MAX_WAIT_MS, EMBEDDINGS_MICRO_BATCH_SIZE,
+    RERANK_MICRO_BATCH_SIZE, SUMMARIZATION_MICRO_BATCH_SIZE,
+)
+from .batching import MicroBatcher
 from loggings import logger
 
 
@@ -44,15 +52,44 @@ class Embeddings:
         ).to(device)
         self._tokenizer = AutoTokenizer.from_pretrained(self._model_name)
 
-    def embed(self, texts: list[str]) -> list[list[float]]:
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed the texts in batches of at most EMBEDDING_BATCH_SIZE.
+        Texts are sorted by length first, so each batch is padded only to its longest
+        text instead of the longest text of the request.
+        :return: A contiguous float32 array of shape (len(texts), dim), in input order.
+        """
         if not texts or not all(isinstance(t, str) and t.strip() for t in texts):
             raise ValueError("Input texts must be a non-empty list of non-empty strings.")
 
         logger(f"Generating embeddings for {len(texts)} texts.", "info")
-        return [
-            self._model.encode(text, task="text-matching", max_length=2048)
-            for text in texts
-        ]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+        embeddings: Optional[np.ndarray] = None
+        for start in range(0, len(order), EMBEDDING_BATCH_SIZE):
+            bucket = order[start:start + EMBEDDING_BATCH_SIZE]
+            with torch.inference_mode():
+                vectors = self._model.encode(
+                    [texts[i] for i in bucket],
+                    task="text-matching",
+                    max_length=2048,
+                    batch_size=len(bucket),
+                    convert_to_numpy=True,
+                )
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[-1]), dtype=np.float32)
+            embeddings[bucket] = vectors
+
+        return embeddings
+
+    def embed_many(self, batches: list[list[str]]) -> list[np.ndarray]:
+        """
+        Embed the texts of many requests in one call.
+        :return: The embeddings of each request, in order.
+        """
+        offsets = np.cumsum([len(texts) for texts in batches])[:-1]
+        embeddings = self.embed([text for texts in batches for text in texts])
+        return np.split(embeddings, offsets)
 
 
 class Reranker:
@@ -69,28 +106,43 @@ class Reranker:
         ).to(device)
 
     def rerank(self, query: str, documents: list[str]) -> tuple[list[str], list[float]]:
-        if not query or not isinstance(query, str) or not query.strip():
-            raise ValueError("Query must be a non-empty string.")
-        if not documents:
-            logger("Received empty documents list for reranking.", "warning")
-            return [], []
+        return self.rerank_many([(query, documents)])[0]
+
+    def rerank_many(self, requests: list[tuple[str, list[str]]]) -> list[tuple[list[str], list[float]]]:
+        """
+        Rerank the documents of many requests, scoring every (query, document) pair in one call.
+        :return: The reranked documents and scores of each request, in order.
+        """
+        sentence_pairs: list[list[str]] = []
+        for query, documents in requests:
+            if not query or not isinstance(query, str) or not query.strip():
+                raise ValueError("Query must be a non-empty string.")
+            if not documents:
+                logger("Received empty documents list for reranking.", "warning")
+                continue
 
-        if len(documents) < 2:
-            logger("No documents provided for reranking.", "warning")
-            return [], []
+            if len(documents) < 2:
+                logger("No documents provided for reranking.", "warning")
+                continue
 
-        logger(f"Reranking {len(documents)} documents for query: {query}", "info")
+            logger(f"Reranking {len(documents)} documents for query: {query}", "info")
+            sentence_pairs.extend([query, doc] for doc in documents)
 
-        sentence_pairs = [[query, doc] for doc in documents]
-        scores: list[float] = self._model.compute_score(sentence_pairs, max_length=1024)
+        scores: list[float] = self._model.compute_score(sentence_pairs, max_length=1024) if sentence_pairs else []
 
-        if len(documents) == 1:
-            return [documents[0]], [scores[0]]
+        results: list[tuple[list[str], list[float]]] = []
+        offset = 0
+        for query, documents in requests:
+            if len(documents) < 2:
+                results.append(([], []))
+                continue
 
-        reranked = sorted(zip(documents, scores), key=lambda x: x[1], reverse=True)
-        reranked_documents, rerank_scores = zip(*reranked)
+            reranked = sorted(zip(documents, scores[offset:offset + len(documents)]), key=lambda x: x[1], reverse=True)
+            offset += len(documents)
+            reranked_documents, rerank_scores = zip(*reranked)
+            results.append((list(reranked_documents), list(rerank_scores)))
 
-        return list(reranked_documents), list(rerank_scores)
+        return results
 
 
 class Summarization:
@@ -100,7 +152,12 @@ class Summarization:
         self._model = AutoModelForSeq2SeqLM.from_pretrained(self._model_name).to(device)
         self._tokenizer = AutoTokenizer.from_pretrained(self._model_name)
 
-    def summarize(self, query: str, text: str) -> str:
+    def _windows(self, query: str, text: str) -> list[list[int]]:
+        """
+        Tokenize the query and text into overlapping windows of the model's input size.
+        Windows are left unpadded; each generate() batch is padded to its longest window.
+        :return: The input ids of each window.
+        """
         if not text or not isinstance(text, str) or not text.strip():
             raise ValueError("Input text must be a non-empty string.")
         if not query or not isinstance(query, str) or not query.strip():
@@ -117,29 +174,54 @@ class Summarization:
             stride=stride,
             truncation=True,
             return_overflowing_tokens=True,
-            padding="max_length",
-            return_tensors="pt"
         )
+        return tokenized["input_ids"]
 
-        input_ids_chunks = tokenized["input_ids"]
-        attention_mask_chunks = tokenized["attention_mask"]
-
-        summary_text = ""
-
-        for i in range(len(input_ids_chunks)):
-            logger(f"Summarizing chunk {i + 1}/{len(input_ids_chunks)}", "info")
-
+    def _generate(self, windows: list[list[int]]) -> list[str]:
+        padded = self._tokenizer.pad({"input_ids": windows}, padding="longest", return_tensors="pt")
+        with torch.inference_mode():
             summary_ids = self._model.generate(
-                input_ids=input_ids_chunks[i].unsqueeze(0).to(self._model.device),
-                attention_mask=attention_mask_chunks[i].unsqueeze(0).to(self._model.device),
-                max_length=150,
-                min_length=30,
+                input_ids=padded["input_ids"].to(self._model.device),
+                attention_mask=padded["attention_mask"].to(self._model.device),
+                num_beams=SUMMARIZATION_NUM_BEAMS,
+                max_length=SUMMARIZATION_MAX_LENGTH,
+                min_length=SUMMARIZATION_MIN_LENGTH,
                 do_sample=False,
             )
+        return self._tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
 
-            summary_text += self._tokenizer.decode(summary_ids[0], skip_special_tokens=True) + "\n"
+    def summarize(self, query: str, text: str) -> str:
+        return self.summarize_many([(query, text)])[0]
+
+    def summarize_many(self, items: list[tuple[str, str]]) -> list[str]:
+        """
+        Summarize many (query, text) pairs.
+        The overflow windows of every text are pooled, sorted by length so that windows of
+        similar size share a batch, and generated SUMMARIZATION_GENERATE_BATCH_SIZE at a time.
+        :return: The summary of each text, in order.
+        """
+        if not items:
+            raise ValueError("Input texts must be a non-empty list.")
+
+        windows: list[tuple[int, int, list[int]]] = [
+            (owner, position, input_ids)
+            for owner, (query, text) in enumerate(items)
+            for position, input_ids in enumerate(self._windows(query, text))
+        ]
+        windows.sort(key=lambda window: len(window[2]))
 
-        return summary_text
+        summaries: list[dict[int, str]] = [{} for _ in items]
+        for start in range(0, len(windows), SUMMARIZATION_GENERATE_BATCH_SIZE):
+            batch = windows[start:start + SUMMARIZATION_GENERATE_BATCH_SIZE]
+            logger(f"Summarizing windows {start + 1}-{start + len(batch)}/{len(windows)}", "info")
+            decoded = self._generate([input_ids for _, _, input_ids in batch])
+            for (owner, position, _), summary in zip(batch, decoded):
+                summaries[owner][position] = summary
+
+        return [
+            "".join(parts[position] + "\n" for position in sorted(parts))
+            for parts in summaries
+        ]
 
 
 # Singleton instance of the Instance class
@@ -147,13 +229,50 @@ instance = Instance()
 #
 
 
-async def embed_texts(texts: list[str]) -> list[list[float]]:
-    return await asyncio.to_thread(instance.get("embeddings").embed, texts)
+batchers = {
+    "embeddings": MicroBatcher(
+        "embeddings",
+        lambda batches: instance.get("embeddings").embed_many(batches),
+        max_size=EMBEDDINGS_MICRO_BATCH_SIZE,
+        max_wait=MICRO_BATCH_MAX_WAIT_MS / 1000,
+        weight=len,
+    ),
+    "reranker": MicroBatcher(
+        "reranker",
+        lambda requests: instance.get("reranker").rerank_many(requests),
+        max_size=RERANK_MICRO_BATCH_SIZE,
+        max_wait=MICRO_BATCH_MAX_WAIT_MS / 1000,
+        weight=lambda request: len(request[1]),
+    ),
+    "summarization": MicroBatcher(
+        "summarization",
+        lambda items: instance.get("summarization").summarize_many(items),
+        max_size=SUMMARIZATION_MICRO_BATCH_SIZE,
+        max_wait=MICRO_BATCH_MAX_WAIT_MS / 1000,
+    ),
+}
+
+
+def start_batchers() -> None:
+    for batcher in batchers.values():
+        batcher.start()
+
+
+async def stop_batchers() -> None:
+    await asyncio.gather(*(batcher.stop() for batcher in batchers.values()))
+
+
+async def embed_texts(texts: list[str]) -> np.ndarray:
+    return await batchers["embeddings"].submit(texts)
 
 
 async def rerank_documents(query: str, documents: list[str]) -> tuple[list[str], list[float]]:
-    return await asyncio.to_thread(instance.get("reranker").rerank, query, documents)
+    return await batchers["reranker"].submit((query, documents))
 
 
 async def summarization_text(query: str, text: str) -> str:
-    return await asyncio.to_thread(instance.get("summarization").summarize, query, text)
+    return await batchers["summarization"].submit((query, text))
+
+
+async def summarization_texts(query: str, texts: list[str]) -> list[str]:
+    return list(await asyncio.gather(*(summarization_text(query, text) for text in texts)))
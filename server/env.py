@@ -6,3 +6,33 @@ load_dotenv()
 RERANKER_MODEL = environ.get("RERANKER_MODEL", "jinaai/jina-reranker-v2-base-multilingual")
 EMBEDDING_MODEL = environ.get("EMBEDDING_MODEL", "jinaai/jina-embeddings-v3")
 SUMMARIZATION_MODEL = environ.get("SUMMARIZATION_MODEL", "facebook/bart-large-cnn")
+
+# Texts encoded per forward pass by /embeddings
+EMBEDDING_BATCH_SIZE = int(environ.get("EMBEDDING_BATCH_SIZE", 32))
+if EMBEDDING_BATCH_SIZE < 1:
+    raise ValueError("EMBEDDING_BATCH_SIZE must be greater than 0.")
+
+# Overflow windows summarized per generate() call by /summarize/batch
+SUMMARIZATION_GENERATE_BATCH_SIZE = int(environ.get("SUMMARIZATION_GENERATE_BATCH_SIZE", 8))
+if SUMMARIZATION_GENERATE_BATCH_SIZE < 1:
+    raise ValueError("SUMMARIZATION_GENERATE_BATCH_SIZE must be greater than 0.")
+
+# Generation budget per window (beam search width and summary length in tokens)
+SUMMARIZATION_NUM_BEAMS = int(environ.get("SUMMARIZATION_NUM_BEAMS", 4))
+SUMMARIZATION_MAX_LENGTH = int(environ.get("SUMMARIZATION_MAX_LENGTH", 150))
+SUMMARIZATION_MIN_LENGTH = int(environ.get("SUMMARIZATION_MIN_LENGTH", 30))
+if SUMMARIZATION_NUM_BEAMS < 1:
+    raise ValueError("SUMMARIZATION_NUM_BEAMS must be greater than 0.")
+if not 0 <= SUMMARIZATION_MIN_LENGTH <= SUMMARIZATION_MAX_LENGTH:
+    raise ValueError("SUMMARIZATION_MIN_LENGTH must be between 0 and SUMMARIZATION_MAX_LENGTH.")
+
+# Micro-batching of concurrent requests: how long a request waits for companions,
+# and the largest batch handed to each model (texts, query/document pairs, documents)
+MICRO_BATCH_MAX_WAIT_MS = float(environ.get("MICRO_BATCH_MAX_WAIT_MS", 10))
+EMBEDDINGS_MICRO_BATCH_SIZE = int(environ.get("EMBEDDINGS_MICRO_BATCH_SIZE", 256))
+RERANK_MICRO_BATCH_SIZE = int(environ.get("RERANK_MICRO_BATCH_SIZE", 256))
+SUMMARIZATION_MICRO_BATCH_SIZE = int(environ.get("SUMMARIZATION_MICRO_BATCH_SIZE", 16))
+if MICRO_BATCH_MAX_WAIT_MS < 0:
+    raise ValueError("MICRO_BATCH_MAX_WAIT_MS must be greater than or equal to 0.")
+if min(EMBEDDINGS_MICRO_BATCH_SIZE, RERANK_MICRO_BATCH_SIZE, SUMMARIZATION_MICRO_BATCH_SIZE) < 1:
+    raise ValueError("Micro-batch sizes must be greater than 0.")
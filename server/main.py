@@ -1,4 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Header, Response
+
+from embedding_codec import EMBEDDINGS_MEDIA_TYPE, encode_embeddings
 from server.schemas import (
     EmbeddingsRequest,
     RerankRequest,
@@ -7,33 +13,60 @@ from server.schemas import (
     RerankedDocument,
     SummarizeRequest,
     SummarizeResponse,
+    SummarizeBatchRequest,
+    SummarizeBatchResponse,
 )
 from server.core import (
     embed_texts,
     rerank_documents,
-    summarization_text
+    summarization_text,
+    summarization_texts,
+    start_batchers,
+    stop_batchers,
 )
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    start_batchers()
+    yield
+    await stop_batchers()
+
+
 app = FastAPI(
     title="Rerank And Embedding API",
     description="Utility API for embedding and reranking.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
-@app.post("/embeddings", response_model=EmbeddingsResponse)
+@app.post(
+    "/embeddings",
+    response_model=EmbeddingsResponse,
+    responses={200: {"content": {EMBEDDINGS_MEDIA_TYPE: {}}}},
+)
 async def embeddings(
     payload: EmbeddingsRequest,
-) -> "EmbeddingsResponse":
+    accept: Optional[str] = Header(default=None),
+) -> "EmbeddingsResponse | Response":
     """
     Generate embeddings for the provided texts.
+    Answers with raw float32 vectors (see embedding_codec) when the Accept header lists
+    EMBEDDINGS_MEDIA_TYPE, and with JSON otherwise.
     :param payload:
+    :param accept:
     :return:
     """
     try:
         embeddings_result = await embed_texts(payload.texts)
+        if accept and EMBEDDINGS_MEDIA_TYPE in accept:
+            return Response(
+                content=encode_embeddings(embeddings_result),
+                media_type=EMBEDDINGS_MEDIA_TYPE,
+            )
         return EmbeddingsResponse(
-            embeddings=embeddings_result
+            embeddings=embeddings_result.tolist()
         )
     except Exception as e:
         raise HTTPException(
@@ -89,3 +122,25 @@ async def summarize(
             status_code=500,
             detail=f"Error during summarization: {str(e)}"
         )
+
+
+@app.post("/summarize/batch", response_model=SummarizeBatchResponse)
+async def summarize_batch(
+    payload: SummarizeBatchRequest
+) -> "SummarizeBatchResponse":
+    """
+    Summarize many documents based on the same query in a single request.
+    The overflow windows of every document are generated in batches.
+    :param payload:
+    :return:
+    """
+    try:
+        summaries = await summarization_texts(payload.query, payload.documents)
+        return SummarizeBatchResponse(
+            summaries=summaries
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error during summarization: {str(e)}"
+        )
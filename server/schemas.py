@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field
 
@@ -72,4 +72,30 @@ class SummarizeResponse(BaseModel):
         ...,
         description="Summary of the document."
     )
+
+
+class SummarizeBatchRequest(BaseModel):
+    model: Literal[
+        "facebook/bart-large-cnn",
+    ] = Field(
+        "facebook/bart-large-cnn",
+        description="Model to use for summarization."
+    )
+    query: str = Field(
+        ...,
+        description="Query to summarize documents."
+    )
+    documents: list[Annotated[str, Field(max_length=10_000)]] = Field(
+        ...,
+        description="Documents to summarize, each one separately.",
+        min_length=1,
+        max_length=64,
+    )
+
+
+class SummarizeBatchResponse(BaseModel):
+    summaries: list[str] = Field(
+        ...,
+        description="Summary of each document, in order."
+    )
 #
\ No newline at end of file
@@ -12,3 +12,121 @@ def test_deepsearcher():
     assert isinstance(result, str), "Result should be a string"
     assert len(result) > 0, "Result should not be empty"
     assert "reinforcement learning" in result, "Result should contain the query term"
+
+
+def test_chunk_store():
+    from deep_searcher import ChunkStore
+
+    store = ChunkStore()
+    store.extend(["Reinforcement learning.", "An agent learns from rewards in an environment."])
+    assert len(store) == 2, "Store should hold two chunks"
+    assert store.tokens == sum(store.count_tokens(chunk) for chunk in store), "Token count out of sync"
+
+    budget = store.tokens + 5
+    assert store.remaining(budget) == 5, "Remaining tokens should be budget minus used"
+    assert store.select(store.token_length(1)) == [1], "Only the chunk that fits should be selected"
+    assert store.select(budget, order=[1, 0]) == [1, 0], "Selection should follow the given order"
+
+
+def test_deepsearcher_stream():
+    from deep_searcher import AgentDeepSearch
+    from llm.openai_llm import OpenAILLM
+
+    agent = AgentDeepSearch(OpenAILLM(), max_depth=1)
+
+    events = list(agent.stream("Explain the concept of reinforcement learning."))
+    types = [event.type for event in events]
+
+    assert types[0] == "sub_queries", "First event should list the sub-queries"
+    assert "source_finished" in types, "Sources should report when they finish"
+    assert "token" in types, "The report should be streamed token by token"
+    assert types[-1] == "done", "Last event should carry the final report"
+    assert events[-1].content == "".join(e.content for e in events if e.type == "token"), \
+        "Final report should match the streamed tokens"
+
+
+def test_deepsearcher_stream_cancelled():
+    import threading
+    import time
+    from deep_searcher import AgentDeepSearch
+    from llm.openai_llm import OpenAILLM
+
+    agent = AgentDeepSearch(OpenAILLM(), max_depth=1)
+    events = agent.stream("Explain the concept of reinforcement learning.")
+    assert next(events).type == "sub_queries", "First event should list the sub-queries"
+    events.close()
+
+    deadline = time.monotonic() + 120
+    while any(t.name.startswith("deep-search-stream") for t in threading.enumerate()):
+        assert time.monotonic() < deadline, "The research should stop once the consumer goes away"
+        time.sleep(0.1)
+
+
+def test_tracing_spans():
+    import json
+    from async_runtime import ContextThreadPoolExecutor
+    from tracing import trace, span
+
+    def summarize(chunk: str) -> None:
+        with span("summarize", tokens=len(chunk.split())):
+            pass
+
+    with trace("research") as run:
+        with span("crawl", url="https://example.com") as current:
+            current.set("bytes", 512)
+            current.set("cache_hit", True)
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(summarize, ["an agent learns", "from rewards"]))
+
+    root = next(s for s in run.spans if s.parent_id is None)
+    assert root.name == "research", "The trace should open a root span"
+    assert all(s.parent_id == root.span_id for s in run.spans if s is not root), "Worker spans should nest under the root"
+    stages = {stage.name: stage for stage in run.summary().stages}
+    assert stages["crawl"].totals == {"bytes": 512, "cache_hit": 1}, "Numeric attributes should be summed"
+    assert stages["summarize"].count == 2 and stages["summarize"].totals["tokens"] == 5, "Worker spans should be recorded"
+    assert json.loads(run.to_json())["trace_id"] == run.trace_id, "Trace should export as JSON"
+
+
+def test_deepsearcher_trace():
+    from deep_searcher import AgentDeepSearch
+    from llm.openai_llm import OpenAILLM
+
+    agent = AgentDeepSearch(OpenAILLM(), max_depth=1)
+    agent.run("Explain the concept of reinforcement learning.")
+
+    assert agent.last_trace is not None, "Run should be traced"
+    stages = {stage.name for stage in agent.last_trace.summary().stages}
+    assert {"deep_search", "sub_queries", "final_summary"} <= stages, "Pipeline stages should be traced"
+
+
+def test_deepsearcher_replay():
+    from benchmarks import load_fixtures, run_fixture
+
+    fixture = load_fixtures(names=["reinforcement_learning"])[0]
+    result = run_fixture(fixture, repeats=1)
+
+    stages = {stage.name: stage for stage in result.stages}
+    assert stages["sub_queries"].count == 1, "Sub-queries should be generated once"
+    assert stages["crawl"].errors == 0, "Every recorded page should be replayed"
+    assert stages["pdf_parse"].count > 0, "Recorded PDFs should be parsed"
+    assert result.peak_memory_bytes > 0, "Peak memory should be measured"
+
+
+def test_context_packer_rerank_failure(monkeypatch):
+    from tenacity import wait_none
+    from deep_searcher.context_packer import ContextPacker
+    from exceptions import APIRequestError
+    from llm.reranker import Reranker
+
+    class FailingClient:
+        def request(self, uri, payload):
+            raise APIRequestError("Reranker unavailable", status_code=503)
+
+    monkeypatch.setattr(Reranker._rerank.retry, "wait", wait_none())
+    chunks = [f"Chunk {i} about reinforcement learning agents." for i in range(4)]
+    packer = ContextPacker(llm=None, reranker=Reranker(client=FailingClient()), min_coverage=0)
+    budget = packer._store(chunks).token_length(0) * 2
+    monkeypatch.setattr(packer, "budget", lambda query, template="": budget)
+
+    assert packer.pack("reinforcement learning", chunks) == chunks[2:], \
+        "A reranker outage should fall back to the most recent chunks"
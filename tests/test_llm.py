@@ -46,6 +46,46 @@ def test_summarization():
     assert len(result) > 0, "Summarization result should not be empty"
 
 
+def test_summarization_batched():
+    from llm.summarization import Summarization
+
+    summarization = Summarization(batch_size=2, max_concurrency=2)
+
+    query = "Reinforcement Learning."
+    paragraph = ("Reinforcement learning is a type of machine learning where an agent learns to make decisions "
+                 "by taking actions in an environment to maximize cumulative reward. ")
+    document = "\n\n".join(paragraph * 20 for _ in range(5))
+    assert len(summarization._split_text(document)) > 2, "Document should span several batches"
+    result = summarization.summarize(query, document)
+    assert isinstance(result, str), "Summarization result should be a string"
+    assert len(result) > 0, "Summarization result should not be empty"
+
+
+def test_summarization_batch_mismatch():
+    import pytest
+    from llm.summarization import Summarization
+
+    with pytest.raises(ValueError):
+        Summarization(batch_size=65)
+    merged = Summarization._merge([None, None, None], [[0, 1], [2]], [["first"], ["third"]])
+    assert merged == "third", "A batch with a missing summary should be skipped, not misaligned"
+
+
+def test_summarization_cache(tmp_path):
+    from caching import SummarizationCache
+
+    cache = SummarizationCache(max_items=1, directory=str(tmp_path))
+    assert cache.get("query", "chunk") is None, "Empty cache should miss"
+    cache.put("query", "chunk", "summary")
+    cache.put("query", "other chunk", "other summary")
+    assert cache.get("query", "other chunk") == "other summary", "Memory tier should hit"
+    assert cache.get("query", "chunk") == "summary", "Disk tier should hit after memory eviction"
+    assert cache.get("another query", "chunk") is None, "Key must include the query"
+
+    stats = cache.stats()
+    assert (stats.memory_hits, stats.disk_hits, stats.misses) == (1, 1, 2), "Unexpected cache stats"
+
+
 def test_generative():
     from llm.openai_llm import OpenAILLM
 
@@ -128,3 +168,89 @@ def test_summarize():
     result = llm.summarize(query, chunks)
     assert isinstance(result, str), "Summary result should be a string"
     assert len(result) > 0, "Summary result should not be empty"
+
+
+def test_shared_http_client():
+    import asyncio
+    from http_client import get_client, get_async_client
+
+    assert get_client() is get_client()
+
+    async def clients():
+        return get_async_client(), get_async_client()
+
+    first, second = asyncio.run(clients())
+    assert first is second
+
+
+def test_embedding_codec():
+    import numpy as np
+    from embedding_codec import encode_embeddings, decode_embeddings
+
+    embeddings = np.random.default_rng(0).standard_normal((3, 1024)).astype(np.float32)
+    content = encode_embeddings(embeddings)
+    decoded = decode_embeddings(content)
+    assert len(content) == 8 + embeddings.nbytes, "Payload should be the header plus raw float32"
+    assert decoded.shape == (3, 1024) and decoded.dtype == np.float32
+    assert np.array_equal(decoded, embeddings), "Decoded embeddings should match the encoded ones"
+
+
+def test_embeddings_array():
+    import numpy as np
+    from llm.embeddings import Embeddings
+
+    result = Embeddings().embed_array(["What is the capital of France?", "Paris"])
+    assert isinstance(result, np.ndarray) and result.dtype == np.float32
+    assert result.shape[0] == 2, "One embedding should be returned per text"
+
+
+def test_embeddings_error_after_retries(monkeypatch):
+    import pytest
+    from tenacity import wait_none
+    from caching import EmbeddingCache
+    from exceptions import APIRequestError, EmbedError
+    from llm.embeddings import Embeddings
+
+    class FailingClient:
+        def request(self, uri, payload):
+            raise APIRequestError("Embeddings unavailable", status_code=503)
+
+    monkeypatch.setattr(Embeddings._embed.retry, "wait", wait_none())
+    embeddings = Embeddings(client=FailingClient(), cache=EmbeddingCache(directory=None))
+    with pytest.raises(EmbedError, match="Status code: 503"):
+        embeddings.embed(["What is the capital of France?"])
+
+
+def test_embedding_cache(tmp_path):
+    import numpy as np
+    from caching import EmbeddingCache
+
+    texts = ["Paris is the capital of France.", "Berlin is the capital of Germany."]
+    embeddings = np.random.default_rng(0).standard_normal((2, 1024)).astype(np.float32)
+
+    cache = EmbeddingCache(max_items=1, directory=str(tmp_path))
+    assert cache.get_many(texts) == [None, None], "Unknown texts should miss"
+    cache.put_many(texts, embeddings)
+
+    restarted = EmbeddingCache(max_items=1, directory=str(tmp_path))
+    vectors = restarted.get_many(texts + texts[:1])
+    assert all(np.array_equal(v, e) for v, e in zip(vectors, [*embeddings, embeddings[0]]))
+    assert restarted.stats().disk_hits == 3, "Vectors should be read back from the memory-mapped matrix"
+
+
+def test_balanced_batches():
+    from llm._batching import balanced_batches
+
+    sizes = [s.stop - s.start for s in balanced_batches(201, 100)]
+    assert sizes == [67, 67, 67], "Batches should be as even as possible"
+    assert balanced_batches(100, 100) == [slice(0, 100)]
+    assert balanced_batches(0, 100) == []
+
+
+def test_rerank_many_documents():
+    from llm.reranker import Reranker
+
+    documents = [f"Document {i} about machine learning and statistics." for i in range(150)]
+    result = Reranker().rerank("Machine Learning", documents)
+    scores = [ranked.score for ranked in result]
+    assert scores == sorted(scores, reverse=True), "Batches should be merged in global score order"
@@ -45,3 +45,50 @@ def test_firecrawl_parser():
     assert contents is not None, "Firecrawl parsing failed"
     assert "Example Domain" in contents, "Firecrawl content does not match expected value"
 
+
+
+def test_crawl_many():
+    from parsers import CrawlEngine
+
+    urls = [
+        "https://example.com",
+        "https://www.python.org",
+        "https://en.wikipedia.org/wiki/Reinforcement_learning",
+    ]
+    contents = CrawlEngine.crawl_many(urls)
+    assert len(contents) == len(urls), "crawl_many must return one entry per URL"
+    assert "Example Domain" in contents[0], "Results must keep the order of the URLs"
+    assert all(content is not None for content in contents), "Web parsing failed for some URLs"
+
+
+def test_crawl_many_isolates_failures():
+    from parsers import CrawlEngine
+    from parsers.base import BaseCrawlerParser
+    from schemas import CrawledPage
+
+    class FlakyParser(BaseCrawlerParser):
+        def fetch(self, url: str) -> CrawledPage:
+            if "broken" in url:
+                raise OSError("disk I/O error")
+            return CrawledPage(url=url, content="Example Domain")
+
+    urls = ["https://broken.example.com", "https://flaky.example.com/page"]
+    contents = CrawlEngine.crawl_many(urls, FlakyParser())
+    assert contents[0] is None, "A failing URL should yield None"
+    assert contents[1] == "Example Domain", "Other URLs should still be crawled"
+
+
+def test_crawl_cache(tmp_path):
+    from caching import CrawlCache
+
+    cache = CrawlCache(str(tmp_path), ttl=60, max_bytes=20)
+    cache.put("https://Example.com/page/?utm_source=x#top", "Example Domain", etag='"abc"')
+    page = cache.get("https://example.com/page")
+    assert page is not None, "Cached page not found for an equivalent URL"
+    assert page.content == "Example Domain", "Cached content does not match"
+    assert page.etag == '"abc"', "ETag was not stored"
+    assert cache.is_fresh(page), "Cached page should be fresh"
+
+    cache.put("https://www.python.org", "Python Software")
+    assert cache.get("https://example.com/page") is None, "Least recently used page was not evicted"
+    assert cache.get("https://www.python.org") is not None, "Newest page was evicted"
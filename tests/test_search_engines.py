@@ -92,3 +92,61 @@ def test_semantic_delete():
     semantic_search = SemanticSearch("deep-searcher")
     document_id = "test_document"
     semantic_search.delete_by_document_id(document_id)
+
+
+def test_semantic_ingest(tmp_path):
+    from researchers import SemanticSearch
+    from researchers.ingest import load_documents
+    semantic_search = SemanticSearch("test-ingest")
+    (tmp_path / "notes.md").write_text("Machine Learning is a subset of artificial intelligence. " * 200)
+    documents = [*load_documents([str(tmp_path)]), "Deep Learning is based on artificial neural networks."]
+    report = semantic_search.ingest(documents, batch_size=8)
+    assert report.documents == 2, "Expected both documents to be split"
+    assert report.chunks > 2 and report.failed_chunks == 0, "Expected every chunk to be uploaded"
+    assert report.chunks_per_second > 0
+    semantic_search.delete_namespace()
+
+
+def test_bm25_encoder():
+    from databases.sparse import BM25Encoder
+    encoder = BM25Encoder()
+    document = encoder.encode_document("The arXiv paper 2401.12345 introduces jina-embeddings-v3.")
+    query = encoder.encode_query("jina-embeddings-v3")
+    assert set(query.indices) <= set(document.indices), "Expected every query term to be indexed"
+    assert all(value > 0 for value in document.values)
+
+
+def test_semantic_search_keywords():
+    from researchers import SemanticSearch
+    semantic_search = SemanticSearch("test-hybrid")
+    semantic_search.upsert("The arXiv paper 2401.12345 introduces jina-embeddings-v3.")
+    semantic_search.upsert("Reinforcement learning agents learn from rewards.")
+    result = semantic_search.query("2401.12345", limit=1)
+    assert "2401.12345" in result[0].text, "Expected the exact identifier to be retrieved first"
+    semantic_search.delete_namespace()
+
+
+def test_semantic_delete_by_document_id_per_namespace():
+    from researchers import SemanticSearch
+    first, second = SemanticSearch("test-tenant-a"), SemanticSearch("test-tenant-b")
+    first.upsert("Qdrant groups the points of a tenant together.", document_id="shared-document")
+    second.upsert("Qdrant groups the points of a tenant together.", document_id="shared-document")
+    first.delete_by_document_id("shared-document")
+    assert len(first.query("tenant", limit=5)) == 0, "Expected the document to be deleted from the first namespace"
+    assert len(second.query("tenant", limit=5)) == 1, "Expected the other namespace to keep its document"
+    first.delete_namespace()
+    second.delete_namespace()
+
+
+def test_shared_database_clients():
+    from databases import MongoDB, Qdrant
+    assert Qdrant("first")._client is Qdrant("second")._client
+    assert MongoDB()._client is MongoDB()._client
+
+
+def test_lazy_database_initialization():
+    from databases import Qdrant
+    qdrant = Qdrant("test-initialize")
+    qdrant.ensure_initialized()
+    qdrant.ensure_initialized()
+    assert qdrant.collection in Qdrant._initialized, "Expected the collection to be marked as verified"
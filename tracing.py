@@ -0,0 +1,265 @@
+import functools
+import inspect
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from schemas import SpanRecord, StageSummary, TraceSummary, TraceRecord
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[SpanRecord]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Handle to the span being recorded, used to attach measurements.
+    Outside of a trace it is a no-op.
+    """
+
+    def __init__(self, record: Optional[SpanRecord] = None):
+        self._record = record
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Set an attribute of the span.
+        :param key:
+        :param value:
+        :return:
+        """
+        if self._record is not None:
+            self._record.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """
+        Add to a numeric attribute of the span, e.g. bytes or cache hits.
+        :param key:
+        :param amount:
+        :return:
+        """
+        if self._record is not None:
+            self._record.attributes[key] = self._record.attributes.get(key, 0) + amount
+
+    @property
+    def recording(self) -> bool:
+        return self._record is not None
+
+
+class Trace:
+    """
+    Collects the spans of one run. Spans are appended from any thread or event loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self._spans: list[SpanRecord] = []
+        self._lock = threading.Lock()
+
+    def _add(self, record: SpanRecord) -> None:
+        with self._lock:
+            self._spans.append(record)
+
+    @property
+    def spans(self) -> list[SpanRecord]:
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self) -> TraceSummary:
+        """
+        Aggregate the spans per stage.
+        :return: The per-stage summary, slowest total first.
+        """
+        spans = self.spans
+        stages: dict[str, StageSummary] = {}
+        for record in spans:
+            stage = stages.setdefault(record.name, StageSummary(name=record.name))
+            stage.count += 1
+            stage.errors += record.status == "error"
+            stage.total_ms += record.duration_ms
+            stage.max_ms = max(stage.max_ms, record.duration_ms)
+            for key, value in record.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage.totals[key] = stage.totals.get(key, 0) + value
+                elif isinstance(value, bool):
+                    stage.totals[key] = stage.totals.get(key, 0) + int(value)
+
+        roots = [record for record in spans if record.parent_id is None]
+        return TraceSummary(
+            trace_id=self.trace_id,
+            name=self.name,
+            duration_ms=sum(record.duration_ms for record in roots),
+            stages=sorted(stages.values(), key=lambda stage: stage.total_ms, reverse=True),
+        )
+
+    def format_summary(self) -> str:
+        """
+        Render the per-stage summary as a plain-text table.
+        :return:
+        """
+        summary = self.summary()
+        lines = [f"Trace {summary.name} ({summary.trace_id}): {summary.duration_ms / 1000:.1f}s"]
+        for stage in summary.stages:
+            totals = ", ".join(f"{key}={value:g}" for key, value in sorted(stage.totals.items()))
+            lines.append(
+                f"  {stage.name:<24} n={stage.count:<4} total={stage.total_ms:>9.1f}ms "
+                f"mean={stage.mean_ms:>8.1f}ms max={stage.max_ms:>8.1f}ms errors={stage.errors}"
+                + (f" {totals}" if totals else "")
+            )
+        return "\n".join(lines)
+
+    def to_record(self) -> TraceRecord:
+        return TraceRecord(
+            trace_id=self.trace_id,
+            name=self.name,
+            spans=self.spans,
+            summary=self.summary(),
+        )
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Export the spans and their summary as JSON.
+        :param indent:
+        :return:
+        """
+        return self.to_record().model_dump_json(indent=indent)
+
+    def save(self, directory: str) -> str:
+        """
+        Write the JSON export to `<directory>/<name>-<trace_id>.json`.
+        :param directory:
+        :return: The path of the file.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.name}-{self.trace_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json(indent=2))
+        return path
+
+    def export_otel(self, tracer_provider=None) -> None:
+        """
+        Replay the spans into OpenTelemetry, keeping their timestamps and parents.
+        Requires the optional `opentelemetry-api` package, and an SDK to actually export.
+        :param tracer_provider: Defaults to the global tracer provider.
+        :return:
+        """
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError as e:
+            raise ImportError("Install opentelemetry-api (and an SDK/exporter) to export traces.") from e
+
+        provider = tracer_provider or otel_trace.get_tracer_provider()
+        tracer = provider.get_tracer("advanced-deep-research")
+        exported = {}
+        for record in sorted(self.spans, key=lambda r: r.start_time_ns):
+            parent = exported.get(record.parent_id)
+            otel_span = tracer.start_span(
+                record.name,
+                context=otel_trace.set_span_in_context(parent) if parent is not None else None,
+                start_time=record.start_time_ns,
+                attributes={
+                    key: value for key, value in record.attributes.items()
+                    if isinstance(value, (str, bool, int, float))
+                },
+            )
+            if record.status == "error":
+                otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, record.error))
+            otel_span.end(end_time=record.end_time_ns)
+            exported[record.span_id] = otel_span
+
+
+def current_trace() -> Optional[Trace]:
+    """
+    Get the trace of the current context.
+    :return: The active Trace, or None.
+    """
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Measure a stage of the pipeline as a child of the current span.
+    Without an active trace nothing is recorded.
+    :param name:
+    :param attributes: Initial attributes of the span.
+    :return: A handle to attach measurements.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield Span()
+        return
+
+    parent = _current_span.get()
+    record = SpanRecord(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent is not None else None,
+        start_time_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(record)
+    started = time.perf_counter()
+    try:
+        yield Span(record)
+    except BaseException as e:
+        record.status = "error"
+        record.error = str(e) or type(e).__name__
+        raise
+    finally:
+        record.duration_ms = (time.perf_counter() - started) * 1000
+        record.end_time_ns = record.start_time_ns + int(record.duration_ms * 1_000_000)
+        _current_span.reset(token)
+        trace._add(record)
+
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Trace]:
+    """
+    Record the spans of a run. Nested inside another trace, it only opens a span.
+    :param name:
+    :param attributes: Attributes of the root span.
+    :return: The Trace collecting the spans.
+    """
+    active = _current_trace.get()
+    if active is not None:
+        with span(name, **attributes):
+            yield active
+        return
+
+    new_trace = Trace(name)
+    token = _current_trace.set(new_trace)
+    try:
+        with span(name, **attributes):
+            yield new_trace
+    finally:
+        _current_trace.reset(token)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """
+    Decorate a function or coroutine function so each call is recorded as a span.
+    :param name:
+    :return:
+    """
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator